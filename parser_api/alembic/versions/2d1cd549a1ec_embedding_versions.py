@@ -0,0 +1,50 @@
+"""Replace article_embeddings updated_at with a version sequence
+
+Revision ID: 2d1cd549a1ec
+Revises: 7851adebd396
+Create Date: 2026-10-18 21:12:40.518327
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2d1cd549a1ec'
+down_revision: Union[str, Sequence[str], None] = '7851adebd396'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(sa.schema.CreateSequence(sa.Sequence('article_embeddings_version_seq')))
+    op.add_column(
+        'article_embeddings',
+        sa.Column(
+            'version', sa.BigInteger(),
+            server_default=sa.text("nextval('article_embeddings_version_seq')"),
+            nullable=False
+        )
+    )
+    op.drop_index('ix_article_embeddings_updated_at', table_name='article_embeddings')
+    op.drop_column('article_embeddings', 'updated_at')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column(
+        'article_embeddings',
+        sa.Column(
+            'updated_at', sa.DateTime(timezone=True),
+            server_default=sa.text('now()'), nullable=False
+        )
+    )
+    op.create_index(
+        'ix_article_embeddings_updated_at', 'article_embeddings', ['updated_at'],
+        unique=False
+    )
+    op.drop_column('article_embeddings', 'version')
+    op.execute(sa.schema.DropSequence(sa.Sequence('article_embeddings_version_seq')))
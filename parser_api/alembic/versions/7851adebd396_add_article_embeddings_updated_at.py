@@ -0,0 +1,39 @@
+"""Add article_embeddings updated_at
+
+Revision ID: 7851adebd396
+Revises: fc4846659240
+Create Date: 2026-10-18 19:41:52.318604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7851adebd396'
+down_revision: Union[str, Sequence[str], None] = 'fc4846659240'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'article_embeddings',
+        sa.Column(
+            'updated_at', sa.DateTime(timezone=True),
+            server_default=sa.text('now()'), nullable=False
+        )
+    )
+    op.create_index(
+        'ix_article_embeddings_updated_at', 'article_embeddings', ['updated_at'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_article_embeddings_updated_at', table_name='article_embeddings')
+    op.drop_column('article_embeddings', 'updated_at')
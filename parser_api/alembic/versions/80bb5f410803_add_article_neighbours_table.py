@@ -0,0 +1,41 @@
+"""Add article_neighbours table
+
+Revision ID: 80bb5f410803
+Revises: 1facb23ac09d
+Create Date: 2026-10-18 13:05:31.620443
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '80bb5f410803'
+down_revision: Union[str, Sequence[str], None] = '1facb23ac09d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('article_neighbours',
+    sa.Column('article_id', sa.Integer(), nullable=False),
+    sa.Column('rank', sa.Integer(), nullable=False),
+    sa.Column('neighbour_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['article_id'], ['articles.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['neighbour_id'], ['articles.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('article_id', 'rank')
+    )
+    op.create_index(
+        'ix_article_neighbours_neighbour_id', 'article_neighbours', ['neighbour_id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_article_neighbours_neighbour_id', table_name='article_neighbours')
+    op.drop_table('article_neighbours')
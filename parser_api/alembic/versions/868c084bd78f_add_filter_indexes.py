@@ -0,0 +1,37 @@
+"""Add filter indexes
+
+Revision ID: 868c084bd78f
+Revises: a0b0c203fa7c
+Create Date: 2026-10-18 11:02:17.914406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '868c084bd78f'
+down_revision: Union[str, Sequence[str], None] = 'a0b0c203fa7c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_articles_published_id', 'articles', ['published', 'id'], unique=False)
+    op.create_index('ix_articles_views', 'articles', ['views'], unique=False)
+    op.create_index(
+        'ix_articles_top_published', 'articles', ['published', 'id'],
+        unique=False, postgresql_where=sa.text('is_top')
+    )
+    op.create_index('ix_articles_hubs_hub_id', 'articles_hubs', ['hub_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_articles_hubs_hub_id', table_name='articles_hubs')
+    op.drop_index('ix_articles_top_published', table_name='articles')
+    op.drop_index('ix_articles_views', table_name='articles')
+    op.drop_index('ix_articles_published_id', table_name='articles')
@@ -0,0 +1,51 @@
+"""Unique article url
+
+Revision ID: a0b0c203fa7c
+Revises: 616136071ce9
+Create Date: 2026-10-18 10:12:41.503218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a0b0c203fa7c'
+down_revision: Union[str, Sequence[str], None] = '616136071ce9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep the most recently scraped row of every url and move the hub links
+    # of its duplicates onto it before removing them.
+    op.execute(sa.text("""
+        CREATE TEMPORARY TABLE article_duplicates ON COMMIT DROP AS
+        SELECT id, keep_id FROM (
+            SELECT id, max(id) OVER (PARTITION BY url) AS keep_id FROM articles
+        ) ranked
+        WHERE id <> keep_id
+    """))
+    op.execute(sa.text("""
+        INSERT INTO articles_hubs (article_id, hub_id)
+        SELECT DISTINCT d.keep_id, ah.hub_id
+        FROM articles_hubs ah JOIN article_duplicates d ON d.id = ah.article_id
+        ON CONFLICT DO NOTHING
+    """))
+    op.execute(sa.text("""
+        DELETE FROM articles_hubs ah
+        USING article_duplicates d WHERE ah.article_id = d.id
+    """))
+    op.execute(sa.text("""
+        DELETE FROM articles a
+        USING article_duplicates d WHERE a.id = d.id
+    """))
+    op.create_index(op.f('ix_articles_url'), 'articles', ['url'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_articles_url'), table_name='articles')
@@ -0,0 +1,37 @@
+"""Add article_bodies table
+
+Revision ID: da1280ab4376
+Revises: 80bb5f410803
+Create Date: 2026-10-18 18:59:44.268140
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'da1280ab4376'
+down_revision: Union[str, Sequence[str], None] = '80bb5f410803'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('article_bodies',
+    sa.Column('article_id', sa.Integer(), nullable=False),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.Column('tags', postgresql.ARRAY(sa.String()), nullable=False),
+    sa.Column('reading_time', sa.Integer(), nullable=True),
+    sa.Column('fetched_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['article_id'], ['articles.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('article_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('article_bodies')
@@ -0,0 +1,82 @@
+"""Add article search vector
+
+Revision ID: fc4846659240
+Revises: 16fd163be627
+Create Date: 2026-10-18 19:04:09.159225
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'fc4846659240'
+down_revision: Union[str, Sequence[str], None] = '16fd163be627'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+# Titles weigh more than hubs; both are indexed as Russian and as English.
+SEARCH_VECTOR_FUNCTION = """
+CREATE FUNCTION articles_search_vector_update() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('russian'::regconfig, NEW.title), 'A')
+        || setweight(to_tsvector('english'::regconfig, NEW.title), 'A')
+        || setweight(to_tsvector('russian'::regconfig, NEW.hub_names), 'B')
+        || setweight(to_tsvector('english'::regconfig, NEW.hub_names), 'B');
+    RETURN NEW;
+END
+$$
+"""
+
+SEARCH_VECTOR_TRIGGER = """
+CREATE TRIGGER articles_search_vector_update
+BEFORE INSERT OR UPDATE OF title, hub_names ON articles
+FOR EACH ROW EXECUTE FUNCTION articles_search_vector_update()
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nullable columns without a volatile default are added without a table
+    # rewrite. From here on the trigger fills the vector of written rows.
+    op.add_column(
+        'articles', sa.Column('hub_names', sa.String(), server_default='', nullable=False)
+    )
+    op.add_column('articles', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    op.execute(SEARCH_VECTOR_FUNCTION)
+    op.execute(SEARCH_VECTOR_TRIGGER)
+
+    # Existing rows are filled in id ranges, each committed on its own, and
+    # the index is built concurrently, so writers are never blocked for long.
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        max_id = conn.execute(sa.text("SELECT max(id) FROM articles")).scalar() or 0
+        for low in range(0, max_id + 1, BACKFILL_BATCH_SIZE):
+            conn.execute(sa.text("""
+                UPDATE articles a SET hub_names = coalesce((
+                    SELECT string_agg(hubs.name, ' ' ORDER BY hubs.name)
+                    FROM articles_hubs ah JOIN hubs ON hubs.id = ah.hub_id
+                    WHERE ah.article_id = a.id
+                ), '')
+                WHERE a.id >= :low AND a.id < :high
+            """), {"low": low, "high": low + BACKFILL_BATCH_SIZE})
+
+        op.create_index(
+            'ix_articles_search_vector', 'articles', ['search_vector'],
+            unique=False, postgresql_using='gin', postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_articles_search_vector', table_name='articles', postgresql_using='gin')
+    op.execute("DROP TRIGGER articles_search_vector_update ON articles")
+    op.execute("DROP FUNCTION articles_search_vector_update()")
+    op.drop_column('articles', 'search_vector')
+    op.drop_column('articles', 'hub_names')
@@ -0,0 +1,91 @@
+"""
+Benchmark of HTML parsing throughput on saved Habr listing pages.
+
+Checks that every parser backend returns the same articles as the
+BeautifulSoup reference implementation, then compares serial throughput of
+the backends and of the worker process pool used by the scraper pipeline.
+
+Usage:
+    python -m benchmarks.bench_parse [path/to/fixtures] [--workers N] [--repeat R]
+
+Fixtures default to the listing pages of the test suite, where the same
+parity check also runs as a test (tests/test_parser.py).
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://bench@localhost/bench")
+os.environ.setdefault("NUM_PAGE", "1")
+
+from habr_parser.config import PARSE_WORKERS  # noqa: E402
+from habr_parser.config import PARSER_BACKEND  # noqa: E402
+from habr_parser.services.scraper import PARSERS  # noqa: E402
+from habr_parser.services.scraper import get_parser  # noqa: E402
+from habr_parser.services.scraper import parse_articles  # noqa: E402
+
+DEFAULT_FIXTURES = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "listing"
+
+
+def load_pages(fixtures: Path, repeat: int) -> list[str]:
+    """Read every *.html fixture, repeated to get a stable measurement."""
+    pages = [p.read_text(encoding="utf-8") for p in sorted(fixtures.glob("*.html"))]
+    if not pages:
+        raise SystemExit(f"No *.html fixtures found in {fixtures}")
+    return pages * repeat
+
+
+def check_parity(pages: list[str]) -> None:
+    """Fail loudly if a backend disagrees with the reference parser."""
+    for page in pages:
+        expected = parse_articles(page)
+        for name, parse in PARSERS.items():
+            if parse(page) != expected:
+                raise SystemExit(f"Parser backend {name!r} differs from reference")
+
+
+def bench_serial(pages: list[str], parse) -> tuple[float, int]:
+    start = time.perf_counter()
+    articles = sum(len(parse(page)) for page in pages)
+    return time.perf_counter() - start, articles
+
+
+def bench_pool(pages: list[str], parse, workers: int) -> tuple[float, int]:
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Warm the workers up so process start-up is not measured.
+        list(pool.map(parse, pages[:workers]))
+        start = time.perf_counter()
+        articles = sum(len(result) for result in pool.map(parse, pages))
+        return time.perf_counter() - start, articles
+
+
+def report(name: str, elapsed: float, pages: int, articles: int) -> None:
+    print(
+        f"{name:<12} {elapsed:8.3f}s  "
+        f"{pages / elapsed:8.1f} pages/s  {articles / elapsed:10.1f} articles/s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("fixtures", type=Path, nargs="?", default=DEFAULT_FIXTURES)
+    parser.add_argument("--workers", type=int, default=PARSE_WORKERS)
+    parser.add_argument("--repeat", type=int, default=10)
+
+    parser.add_argument("--backend", choices=sorted(PARSERS), default=PARSER_BACKEND)
+    args = parser.parse_args()
+
+    check_parity(load_pages(args.fixtures, 1))
+    pages = load_pages(args.fixtures, args.repeat)
+    for name, parse in PARSERS.items():
+        elapsed, articles = bench_serial(pages, parse)
+        report(name, elapsed, len(pages), articles)
+    elapsed, articles = bench_pool(pages, get_parser(args.backend), args.workers)
+    report(f"{args.backend}[{args.workers}]", elapsed, len(pages), articles)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Benchmark of rendering article list responses to JSON.
+
+Compares the Pydantic path the routes used before (an ArticleRead per ORM
+article, validated once more against `response_model` and encoded the way
+FastAPI does) with the orjson path of `api.serialization` over the same
+articles as rows of `crud.select_article_rows`, on synthetic data.
+Checks that both produce the same JSON, then reports latency and memory
+allocated per response.
+
+Usage:
+    python -m benchmarks.bench_serialize [--rows 10000 100000] [--hubs H] [--repeat R]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+import tracemalloc
+from collections import namedtuple
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://bench@localhost/bench")
+os.environ.setdefault("NUM_PAGE", "1")
+
+from pydantic import TypeAdapter  # noqa: E402
+
+from habr_parser.api.routes import serialize_article  # noqa: E402
+from habr_parser.api.schemas import ArticleRead  # noqa: E402
+from habr_parser.api.serialization import article_dict  # noqa: E402
+from habr_parser.api.serialization import dumps  # noqa: E402
+from habr_parser.db.models import Article  # noqa: E402
+from habr_parser.db.models import ArticleHub  # noqa: E402
+from habr_parser.db.models import Hub  # noqa: E402
+
+ARTICLES_ADAPTER = TypeAdapter(list[ArticleRead])
+ArticleRow = namedtuple("ArticleRow", [
+    "id", "title", "url", "votes", "author", "published", "views", "comments",
+    "is_top", "hubs_ids", "hubs_names",
+])
+
+
+def synthetic_articles(rows: int, hubs_per_article: int) -> list[Article]:
+    """Detached articles shaped like scraped ones, sharing a pool of hubs."""
+    hubs = [Hub(id=i, name=f"Хаб {i}") for i in range(200)]
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [
+        Article(
+            id=i,
+            title=f"Статья номер {i} о том, как всё устроено",
+            url=f"https://habr.com/ru/articles/{i}/",
+            votes=i % 300,
+            author=f"author{i % 1000}",
+            published=start + timedelta(minutes=i),
+            views=i * 7 % 100_000,
+            comments=i % 50,
+            is_top=i % 20 == 0,
+            articles_hubs=[
+                ArticleHub(hub=hubs[(i + j) % len(hubs)]) for j in range(hubs_per_article)
+            ],
+        )
+        for i in range(rows)
+    ]
+
+
+def article_rows(articles: list[Article]) -> list[ArticleRow]:
+    """The same articles as the rows list queries return."""
+    return [
+        ArticleRow(
+            a.id, a.title, a.url, a.votes, a.author, a.published, a.views,
+            a.comments, a.is_top,
+            [hub.id for hub in a.hubs], [hub.name for hub in a.hubs],
+        )
+        for a in articles
+    ]
+
+
+def render_pydantic(articles: list[Article]) -> bytes:
+    """What FastAPI did for `return [serialize_article(a) ...]` with a response_model."""
+    content = [serialize_article(a) for a in articles]
+    value = ARTICLES_ADAPTER.validate_python(content, from_attributes=True)
+    data = ARTICLES_ADAPTER.dump_python(value, mode="json")
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def render_orjson(rows: list[ArticleRow]) -> bytes:
+    return dumps([article_dict(row) for row in rows])
+
+
+# Renderer and how its input is made from ORM articles.
+RENDERERS = {
+    "pydantic": (render_pydantic, list),
+    "orjson": (render_orjson, article_rows),
+}
+
+
+def measure(render, articles: list, repeat: int) -> tuple[float, float]:
+    """Median latency (ms) and peak memory allocated while rendering (MiB)."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render(articles)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    render(articles)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak / 2 ** 20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--hubs", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    sample = synthetic_articles(100, args.hubs)
+    if json.loads(render_pydantic(sample)) != json.loads(render_orjson(article_rows(sample))):
+        raise SystemExit("orjson path renders different JSON than the Pydantic path")
+
+    print(f"{'rows':>8} {'renderer':>9} {'median ms':>10} {'peak MiB':>9} {'speedup':>8}")
+    for rows in args.rows:
+        articles = synthetic_articles(rows, args.hubs)
+        baseline = None
+        for name, (render, prepare) in RENDERERS.items():
+            latency, peak = measure(render, prepare(articles), args.repeat)
+            baseline = baseline or latency
+            print(f"{rows:>8} {name:>9} {latency:>10.1f} {peak:>9.1f} {baseline / latency:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
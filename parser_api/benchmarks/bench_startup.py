@@ -0,0 +1,59 @@
+"""
+Benchmark of API process start-up cost: import time and peak RSS.
+
+Each measurement runs in a fresh interpreter. `app import` is what every
+API worker pays at start-up; `+ model load` adds the first call to the
+embedding model, i.e. what start-up cost when the model was loaded at
+import time.
+
+Usage:
+    python -m benchmarks.bench_startup [--runs N]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+PROBE = """
+import json, resource, time
+start = time.perf_counter()
+import habr_parser.main
+if {load_model}:
+    from habr_parser.services.processor_recomended import get_model
+    get_model()
+print(json.dumps({{
+    "seconds": time.perf_counter() - start,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}}))
+"""
+
+
+def probe(load_model: bool) -> dict:
+    env = {
+        "DATABASE_URL": "postgresql+asyncpg://bench@localhost/bench",
+        "NUM_PAGE": "1",
+        **os.environ,
+    }
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(load_model=load_model)],
+        env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    for name, load_model in (("app import", False), ("+ model load", True)):
+        results = [probe(load_model) for _ in range(args.runs)]
+        seconds = sorted(r["seconds"] for r in results)[len(results) // 2]
+        rss = max(r["rss_mb"] for r in results)
+        print(f"{name:<14} {seconds:8.3f} s (median)  {rss:8.1f} MB peak RSS")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Recall-vs-latency benchmark of the vector index backends on synthetic
+embeddings.
+
+Recall@k of the approximate index is measured against exact search for
+every `ef_search` value given. Needs `hnswlib` (requirements-hnsw.txt).
+
+Usage:
+    python -m benchmarks.bench_vector_index [--size N] [--dim D] [--queries Q]
+        [--k K] [--ef 16 32 64 128 256]
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://bench@localhost/bench")
+os.environ.setdefault("NUM_PAGE", "1")
+
+from habr_parser.services.vector_index import BruteForceIndex  # noqa: E402
+from habr_parser.services.vector_index import HNSWIndex  # noqa: E402
+
+
+def synthetic_embeddings(size: int, dim: int, seed: int = 0) -> np.ndarray:
+    """Clustered vectors, closer to real text embeddings than uniform noise."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(1, size // 100), dim))
+    labels = rng.integers(0, len(centers), size=size)
+    return (centers[labels] + 0.5 * rng.normal(size=(size, dim))).astype(np.float32)
+
+
+def timed_search(index, queries: np.ndarray, k: int) -> tuple[np.ndarray, float]:
+    start = time.perf_counter()
+    ids = np.vstack([index.search(q[None, :], k)[0] for q in queries])
+    return ids, (time.perf_counter() - start) / len(queries) * 1000
+
+
+def recall(found: np.ndarray, expected: np.ndarray) -> float:
+    hits = sum(len(set(f) & set(e)) for f, e in zip(found, expected))
+    return hits / expected.size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--ef", type=int, nargs="+", default=[16, 32, 64, 128, 256])
+    args = parser.parse_args()
+
+    vectors = synthetic_embeddings(args.size, args.dim)
+    ids = list(range(args.size))
+    queries = vectors[np.random.default_rng(1).choice(args.size, args.queries)]
+
+    exact = BruteForceIndex(args.dim)
+    exact.add(ids, vectors)
+    expected, latency = timed_search(exact, queries, args.k)
+    print(f"{'exact':<12} recall@{args.k}=1.000  {latency:8.3f} ms/query")
+
+    start = time.perf_counter()
+    hnsw = HNSWIndex(args.dim, initial_capacity=args.size)
+    hnsw.add(ids, vectors)
+    print(f"hnsw build   {time.perf_counter() - start:8.2f} s")
+
+    for ef in args.ef:
+        hnsw.ef_search = ef
+        found, latency = timed_search(hnsw, queries, args.k)
+        print(
+            f"hnsw ef={ef:<4} recall@{args.k}={recall(found, expected):.3f}  "
+            f"{latency:8.3f} ms/query"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""This module serves read endpoints from the response cache with ETags."""
+
+import logging
+from urllib.parse import urlencode
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.middleware.base import RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import Response
+
+from habr_parser.api.pagination import NEXT_CURSOR_HEADER
+from habr_parser.services.response_cache import CachedResponse
+from habr_parser.services.response_cache import get_response_cache
+from habr_parser.services.response_cache import strong_etag
+
+logger = logging.getLogger(__name__)
+
+CACHED_PREFIX = "/articles"
+# Recommendations follow embeddings and neighbours, not the article rows.
+UNCACHED_PREFIXES = ("/articles/recommendation", "/articles/neighbours")
+REPLAYED_HEADERS = (NEXT_CURSOR_HEADER,)
+
+
+def _cacheable(request: Request) -> bool:
+    path = request.url.path
+    return (
+        request.method == "GET"
+        and path.startswith(CACHED_PREFIX)
+        and not path.startswith(UNCACHED_PREFIXES)
+        and "stream" not in request.query_params
+    )
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of `If-None-Match` against an ETag, as RFC 9110 asks."""
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+class ResponseCacheMiddleware(BaseHTTPMiddleware):
+    """
+    Caches successful GET responses of article endpoints by path and query.
+
+    Every such response gets a strong ETag and a matching `If-None-Match`
+    is answered with 304. Cache failures fall back to rendering the response.
+    """
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        if not _cacheable(request):
+            return await call_next(request)
+
+        cache = get_response_cache()
+        key = f"{request.url.path}?{urlencode(sorted(request.query_params.multi_items()))}"
+        cached = None
+        if cache is not None:
+            try:
+                generation = await cache.generation()
+                cached = await cache.get(key, generation)
+            except Exception as e:
+                logger.warning("Response cache read failed: %s", e)
+                cache = None
+
+        if cached is None:
+            response = await call_next(request)
+            if response.status_code != 200:
+                return response
+            body = b"".join([chunk async for chunk in response.body_iterator])
+            cached = CachedResponse(
+                body=body,
+                etag=strong_etag(body),
+                media_type=response.headers.get("content-type", "application/json"),
+                headers={
+                    name: response.headers[name]
+                    for name in REPLAYED_HEADERS if name in response.headers
+                },
+            )
+            if cache is not None:
+                try:
+                    await cache.set(key, generation, cached)
+                except Exception as e:
+                    logger.warning("Response cache write failed: %s", e)
+
+        headers = {**cached.headers, "ETag": cached.etag}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, cached.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(cached.body, headers=headers, media_type=cached.media_type)
@@ -0,0 +1,69 @@
+"""This module contains helpers for keyset (cursor) pagination."""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any
+
+from fastapi import HTTPException, status
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    """Pack the sort key of the last returned row into an opaque cursor."""
+    raw = json.dumps(
+        [v.isoformat() if isinstance(v, datetime) else v for v in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list[Any]:
+    """Unpack a cursor made by `encode_cursor`, or answer 400 if it is broken."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list):
+            raise ValueError("cursor must hold a list")
+        return values
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        ) from None
+
+
+def decode_published_cursor(cursor: str) -> tuple[datetime, int]:
+    """Decode a cursor over the (published, id) key."""
+    try:
+        published, article_id = decode_cursor(cursor)
+        return datetime.fromisoformat(published), int(article_id)
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        ) from None
+
+
+def decode_search_cursor(cursor: str) -> tuple[float, int]:
+    """Decode a cursor over the (rank, id) key of search results."""
+    try:
+        rank, article_id = decode_cursor(cursor)
+        return float(rank), int(article_id)
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        ) from None
+
+
+def decode_sort_cursor(cursor: str, sort: str) -> tuple[datetime | int, int]:
+    """Decode a cursor over the (sort column, id) key made for the same `sort`."""
+    try:
+        cursor_sort, value, article_id = decode_cursor(cursor)
+        if cursor_sort != sort:
+            raise ValueError("cursor was made for another sort")
+        value = datetime.fromisoformat(value) if sort == "published" else int(value)
+        return value, int(article_id)
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        ) from None
@@ -1,21 +1,57 @@
 """This module contains routes of API."""
 
-from typing import Sequence
+from typing import Annotated
+from typing import AsyncIterator
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from habr_parser.api.schemas import ArticleCreate, ArticleRead
+from habr_parser.api.schemas import ArticleQuery
 from habr_parser.api.schemas import HubRead
+from habr_parser.api.schemas import RecommendationBatchRequest
+from habr_parser.api.pagination import NEXT_CURSOR_HEADER
+from habr_parser.api.pagination import decode_published_cursor
+from habr_parser.api.pagination import decode_search_cursor
+from habr_parser.api.pagination import decode_sort_cursor
+from habr_parser.api.pagination import encode_cursor
+from habr_parser.api.serialization import article_dict
+from habr_parser.api.serialization import article_response
+from habr_parser.api.serialization import articles_response
+from habr_parser.api.serialization import dumps
+from habr_parser.config import PAGE_SIZE_DEFAULT
+from habr_parser.config import PAGE_SIZE_MAX
 from habr_parser.db.models import Article
 from habr_parser.db import crud
 from habr_parser.db.database import get_session
+from habr_parser.db.database import get_session_context
 from habr_parser.services  import article
+from habr_parser.services import neighbours
 from habr_parser.services import recommender
+from habr_parser.services.response_cache import invalidate_responses
 
 
 router = APIRouter(prefix="/articles", tags=["Articles"])
 
+UNIQUE_VIOLATION = "23505"
+URL_UNIQUE_INDEX = "ix_articles_url"
+
+
+def integrity_error(e: IntegrityError) -> HTTPException:
+    """409 for a duplicate url, 422 for any other constraint the article violates."""
+    constraint = getattr(e.orig.__cause__, "constraint_name", None)
+    if getattr(e.orig, "sqlstate", None) == UNIQUE_VIOLATION and constraint == URL_UNIQUE_INDEX:
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Article with this url already exists"
+        )
+    return HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        detail=f"Article violates constraint {constraint}" if constraint else "Invalid article"
+    )
+
 def serialize_article(article: Article) -> ArticleRead:
     return ArticleRead(
         id=article.id,
@@ -33,62 +69,167 @@ def serialize_article(article: Article) -> ArticleRead:
         ]
     )
 
+async def stream_articles_ndjson() -> AsyncIterator[bytes]:
+    """Yield every article as one JSON line."""
+    # The request session is closed before a streaming body is sent,
+    # so the stream owns its own session.
+    async with get_session_context() as session:
+        async for a in crud.stream_all_articles(session):
+            yield dumps(article_dict(a)) + b"\n"
+
+
 @router.get("/", response_model=list[ArticleRead], tags=["Crud"])
-async def read_all_articles(session: AsyncSession = Depends(get_session)) -> Sequence[ArticleRead]:
-    """Retrieve all articles from the database."""
+async def read_all_articles(
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    cursor: str | None = None,
+    stream: bool = False,
+    session: AsyncSession = Depends(get_session)
+) -> Response:
+    """
+    Retrieve articles from the database, newest first.
+
+    Returns one page of at most `limit` articles. If there are more, the
+    `X-Next-Cursor` response header holds the cursor of the next page.
+    With `stream=true` all articles are exported as NDJSON instead.
+    """
+    if stream:
+        return StreamingResponse(
+            stream_articles_ndjson(), media_type="application/x-ndjson"
+        )
 
-    articles =  await crud.read_all_articles(session)
-    return [serialize_article(a) for a in articles]
+    after = decode_published_cursor(cursor) if cursor else None
+    articles = await crud.read_articles_page(session, limit, after)
+    headers = {}
+    if len(articles) == limit:
+        last = articles[-1]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(last.published, last.id)
+    return articles_response(articles, headers)
 
 
 @router.get("/top", response_model=list[ArticleRead], tags=["Filters"])
 async def filter_articles_by_is_top(
     session: AsyncSession = Depends(get_session)
-    ) -> Sequence[ArticleRead]:
+    ) -> Response:
     """Get articles thats atribute is_top is equal to True"""
     articles = await article.filter_articles_by_tops(session)
-    return [serialize_article(a) for a in articles]
+    return articles_response(articles)
+
+
+@router.get("/neighbours/progress", tags=["Filters"])
+async def read_neighbours_progress(session: AsyncSession = Depends(get_session)) -> dict:
+    """Progress of the last precomputed neighbours refresh, whichever worker ran it."""
+    return (await neighbours.read_progress(session)).as_dict()
+
+
+@router.get("/search", response_model=list[ArticleRead], tags=["Filters"])
+async def search_articles(
+    q: str = Query(..., min_length=1, max_length=500),
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    cursor: str | None = None,
+    session: AsyncSession = Depends(get_session)
+) -> Response:
+    """
+    Full-text search over titles and hubs (Russian and English), best matches first.
+
+    `q` takes web search syntax: quoted phrases, `or` and `-word`. Paginated
+    like GET /articles/ via the `X-Next-Cursor` header.
+    """
+    after = decode_search_cursor(cursor) if cursor else None
+    results = await crud.search_articles(session, q, limit, after)
+    headers = {}
+    if len(results) == limit:
+        last = results[-1]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(last.rank, last.id)
+    return articles_response(results, headers)
+
+
+@router.get("/query", response_model=list[ArticleRead], tags=["Filters"])
+async def query_articles(
+    query: Annotated[ArticleQuery, Query()],
+    session: AsyncSession = Depends(get_session)
+) -> Response:
+    """
+    Get articles matching all given filters, sorted by `sort` (descending).
+
+    Hub filters can be repeated (`?hub=Python&hub=Go`). Paginated like
+    GET /articles/ via the `X-Next-Cursor` header.
+    """
+    after = decode_sort_cursor(query.cursor, query.sort) if query.cursor else None
+    articles = await article.query_articles(
+        session, **query.model_dump(exclude={"cursor"}), after=after
+    )
+    headers = {}
+    if len(articles) == query.limit:
+        last = articles[-1]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            query.sort, getattr(last, query.sort), last.id
+        )
+    return articles_response(articles, headers)
 
 
 @router.get("/{article_id}", response_model=ArticleRead, tags=["Crud"])
 async def read_article_by_id(article_id: int,
-session: AsyncSession = Depends(get_session)) -> ArticleRead:
+session: AsyncSession = Depends(get_session)) -> Response:
     """Retrieve articles that belong to a given tag/hub."""
 
-    article =  await crud.read_article(session, article_id)
-    return serialize_article(article)
+    article =  await crud.read_article_row(session, article_id)
+    if article is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    return article_response(article)
 
 
 @router.get("/tag/{tag_name}", response_model=list[ArticleRead], tags=["Filters"])
 async def filter_articles_by_tag(
     tag_name: str,
     session: AsyncSession = Depends(get_session)
-) -> Sequence[ArticleRead]:
+) -> Response:
     """Get articles that contain given hub/tag."""
 
     articles =  await article.filter_articles_by_tag(session, tag_name)
-    return [serialize_article(a) for a in articles]
+    return articles_response(articles)
 
 
 @router.get("/views/{min_views}", response_model=list[ArticleRead], tags=["Filters"])
 async def filter_articles_by_views(
     min_views: int,
     session: AsyncSession = Depends(get_session)
-) -> Sequence[ArticleRead]:
+) -> Response:
     """Get articles with views >= min_views."""
 
     articles =  await article.filter_articles_by_views(session, min_views)
-    return [serialize_article(a) for a in articles]
+    return articles_response(articles)
 
 
 @router.get("/recommendation/{article_id}", response_model=list[ArticleRead], tags=["Filters"])
 async def filter_articles_by_recommendation(
     article_id: int,
     session: AsyncSession = Depends(get_session)
-) -> Sequence[ArticleRead]:
+) -> Response:
     """Recommend similar articles based on embeddings of the given article."""
     articles =  await recommender.recommend_articles(session, article_id)
-    return [serialize_article(a) for a in articles]
+    return articles_response(articles)
+
+
+@router.post(
+    "/recommendation/batch",
+    response_model=dict[int, list[ArticleRead]],
+    tags=["Filters"]
+)
+async def filter_articles_by_recommendation_batch(
+    batch: RecommendationBatchRequest,
+    session: AsyncSession = Depends(get_session)
+) -> Response:
+    """Recommend similar articles for each of the given articles."""
+    recommendations = await recommender.recommend_articles_batch(
+        session, batch.article_ids, batch.top_n
+    )
+    return Response(
+        dumps({
+            str(article_id): [article_dict(a) for a in articles]
+            for article_id, articles in recommendations.items()
+        }),
+        media_type="application/json",
+    )
 
 
 @router.delete("/{article_id}", response_model=ArticleRead, tags=["Crud"])
@@ -99,6 +240,7 @@ async def delete_article(article_id: int, session: AsyncSession = Depends(get_se
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
 
     await crud.delete_article(session, article_id)
+    await invalidate_responses()
     return serialize_article(article_in_db)
 
 
@@ -111,7 +253,12 @@ session: AsyncSession = Depends(get_session)) -> ArticleRead:
     if "url" in data and data["url"] is not None:
         data["url"] = str(data["url"])
 
-    saved_article = await crud.save_article(session, data)
+    try:
+        saved_article = await crud.save_article(session, data)
+    except IntegrityError as e:
+        await session.rollback()
+        raise integrity_error(e) from e
+    await invalidate_responses()
 
     hubs_read = [HubRead(id=-1, name=name) for name in saved_article.get("hubs", [])]
 
@@ -138,8 +285,13 @@ session: AsyncSession = Depends(get_session)) -> ArticleRead:
     if not db_article:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
 
-    updated_article = await crud.update_article(
-        session, article_id,
-        article_update.model_dump(exclude_unset=True)
-        )
+    try:
+        updated_article = await crud.update_article(
+            session, article_id,
+            article_update.model_dump(exclude_unset=True)
+            )
+    except IntegrityError as e:
+        await session.rollback()
+        raise integrity_error(e) from e
+    await invalidate_responses()
     return serialize_article(updated_article)
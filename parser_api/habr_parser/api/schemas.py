@@ -1,8 +1,13 @@
 """This module contains schemas fo API."""
 
 from datetime import datetime
+from typing import Literal
 from pydantic import BaseModel, HttpUrl, Field
 
+from habr_parser.config import PAGE_SIZE_DEFAULT
+from habr_parser.config import PAGE_SIZE_MAX
+from habr_parser.config import RECOMMENDATION_BATCH_MAX
+
 
 class HubBase(BaseModel):
     """Base schema for Hub (shared fields)."""
@@ -27,11 +32,11 @@ class ArticleBase(BaseModel):
     """Base schema for Article (shared fields)."""
     title: str
     url: HttpUrl
-    votes: int = 0
-    author: str | None = None
-    published: datetime | None = None
-    views: int = 0
-    comments: int = 0
+    votes: int = Field(default=0, ge=0)
+    author: str = Field(min_length=1)
+    published: datetime
+    views: int = Field(default=0, ge=0)
+    comments: int = Field(default=0, ge=0)
     is_top: bool = False
 
 
@@ -48,3 +53,28 @@ class ArticleRead(ArticleBase):
     model_config = {
         "from_attributes": True
     }
+
+
+class RecommendationBatchRequest(BaseModel):
+    """Schema for requesting recommendations for many articles at once."""
+    article_ids: list[int] = Field(min_length=1, max_length=RECOMMENDATION_BATCH_MAX)
+    top_n: int = Field(default=5, ge=1, le=50)
+
+
+class ArticleQuery(BaseModel):
+    """Query parameters of the combined article filter (all optional, ANDed)."""
+    hub: list[str] = Field(default_factory=list, description="Articles in every listed hub")
+    any_hub: list[str] = Field(default_factory=list, description="Articles in at least one listed hub")
+    author: str | None = None
+    is_top: bool | None = None
+    min_views: int | None = Field(default=None, ge=0)
+    max_views: int | None = Field(default=None, ge=0)
+    min_votes: int | None = Field(default=None, ge=0)
+    max_votes: int | None = Field(default=None, ge=0)
+    min_comments: int | None = Field(default=None, ge=0)
+    max_comments: int | None = Field(default=None, ge=0)
+    published_from: datetime | None = None
+    published_to: datetime | None = None
+    sort: Literal["published", "votes", "views", "comments"] = "published"
+    limit: int = Field(default=PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX)
+    cursor: str | None = None
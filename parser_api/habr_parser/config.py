@@ -9,3 +9,56 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 BASE_URL = os.getenv("BASE_URL")
 NUM_PAGE = int(os.getenv("NUM_PAGE"))
 INTERVAL = 24 * 60 * 60
+
+FETCH_CONCURRENCY = int(os.getenv("FETCH_CONCURRENCY", "5"))
+FETCH_TIMEOUT = float(os.getenv("FETCH_TIMEOUT", "10"))
+FETCH_RETRIES = int(os.getenv("FETCH_RETRIES", "3"))
+FETCH_BACKOFF = float(os.getenv("FETCH_BACKOFF", "0.5"))
+FETCH_RATE = float(os.getenv("FETCH_RATE", "3"))
+FETCH_BURST = int(os.getenv("FETCH_BURST", "5"))
+FETCH_RETRY_AFTER_MAX = float(os.getenv("FETCH_RETRY_AFTER_MAX", "300"))
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+PARSER_BACKEND = os.getenv("PARSER_BACKEND", "lxml")
+
+PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", "100"))
+PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", "500"))
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "500"))
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))
+EMBEDDING_INDEX_MAX_AGE = float(os.getenv("EMBEDDING_INDEX_MAX_AGE", "30"))
+
+VECTOR_INDEX = os.getenv("VECTOR_INDEX", "exact")
+HNSW_M = int(os.getenv("HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", "200"))
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "64"))
+EMBEDDING_BATCH_TICK = float(os.getenv("EMBEDDING_BATCH_TICK", "0.01"))
+RECOMMENDATION_BATCH_MAX = int(os.getenv("RECOMMENDATION_BATCH_MAX", "100"))
+NEIGHBOURS_TOP_N = int(os.getenv("NEIGHBOURS_TOP_N", "10"))
+NEIGHBOURS_CHUNK_SIZE = int(os.getenv("NEIGHBOURS_CHUNK_SIZE", "1000"))
+NEIGHBOURS_MEMORY_BYTES = int(os.getenv("NEIGHBOURS_MEMORY_BYTES", str(256 * 1024 * 1024)))
+
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "data/archive")
+ARCHIVE_COMPRESSION = os.getenv("ARCHIVE_COMPRESSION", "gzip")
+ARCHIVE_MAX_BYTES = int(os.getenv("ARCHIVE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+PAGE_CACHE_DIR = os.getenv("PAGE_CACHE_DIR", "data/page_cache")
+PAGE_CACHE_MAX_BYTES = int(os.getenv("PAGE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# "incremental" stops at known articles, so it never refreshes their votes,
+# views, comments and is_top; it is opt-in for cheap frequent runs.
+SCRAPE_MODE = os.getenv("SCRAPE_MODE", "full")
+SCRAPE_JOBS = os.getenv("SCRAPE_JOBS")
+SCHEDULER_JITTER = float(os.getenv("SCHEDULER_JITTER", "0.1"))
+SCHEDULER_POLL = float(os.getenv("SCHEDULER_POLL", "60"))
+
+DETAIL_SCRAPE = os.getenv("DETAIL_SCRAPE", "0") == "1"
+DETAIL_CONCURRENCY = int(os.getenv("DETAIL_CONCURRENCY", "2"))
+DETAIL_BATCH_SIZE = int(os.getenv("DETAIL_BATCH_SIZE", "200"))
+EMBED_BODY = os.getenv("EMBED_BODY", "0") == "1"
+EMBED_BODY_CHARS = int(os.getenv("EMBED_BODY_CHARS", "2000"))
+
+RESPONSE_CACHE = os.getenv("RESPONSE_CACHE", "memory")
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "300"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
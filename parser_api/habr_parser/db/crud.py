@@ -1,46 +1,49 @@
 """This module contains crud function of db models"""
 
+from datetime import datetime
+from operator import itemgetter
+from typing import AsyncIterator
+from typing import Iterator
+
 from sqlalchemy import select, update, delete
+from sqlalchemy import cast
+from sqlalchemy import func
+from sqlalchemy import literal_column
+from sqlalchemy import or_
+from sqlalchemy import true
+from sqlalchemy import tuple_
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from habr_parser.config import EMBED_BODY
+from habr_parser.config import STREAM_BATCH_SIZE
 from habr_parser.db.models import Article
 from habr_parser.db.models import Hub
 from habr_parser.db.models import ArticleHub
-
-
-async def get_or_create_hub(session: AsyncSession, name: str) -> Hub:
-    """Find the hub ot create a new one."""
-
-    result = await session.execute(select(Hub).where(Hub.name == name))
-    hub = result.scalar_one_or_none()
-    if not hub:
-        hub = Hub(name=name)
-        session.add(hub)
-        await session.flush()
-    return hub
+from habr_parser.db.models import ArticleEmbedding
+from habr_parser.db.models import ArticleBody
+from habr_parser.db.hub_cache import hub_cache
 
 
 async def save_article(session: AsyncSession, article_data: dict) -> dict:
     """Save the articles to the database."""
     hubs_names = article_data.pop("hubs", [])
-    article = Article(**article_data)
+    article = Article(**article_data, hub_names=" ".join(hubs_names))
     session.add(article)
     await session.flush()
 
-    for name in hubs_names:
-        hub = await get_or_create_hub(session, name)
-        link = ArticleHub(article=article, hub=hub)
+    hub_ids = await hub_cache.resolve(session, hubs_names)
+    for hub_id in hub_ids.values():
+        link = ArticleHub(article=article, hub_id=hub_id)
         session.add(link)
 
     await session.commit()
 
-    stmt = select(Article).options(
-        selectinload(Article.articles_hubs).selectinload(ArticleHub.hub)
-    ).where(Article.id == article.id)
-
-    result = await session.execute(stmt)
-    article = result.unique().scalar_one()
+    article = await read_article(session, article.id)
 
     return {
         "id": article.id,
@@ -58,12 +61,15 @@ async def save_article(session: AsyncSession, article_data: dict) -> dict:
 
 
 async def read_article(session: AsyncSession, article_id: int) -> Article | None:
-    """Read article from the database."""
-    result = await session.get(
-        Article, article_id,
-        options=[selectinload(Article.articles_hubs).selectinload(ArticleHub.hub)]
+    """Read article with its hubs from the database."""
+    stmt = (
+        select(Article)
+        .options(selectinload(Article.articles_hubs).selectinload(ArticleHub.hub))
+        .where(Article.id == article_id)
+        .execution_options(populate_existing=True)
     )
-    return result
+    result = await session.execute(stmt)
+    return result.scalar_one_or_none()
 
 async def update_article(
     session: AsyncSession,
@@ -72,7 +78,9 @@ async def update_article(
 ) -> Article | None:
     """Update article fields and hubs in the database."""
     
-    article = await session.get(Article, article_id)
+    article = await session.get(
+        Article, article_id, options=[selectinload(Article.articles_hubs)]
+    )
     if not article:
         return None
 
@@ -83,18 +91,24 @@ async def update_article(
 
         setattr(article, key, value)
 
+    if "title" in new_data or "hubs" in new_data:
+        # The embedded text changed, the next embedding pass recomputes it.
+        await session.execute(
+            delete(ArticleEmbedding).where(ArticleEmbedding.article_id == article_id)
+        )
+
     if "hubs" in new_data:
         hubs_names = new_data["hubs"]
 
         article.articles_hubs.clear()
+        article.hub_names = " ".join(hubs_names)
 
-        for hub_name in hubs_names:
-            hub = await get_or_create_hub(session, hub_name)
-            article.articles_hubs.append(ArticleHub(hub=hub))
+        hub_ids = await hub_cache.resolve(session, hubs_names)
+        for hub_id in hub_ids.values():
+            article.articles_hubs.append(ArticleHub(hub_id=hub_id))
 
     await session.commit()
-    await session.refresh(article)
-    return article
+    return await read_article(session, article_id)
 
 async def delete_article(session: AsyncSession, article_id: int) -> None:
     """Remove article from the database by id."""
@@ -104,23 +118,253 @@ async def delete_article(session: AsyncSession, article_id: int) -> None:
         await session.commit()
 
 
-async def read_all_articles(session: AsyncSession) -> list[Article] | None:
-    """Read all article from the database."""
-    stmt = select(Article)
+def select_article_rows():
+    """
+    Select articles as rows of the columns the API returns.
+
+    Hubs come in the same statement, as `hubs_ids`/`hubs_names` arrays
+    (aligned, ordered by hub id) aggregated by a lateral subquery, so no
+    relationship is loaded.
+    """
+    hubs = (
+        select(
+            func.array_agg(aggregate_order_by(Hub.id, Hub.id)).label("hubs_ids"),
+            func.array_agg(aggregate_order_by(Hub.name, Hub.id)).label("hubs_names"),
+        )
+        .select_from(ArticleHub)
+        .join(Hub, Hub.id == ArticleHub.hub_id)
+        .where(ArticleHub.article_id == Article.id)
+        .lateral("article_hubs")
+    )
+    return (
+        select(
+            Article.id, Article.title, Article.url, Article.votes, Article.author,
+            Article.published, Article.views, Article.comments, Article.is_top,
+            hubs.c.hubs_ids, hubs.c.hubs_names,
+        )
+        .select_from(Article)
+        .join(hubs, true())
+    )
+
+
+async def read_article_row(session: AsyncSession, article_id: int) -> Row | None:
+    """Read one article row (see `select_article_rows`)."""
+    result = await session.execute(select_article_rows().where(Article.id == article_id))
+    return result.one_or_none()
+
+
+def _articles_newest_first():
+    return select_article_rows().order_by(Article.published.desc(), Article.id.desc())
+
+
+async def read_article_urls(session: AsyncSession) -> set[str]:
+    """Read urls of all stored articles."""
+    result = await session.execute(select(Article.url))
+    return set(result.scalars())
+
+
+async def read_articles_page(
+    session: AsyncSession,
+    limit: int,
+    after: tuple[datetime, int] | None = None,
+) -> list[Row]:
+    """Read one page of article rows, newest first, after the given (published, id) key."""
+    stmt = _articles_newest_first().limit(limit)
+    if after is not None:
+        stmt = stmt.where(tuple_(Article.published, Article.id) < tuple_(*after))
     result = await session.execute(stmt)
-    return result.scalars().unique()
+    return list(result.all())
 
-async def save_articles_to_db(session: AsyncSession, articles: list[dict]) -> list[Article]:
-    """Save articles to database."""
 
-    saved_articles = []
+def _search_query(q: str):
+    """tsquery matching `q` as Russian or English web search syntax."""
+    return func.websearch_to_tsquery(cast("russian", REGCONFIG), q).op("||")(
+        func.websearch_to_tsquery(cast("english", REGCONFIG), q)
+    )
+
+
+async def search_articles(
+    session: AsyncSession,
+    q: str,
+    limit: int,
+    after: tuple[float, int] | None = None,
+) -> list[Row]:
+    """
+    Full-text search over titles and hubs, best matches first.
+
+    Returns one page of article rows with their `rank` after the given
+    (rank, id) key.
+    """
+    query = _search_query(q)
+    rank = func.ts_rank_cd(Article.search_vector, query)
+    stmt = (
+        select_article_rows()
+        .add_columns(rank.label("rank"))
+        .where(Article.search_vector.op("@@")(query))
+        .order_by(rank.desc(), Article.id.desc())
+        .limit(limit)
+    )
+    if after is not None:
+        stmt = stmt.where(tuple_(rank, Article.id) < tuple_(*after))
+    result = await session.execute(stmt)
+    return list(result.all())
+
 
+async def stream_all_articles(session: AsyncSession) -> AsyncIterator[Row]:
+    """Stream all article rows, newest first, from a server-side cursor."""
+    stmt = _articles_newest_first().execution_options(yield_per=STREAM_BATCH_SIZE)
+    result = await session.stream(stmt)
+    async for row in result:
+        yield row
+
+# Keeps every multi-row statement well below the bind parameter limit.
+BULK_CHUNK_SIZE = 1000
+
+ARTICLE_REQUIRED_FIELDS = ("title", "url", "author", "published")
+
+# Columns that change between scrapes of the same article.
+ARTICLE_MUTABLE_FIELDS = ("votes", "views", "comments", "is_top")
+
+
+def _chunks(items: list, size: int = BULK_CHUNK_SIZE) -> Iterator[list]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+async def bulk_save_articles(session: AsyncSession, articles: list[dict]) -> dict[str, int]:
+    """
+    Insert or update a batch of scraped articles with their hubs.
+
+    Articles are upserted on `url`: new ones are inserted with their hubs,
+    already stored ones only get their mutable counters updated in place,
+    and rows whose counters did not change are not written at all. Hubs are
+    resolved through the hub cache and links upserted on the
+    (article_id, hub_id) key, a chunk of rows per statement and one
+    transaction for the whole batch.
+    Returns inserted/updated/unchanged/skipped counts.
+    """
+
+    rows: dict[str, dict] = {}
+    hubs_by_url: dict[str, list[str]] = {}
+    skipped = 0
     for article in articles:
-        try:
-            saved = await save_article(session, article)
-            saved_articles.append(saved)
-        except Exception as e:
-            await session.rollback()
-            print(f"⚠️ Erorr while saving {article.get('title')}: {e}")
-
-    return saved_articles
+        if any(article.get(field) is None for field in ARTICLE_REQUIRED_FIELDS):
+            print(f"⚠️ Skipping incomplete article {article.get('url')}")
+            skipped += 1
+            continue
+        data = dict(article)
+        hubs_by_url[data["url"]] = data.pop("hubs", [])
+        data["hub_names"] = " ".join(hubs_by_url[data["url"]])
+        # ON CONFLICT cannot touch the same row twice in one statement.
+        rows[data["url"]] = data
+
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0, "skipped": skipped}
+    if not rows:
+        return counts
+
+    try:
+        ids_by_url: dict[str, int] = {}
+        # Rows are locked in key order, so concurrent batches over the same
+        # articles wait for each other instead of deadlocking.
+        for chunk in _chunks(sorted(rows.values(), key=itemgetter("url"))):
+            stmt = insert(Article).values(chunk)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Article.url],
+                set_={
+                    field: stmt.excluded[field] for field in ARTICLE_MUTABLE_FIELDS
+                },
+                where=or_(*(
+                    getattr(Article, field).is_distinct_from(stmt.excluded[field])
+                    for field in ARTICLE_MUTABLE_FIELDS
+                )),
+            ).returning(Article.id, Article.url, literal_column("xmax = 0"))
+            returned = 0
+            for article_id, url, inserted in await session.execute(stmt):
+                returned += 1
+                if inserted:
+                    ids_by_url[url] = article_id
+                    counts["inserted"] += 1
+                else:
+                    counts["updated"] += 1
+            counts["unchanged"] += len(chunk) - returned
+
+        # Hubs of already stored articles are left as they are.
+        hubs_by_url = {url: hubs_by_url[url] for url in ids_by_url}
+        hub_ids = await hub_cache.resolve(
+            session, {name for names in hubs_by_url.values() for name in names}
+        )
+
+        links = sorted(
+            (
+                {"article_id": ids_by_url[url], "hub_id": hub_ids[name]}
+                for url, names in hubs_by_url.items()
+                for name in set(names)
+            ),
+            key=itemgetter("article_id", "hub_id"),
+        )
+        for chunk in _chunks(links):
+            await session.execute(
+                insert(ArticleHub).values(chunk).on_conflict_do_nothing()
+            )
+
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+
+    return counts
+
+
+async def save_articles_to_db(session: AsyncSession, articles: list[dict]) -> dict[str, int]:
+    """Save articles to database."""
+
+    counts = await bulk_save_articles(session, articles)
+    print(
+        f"Saved articles: {counts['inserted']} inserted, "
+        f"{counts['updated']} updated, {counts['unchanged']} unchanged, "
+        f"{counts['skipped']} skipped"
+    )
+    return counts
+
+
+async def read_articles_without_details(
+    session: AsyncSession, limit: int
+) -> list[tuple[int, str]]:
+    """Read (id, url) of the newest articles that have no stored details."""
+    result = await session.execute(
+        select(Article.id, Article.url)
+        .outerjoin(ArticleBody)
+        .where(ArticleBody.article_id.is_(None))
+        .order_by(Article.published.desc(), Article.id.desc())
+        .limit(limit)
+    )
+    return [tuple(row) for row in result.all()]
+
+
+async def save_article_details(session: AsyncSession, details: list[dict]) -> int:
+    """
+    Upsert article details (article_id, body, tags, reading_time).
+
+    With EMBED_BODY the embeddings of these articles are dropped, so the next
+    embedding pass recomputes them with the body text.
+    """
+    if not details:
+        return 0
+
+    stmt = insert(ArticleBody).values(details)
+    await session.execute(stmt.on_conflict_do_update(
+        index_elements=[ArticleBody.article_id],
+        set_={
+            "body": stmt.excluded.body,
+            "tags": stmt.excluded.tags,
+            "reading_time": stmt.excluded.reading_time,
+            "fetched_at": stmt.excluded.fetched_at,
+        },
+    ))
+    if EMBED_BODY:
+        await session.execute(
+            delete(ArticleEmbedding)
+            .where(ArticleEmbedding.article_id.in_([d["article_id"] for d in details]))
+        )
+    await session.commit()
+    return len(details)
@@ -0,0 +1,90 @@
+"""This module keeps an in-process hub name -> id map for ingestion."""
+
+from typing import Iterable
+
+from sqlalchemy import event
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from habr_parser.db.models import Hub
+
+# session.info key for hubs inserted by a transaction that is not committed yet.
+_PENDING_KEY = "pending_hubs"
+
+
+class HubCache:
+    """
+    Resolves hub names to ids with as few round-trips as possible.
+
+    Known names are answered from memory. Missing names are created with one
+    multi-row INSERT ... ON CONFLICT DO NOTHING RETURNING; names inserted
+    concurrently by another session conflict, are not returned, and are read
+    back with a single SELECT. Ids created by the current transaction are
+    only published to the cache once it commits, so a rollback never leaves
+    ids of rows that do not exist.
+    """
+
+    def __init__(self):
+        self._ids: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    async def warm(self, session: AsyncSession) -> None:
+        """Load every stored hub into the cache."""
+        result = await session.execute(select(Hub.name, Hub.id))
+        self._ids.update(result.all())
+
+    async def resolve(self, session: AsyncSession, names: Iterable[str]) -> dict[str, int]:
+        """Return ids of the given hub names, creating the missing hubs."""
+        names = set(names)
+        pending = session.sync_session.info.get(_PENDING_KEY, {})
+        resolved = {
+            name: self._ids.get(name) or pending.get(name)
+            for name in names
+        }
+        missing = sorted(name for name, hub_id in resolved.items() if hub_id is None)
+        if not missing:
+            return resolved
+
+        # Sorted inserts keep concurrent batches from deadlocking on the index.
+        result = await session.execute(
+            insert(Hub)
+            .values([{"name": name} for name in missing])
+            .on_conflict_do_nothing(index_elements=[Hub.name])
+            .returning(Hub.name, Hub.id)
+        )
+        created = dict(result.all())
+        session.sync_session.info.setdefault(_PENDING_KEY, {}).update(created)
+        resolved.update(created)
+
+        lost = [name for name in missing if name not in created]
+        if lost:
+            result = await session.execute(
+                select(Hub.name, Hub.id).where(Hub.name.in_(lost))
+            )
+            existing = dict(result.all())
+            self._ids.update(existing)
+            resolved.update(existing)
+
+        return resolved
+
+    def publish(self, created: dict[str, int]) -> None:
+        self._ids.update(created)
+
+
+hub_cache = HubCache()
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending_hubs(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        hub_cache.publish(pending)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending_hubs(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -6,12 +6,22 @@ from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy.orm import relationship
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
+from sqlalchemy import BigInteger
 from sqlalchemy import Integer
 from sqlalchemy import String
 from sqlalchemy import ForeignKey
 from sqlalchemy import DateTime
 from sqlalchemy import Boolean
+from sqlalchemy import Float
 from sqlalchemy import CheckConstraint
+from sqlalchemy import Index
+from sqlalchemy import LargeBinary
+from sqlalchemy import Sequence
+from sqlalchemy import Text
+from sqlalchemy import func
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.ext.asyncio import AsyncAttrs
 
 
@@ -27,14 +37,19 @@ class ArticleHub(Base):
     article_id: Mapped[int] = mapped_column(ForeignKey("articles.id"), primary_key=True)
     hub_id: Mapped[int] = mapped_column(ForeignKey("hubs.id"), primary_key=True)
 
+    # The primary key only serves lookups by article; hub filters need this one.
+    __table_args__ = (
+        Index("ix_articles_hubs_hub_id", "hub_id"),
+    )
+
     article: Mapped["Article"] = relationship(
         back_populates="articles_hubs",
-        lazy="selectin"
+        lazy="raise"
         )
 
     hub: Mapped["Hub"] = relationship(
         back_populates="articles_hubs",
-        lazy="selectin"
+        lazy="raise"
         )
 
 
@@ -45,7 +60,7 @@ class Article(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     title: Mapped[str] = mapped_column(String, nullable=False)
-    url: Mapped[str] = mapped_column(String, nullable=False)
+    url: Mapped[str] = mapped_column(String, nullable=False, unique=True, index=True)
     votes: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     author: Mapped[str] = mapped_column(String, nullable=False)
     published: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
@@ -55,15 +70,28 @@ class Article(Base):
     articles_hubs: Mapped[list["ArticleHub"]] = relationship(
         back_populates="article",
         cascade="all, delete-orphan",
-        lazy="selectin"
+        lazy="raise"
     )
 
     is_top: Mapped[bool] = mapped_column(Boolean, nullable=False)
 
+    # Hub names joined by spaces, kept in sync with articles_hubs for search.
+    hub_names: Mapped[str] = mapped_column(String, nullable=False, server_default="")
+    # Weighted title + hub_names vector, filled by the
+    # articles_search_vector_update trigger on every insert and update.
+    search_vector: Mapped[str | None] = mapped_column(TSVECTOR, deferred=True)
+
     __table_args__ = (
         CheckConstraint('votes >= 0', name='votes_non_negative'),
         CheckConstraint('views >= 0', name='views_non_negative'),
         CheckConstraint('comments >= 0', name='comments_non_negative'),
+        Index("ix_articles_published_id", "published", "id"),
+        Index("ix_articles_views", "views"),
+        Index(
+            "ix_articles_top_published", "published", "id",
+            postgresql_where=text("is_top"),
+        ),
+        Index("ix_articles_search_vector", "search_vector", postgresql_using="gin"),
     )
 
     @property
@@ -80,9 +108,86 @@ class Hub(Base):
 
     articles_hubs: Mapped[list["ArticleHub"]] = relationship(
         back_populates="hub",
-        lazy="selectin"
+        lazy="raise"
     )
 
     @property
     def articles(self) -> list["Article"]:
         return [link.article for link in self.articles_hubs]
+
+
+EMBEDDING_VERSION_SEQ = Sequence("article_embeddings_version_seq")
+
+
+class ArticleEmbedding(Base):
+    """Represents a text embedding of an Article (float32 vector bytes)."""
+
+    __tablename__ = "article_embeddings"
+    article_id: Mapped[int] = mapped_column(
+        ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True
+    )
+    model: Mapped[str] = mapped_column(String, nullable=False)
+    embedding: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    # Drawn anew on every (re-)embedding, so other processes notice changed vectors.
+    version: Mapped[int] = mapped_column(
+        BigInteger, EMBEDDING_VERSION_SEQ,
+        nullable=False, server_default=EMBEDDING_VERSION_SEQ.next_value(),
+    )
+
+
+class ArticleNeighbour(Base):
+    """Represents a precomputed similar article (rank 0 is the most similar)."""
+
+    __tablename__ = "article_neighbours"
+    article_id: Mapped[int] = mapped_column(
+        ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True
+    )
+    rank: Mapped[int] = mapped_column(Integer, primary_key=True)
+    neighbour_id: Mapped[int] = mapped_column(
+        ForeignKey("articles.id", ondelete="CASCADE"), nullable=False
+    )
+    score: Mapped[float] = mapped_column(Float, nullable=False)
+
+    __table_args__ = (
+        Index("ix_article_neighbours_neighbour_id", "neighbour_id"),
+    )
+
+
+class ArticleBody(Base):
+    """Represents details scraped from the page of an Article."""
+
+    __tablename__ = "article_bodies"
+    article_id: Mapped[int] = mapped_column(
+        ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True
+    )
+    body: Mapped[str] = mapped_column(Text, nullable=False)
+    tags: Mapped[list[str]] = mapped_column(ARRAY(String), nullable=False, default=list)
+    reading_time: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    fetched_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+
+class ScrapeJobState(Base):
+    """Represents the last run of a scheduled scrape job."""
+
+    __tablename__ = "scrape_jobs"
+    name: Mapped[str] = mapped_column(String, primary_key=True)
+    last_started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    last_finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    last_status: Mapped[str | None] = mapped_column(String)
+    last_error: Mapped[str | None] = mapped_column(Text)
+    next_run_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+
+
+class NeighboursRefresh(Base):
+    """Represents the progress of the last neighbour refresh (a single row)."""
+
+    __tablename__ = "neighbours_refresh"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    state: Mapped[str] = mapped_column(String, nullable=False)
+    total: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    processed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    error: Mapped[str | None] = mapped_column(Text)
@@ -5,9 +5,14 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
-from habr_parser.config import BASE_URL, NUM_PAGE, INTERVAL
 from habr_parser.api import routes
-from habr_parser.services.scraper import get_daily_articles
+from habr_parser.api.caching import ResponseCacheMiddleware
+from habr_parser.db.database import get_session_context
+from habr_parser.db.hub_cache import hub_cache
+from habr_parser.services.response_cache import invalidation_listener
+from habr_parser.services.scheduler import Scheduler
+from habr_parser.services.scheduler import load_jobs
+from habr_parser.services.scraper import shutdown_parse_pool
 import logging
 
 
@@ -15,25 +20,26 @@ import logging
 async def lifespan(app: FastAPI):
     """Startup/shutdown context for FastAPI."""
 
-    async def scraper_loop():
-        while True:
-            try:
-                print("Fetching articles from Habr...")
-                await get_daily_articles(BASE_URL, NUM_PAGE)
-                print("Done! Sleeping...")
-            except Exception as e:
-                print(f"Scraper error: {e}")
-            await asyncio.sleep(INTERVAL)
-
     logging.basicConfig()
     logging.getLogger("sqlalchemy.engine").setLevel(logging.DEBUG)
-    task = asyncio.create_task(scraper_loop())
-    yield
+    try:
+        async with get_session_context() as session:
+            await hub_cache.warm(session)
+        print(f"Hub cache warmed with {len(hub_cache)} hubs.")
+    except Exception as e:
+        print(f"Hub cache warm-up error: {e}")
+    scheduler = Scheduler(load_jobs())
+    print(f"Scheduled scrape jobs: {', '.join(job.name for job in scheduler.jobs)}")
+    task = asyncio.create_task(scheduler.run_forever())
+    async with invalidation_listener():
+        yield
     task.cancel()
     try:
         await task
     except asyncio.CancelledError:
-        print("Scraper task cancelled.")
+        print("Scheduler task cancelled.")
+    shutdown_parse_pool()
 
 app = FastAPI(title="Habr Scraper API", lifespan = lifespan)
+app.add_middleware(ResponseCacheMiddleware)
 app.include_router(routes.router)
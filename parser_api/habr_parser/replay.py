@@ -0,0 +1,266 @@
+"""
+Replay archived scrapes through the parse -> process -> bulk save pipeline,
+without touching the network.
+
+Inputs are article archives written by `services.archive`
+(`*.ndjson.gz` / `*.ndjson.zst`) and raw listing pages (`*.html`,
+`*.html.gz`), given as files or directories. Files are read and processed
+`--workers` at a time, but saved strictly in file name order, which is
+chronological for archives: the counters of a newer snapshot always win.
+Progress is checkpointed after every saved batch, so an interrupted replay
+resumes where it stopped.
+
+Usage:
+    python -m habr_parser.replay data/archive [--workers 4] [--batch-size 1000]
+        [--checkpoint data/replay-checkpoint.json] [--embed]
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Iterator
+
+from habr_parser.config import PARSE_WORKERS
+from habr_parser.db import crud
+from habr_parser.db.database import get_session_context
+from habr_parser.db.hub_cache import hub_cache
+from habr_parser.services import embeddings
+from habr_parser.services import neighbours
+from habr_parser.services import processor
+from habr_parser.services.archive import iter_archive
+from habr_parser.services.response_cache import invalidate_responses
+from habr_parser.services.scraper import get_parser
+
+logger = logging.getLogger("habr_parser.replay")
+
+ARCHIVE_SUFFIXES = (".ndjson.gz", ".ndjson.zst")
+PAGE_SUFFIXES = (".html", ".html.gz")
+
+# Processed batches a file may read ahead of the one being saved.
+READ_AHEAD_BATCHES = 2
+
+
+def find_inputs(paths: list[str]) -> list[Path]:
+    """Expand directories into the archive and page files they contain, oldest first."""
+    found = []
+    for path in (Path(p).resolve() for p in paths):
+        candidates = sorted(path.rglob("*")) if path.is_dir() else [path]
+        found.extend(
+            p for p in candidates
+            if p.is_file() and p.name.endswith(ARCHIVE_SUFFIXES + PAGE_SUFFIXES)
+        )
+    # Archive names carry their date and sequence number, like `archive_files`.
+    return sorted(found, key=lambda p: p.name)
+
+
+def process_records(records: list[dict]) -> list[dict]:
+    """Run archived article records through the processing stage."""
+    return processor.process_articles(records)
+
+
+def process_page(path: str) -> list[dict]:
+    """Parse and process a saved listing page."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        return processor.process_articles(get_parser()(f.read()))
+
+
+class Checkpoint:
+    """Number of records replayed per input file, persisted as JSON."""
+
+    def __init__(self, path: Path | None):
+        self.path = path
+        self.files: dict[str, dict] = {}
+        if path is not None and path.exists():
+            self.files = json.loads(path.read_text(encoding="utf-8"))["files"]
+
+    def done(self, source: Path) -> bool:
+        return self.files.get(str(source), {}).get("done", False)
+
+    def records(self, source: Path) -> int:
+        return self.files.get(str(source), {}).get("records", 0)
+
+    def advance(self, source: Path, records: int, done: bool = False) -> None:
+        entry = self.files.setdefault(str(source), {"records": 0, "done": False})
+        entry["records"] += records
+        entry["done"] = done
+        self.save()
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"files": self.files}, indent=2), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+class Throughput:
+    """Counts saved articles and logs the replay rate."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.articles = 0
+
+    def add(self, articles: int) -> None:
+        self.articles += articles
+        logger.info(
+            "%d articles replayed, %.1f articles/s", self.articles, self.rate()
+        )
+
+    def rate(self) -> float:
+        return self.articles / max(time.perf_counter() - self.started, 1e-9)
+
+
+def _next_batch(records: Iterator[dict], size: int) -> list[dict]:
+    return list(islice(records, size))
+
+
+async def _save(articles: list[dict]) -> None:
+    async with get_session_context() as session:
+        counts = await crud.bulk_save_articles(session, articles)
+    if counts["inserted"] or counts["updated"]:
+        # Shared (Redis) response caches would serve the old rows until they expire.
+        await invalidate_responses()
+
+
+async def read_file(
+    source: Path,
+    pool: ProcessPoolExecutor,
+    checkpoint: Checkpoint,
+    batch_size: int,
+    batches: asyncio.Queue,
+) -> None:
+    """
+    Read and process one input file into `batches`.
+
+    Every item is (articles, records, done), the end of the file is marked
+    with None.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        if source.name.endswith(PAGE_SUFFIXES):
+            articles = await loop.run_in_executor(pool, process_page, str(source))
+            await batches.put((articles, 1, True))
+        else:
+            records = iter_archive([source])
+            skip = checkpoint.records(source)
+            if skip:
+                await asyncio.to_thread(_next_batch, records, skip)
+                logger.info("Resuming %s after %d records", source, skip)
+
+            done = False
+            while not done:
+                batch = await asyncio.to_thread(_next_batch, records, batch_size)
+                articles = await loop.run_in_executor(pool, process_records, batch) if batch else []
+                done = len(batch) < batch_size
+                await batches.put((articles, len(batch), done))
+    except Exception:
+        # Wakes the saver up, which then raises the error from the task.
+        await batches.put(None)
+        raise
+    await batches.put(None)
+
+
+async def save_file(
+    source: Path,
+    batches: asyncio.Queue,
+    checkpoint: Checkpoint,
+    meter: Throughput,
+) -> None:
+    """Save the batches of one input file as they are processed."""
+    while (item := await batches.get()) is not None:
+        articles, records, done = item
+        if articles:
+            await _save(articles)
+            meter.add(len(articles))
+        checkpoint.advance(source, records, done=done)
+
+
+async def replay(
+    paths: list[str],
+    workers: int = PARSE_WORKERS,
+    batch_size: int = crud.BULK_CHUNK_SIZE,
+    checkpoint_path: Path | None = None,
+    embed: bool = False,
+) -> int:
+    """
+    Replay all inputs with `workers` files in flight. Returns replayed articles.
+
+    Only reading and processing overlap: the upserts overwrite counters
+    unconditionally, so files are saved one after another, oldest first.
+    """
+    checkpoint = Checkpoint(checkpoint_path)
+    sources = [s for s in find_inputs(paths) if not checkpoint.done(s)]
+    logger.info("Replaying %d files with %d workers", len(sources), workers)
+
+    async with get_session_context() as session:
+        await hub_cache.warm(session)
+
+    meter = Throughput()
+    upcoming = iter(sources)
+    in_flight: deque[tuple[Path, asyncio.Queue, asyncio.Task]] = deque()
+
+    def read_next() -> None:
+        source = next(upcoming, None)
+        if source is not None:
+            batches = asyncio.Queue(maxsize=READ_AHEAD_BATCHES)
+            task = asyncio.create_task(
+                read_file(source, pool, checkpoint, batch_size, batches)
+            )
+            in_flight.append((source, batches, task))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        try:
+            for _ in range(workers):
+                read_next()
+            while in_flight:
+                source, batches, task = in_flight.popleft()
+                await save_file(source, batches, checkpoint, meter)
+                # Raises the error the file was cut short by, if any.
+                await task
+                read_next()
+        finally:
+            for _, _, task in in_flight:
+                task.cancel()
+
+    if embed:
+        async with get_session_context() as session:
+            logger.info("Embedded %d articles", await embeddings.embed_missing_articles(session))
+            logger.info("Refreshed neighbours of %d articles", await neighbours.refresh_neighbours(session))
+
+    logger.info(
+        "Replay finished: %d articles, %.1f articles/s", meter.articles, meter.rate()
+    )
+    return meter.articles
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("paths", nargs="+", help="archive/page files or directories")
+    parser.add_argument("--workers", type=int, default=PARSE_WORKERS)
+    parser.add_argument("--batch-size", type=int, default=crud.BULK_CHUNK_SIZE)
+    parser.add_argument("--checkpoint", type=Path, default=None)
+    parser.add_argument(
+        "--embed", action="store_true",
+        help="embed replayed articles and refresh neighbours (needs the model locally)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    asyncio.run(replay(
+        args.paths, args.workers, args.batch_size, args.checkpoint, args.embed
+    ))
+
+
+if __name__ == "__main__":
+    main()
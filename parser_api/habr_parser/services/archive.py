@@ -0,0 +1,150 @@
+"""
+This module archives scraped articles as compressed NDJSON files.
+
+Files are named `<prefix>-<YYYY-MM-DD>-<seq>.ndjson.<gz|zst>` and hold one
+JSON object per line. A new file is started every UTC day and whenever the
+current one reaches the size limit.
+"""
+
+import gzip
+import io
+import json
+import logging
+from datetime import date
+from datetime import datetime
+from datetime import timezone
+from pathlib import Path
+from typing import IO, Iterable, Iterator
+
+from habr_parser.config import ARCHIVE_COMPRESSION
+from habr_parser.config import ARCHIVE_DIR
+from habr_parser.config import ARCHIVE_MAX_BYTES
+
+logger = logging.getLogger(__name__)
+
+EXTENSIONS = {"gzip": "gz", "zstd": "zst"}
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise RuntimeError("zstd archives require the 'zstandard' package") from e
+    return zstandard
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+class ArchiveWriter:
+    """Streams records into rotating compressed NDJSON files."""
+
+    def __init__(
+        self,
+        directory: str | Path = ARCHIVE_DIR,
+        compression: str = ARCHIVE_COMPRESSION,
+        max_bytes: int = ARCHIVE_MAX_BYTES,
+        prefix: str = "articles",
+    ):
+        if compression not in EXTENSIONS:
+            raise ValueError(
+                f"Unknown archive compression {compression!r}, "
+                f"expected one of {sorted(EXTENSIONS)}"
+            )
+        self.directory = Path(directory)
+        self.compression = compression
+        self.max_bytes = max_bytes
+        self.prefix = prefix
+        self.path: Path | None = None
+        self._day: date | None = None
+        self._raw: IO[bytes] | None = None
+        self._stream: IO[bytes] | None = None
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def write(self, records: Iterable[dict]) -> None:
+        """Append records, one JSON line each."""
+        for record in records:
+            if self._needs_rotation():
+                self._open_next()
+            line = json.dumps(record, ensure_ascii=False, default=_json_default)
+            self._stream.write(line.encode("utf-8") + b"\n")
+
+    def close(self) -> None:
+        """Finish the current file."""
+        if self._stream is not None:
+            self._stream.close()
+            self._raw.close()
+            self._stream = self._raw = None
+
+    def _needs_rotation(self) -> bool:
+        return (
+            self._stream is None
+            or self._day != _today()
+            # Compressed bytes flushed to disk so far.
+            or self._raw.tell() >= self.max_bytes
+        )
+
+    def _open_next(self) -> None:
+        self.close()
+        self._day = _today()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stem = f"{self.prefix}-{self._day.isoformat()}"
+        suffix = f".ndjson.{EXTENSIONS[self.compression]}"
+        seq = max(
+            (int(p.name[len(stem) + 1:-len(suffix)])
+             for p in self.directory.glob(f"{stem}-*{suffix}")),
+            default=0,
+        )
+        self.path = self.directory / f"{stem}-{seq + 1:04d}{suffix}"
+        self._raw = open(self.path, "xb")
+        if self.compression == "zstd":
+            self._stream = _zstandard().ZstdCompressor().stream_writer(self._raw, closefd=False)
+        else:
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode="wb")
+        logger.info("Writing archive %s", self.path)
+
+
+def archive_files(directory: str | Path = ARCHIVE_DIR, prefix: str = "articles") -> list[Path]:
+    """Archive files of the given prefix, oldest first."""
+    files = [
+        p for ext in EXTENSIONS.values()
+        for p in Path(directory).glob(f"{prefix}-*.ndjson.{ext}")
+    ]
+    return sorted(files, key=lambda p: p.name)
+
+
+def _open_archive(path: Path) -> IO[bytes]:
+    if path.suffix == ".zst":
+        raw = open(path, "rb")
+        return io.BufferedReader(_zstandard().ZstdDecompressor().stream_reader(
+            raw, read_across_frames=True, closefd=True
+        ))
+    return gzip.open(path, "rb")
+
+
+def iter_archive(paths: Iterable[str | Path]) -> Iterator[dict]:
+    """
+    Lazily yield records from archive files, in order.
+
+    A file cut short by a crash is read up to its last complete line.
+    """
+    for path in map(Path, paths):
+        with _open_archive(path) as stream:
+            try:
+                for line in stream:
+                    if line.endswith(b"\n"):
+                        yield json.loads(line)
+            except (EOFError, OSError) as e:
+                logger.warning("Archive %s is truncated: %s", path, e)
@@ -1,41 +1,118 @@
 """This module contains function to filter articles."""
 
+from datetime import datetime
 from typing import Sequence
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy import tuple_
 
 from habr_parser.db import models
+from habr_parser.db.crud import select_article_rows
+
+SORT_COLUMNS = {
+    "published": models.Article.published,
+    "votes": models.Article.votes,
+    "views": models.Article.views,
+    "comments": models.Article.comments,
+}
 
 
 async def filter_articles_by_tag(
     session: AsyncSession, tag_name: str
-) -> Sequence[models.Article]:
-    """Return all articles that have given hub/tag."""
+) -> Sequence[Row]:
+    """Return rows of all articles that have given hub/tag."""
 
-    stmt = (
-        select(models.Article)
-        .join(models.Article.articles_hubs)
-        .join(models.ArticleHub.hub)
-        .where(models.Hub.name == tag_name)
-    )
-    
+    stmt = select_article_rows().where(_in_hubs([tag_name]))
     result = await session.execute(stmt)
-    return result.scalars().all()
+    return result.all()
 
 
 async def filter_articles_by_views(
     session: AsyncSession, min_views: int
-) -> Sequence[models.Article]:
-    """Return all articles with views >= min_views."""
+) -> Sequence[Row]:
+    """Return rows of all articles with views >= min_views."""
+
+    stmt = select_article_rows().where(models.Article.views >= min_views)
+    result = await session.execute(stmt)
+    return result.all()
+
 
-    stmt = select(models.Article).where(models.Article.views >= min_views)
+async def filter_articles_by_tops(session: AsyncSession) -> Sequence[Row]:
+    """Return rows of all articles with is_top eqaul to True."""
+
+    stmt = select_article_rows().where(models.Article.is_top)
     result = await session.execute(stmt)
-    return result.scalars().all()
+    return result.all()
+
+
+def _in_hubs(names: list[str]):
+    """Condition that an article is linked to a hub with one of the names."""
+    return (
+        select(models.ArticleHub.article_id)
+        .join(models.Hub, models.Hub.id == models.ArticleHub.hub_id)
+        .where(models.ArticleHub.article_id == models.Article.id)
+        .where(models.Hub.name.in_(names))
+        .exists()
+    )
+
+
+async def query_articles(
+    session: AsyncSession,
+    *,
+    hub: Sequence[str] = (),
+    any_hub: Sequence[str] = (),
+    author: str | None = None,
+    is_top: bool | None = None,
+    min_views: int | None = None,
+    max_views: int | None = None,
+    min_votes: int | None = None,
+    max_votes: int | None = None,
+    min_comments: int | None = None,
+    max_comments: int | None = None,
+    published_from: datetime | None = None,
+    published_to: datetime | None = None,
+    sort: str = "published",
+    limit: int,
+    after: tuple[datetime | int, int] | None = None,
+) -> Sequence[Row]:
+    """
+    Return one page of article rows matching all given filters as one query.
+
+    Articles are sorted by `sort` (descending) and id, `after` is the
+    (sort value, id) key of the last article of the previous page.
+    """
+    Article = models.Article
+    sort_column = SORT_COLUMNS[sort]
+
+    stmt = (
+        select_article_rows()
+        .order_by(sort_column.desc(), Article.id.desc())
+        .limit(limit)
+    )
 
+    for name in dict.fromkeys(hub):
+        stmt = stmt.where(_in_hubs([name]))
+    if any_hub:
+        stmt = stmt.where(_in_hubs(list(any_hub)))
 
-async def filter_articles_by_tops(session: AsyncSession) -> Sequence[models.Article]:
-    """Return all articles with is_top eqaul to True."""
+    ranges = [
+        (Article.views, min_views, max_views),
+        (Article.votes, min_votes, max_votes),
+        (Article.comments, min_comments, max_comments),
+        (Article.published, published_from, published_to),
+    ]
+    for column, low, high in ranges:
+        if low is not None:
+            stmt = stmt.where(column >= low)
+        if high is not None:
+            stmt = stmt.where(column <= high)
+    if author is not None:
+        stmt = stmt.where(Article.author == author)
+    if is_top is not None:
+        stmt = stmt.where(Article.is_top.is_(is_top))
+    if after is not None:
+        stmt = stmt.where(tuple_(sort_column, Article.id) < tuple_(*after))
 
-    stmt = select(models.Article).where(models.Article.is_top)
     result = await session.execute(stmt)
-    return result.scalars().all()
+    return result.all()
@@ -0,0 +1,235 @@
+"""This module computes and stores article embeddings for recommendations."""
+
+import asyncio
+import time
+from decimal import Decimal
+
+import numpy as np
+from sqlalchemy import delete
+from sqlalchemy import func
+from sqlalchemy import null
+from sqlalchemy import or_
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from habr_parser.config import EMBED_BODY
+from habr_parser.config import EMBED_BODY_CHARS
+from habr_parser.config import EMBEDDING_BATCH_SIZE
+from habr_parser.config import EMBEDDING_BATCH_TICK
+from habr_parser.config import EMBEDDING_INDEX_MAX_AGE
+from habr_parser.config import EMBEDDING_MODEL
+from habr_parser.db import models
+from habr_parser.services import processor_recomended
+from habr_parser.services.vector_index import VectorIndex
+from habr_parser.services.vector_index import create_index
+
+
+class EncodeBatcher:
+    """
+    Coalesces concurrent encode requests into one model call per tick.
+
+    Callers awaiting `encode` within the same tick share a single
+    `encode_texts` call, run in a worker thread one batch at a time, and
+    each gets back the rows of its own texts.
+    """
+
+    def __init__(self, tick: float = EMBEDDING_BATCH_TICK):
+        self.tick = tick
+        self._pending: list[tuple[list[str], asyncio.Future]] = []
+        self._flush_task: asyncio.Task | None = None
+        self._encode_lock = asyncio.Lock()
+
+    async def encode(self, texts: list[str]) -> np.ndarray:
+        """Encode texts together with the other requests of this tick."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((texts, future))
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush())
+        return await future
+
+    async def _flush(self) -> None:
+        await asyncio.sleep(self.tick)
+        async with self._encode_lock:
+            pending, self._pending, self._flush_task = self._pending, [], None
+            texts = [text for batch, _ in pending for text in batch]
+            try:
+                vectors = await asyncio.to_thread(processor_recomended.encode_texts, texts)
+            except Exception as e:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+        offset = 0
+        for batch, future in pending:
+            if not future.done():
+                future.set_result(vectors[offset:offset + len(batch)])
+            offset += len(batch)
+
+
+encode_batcher = EncodeBatcher()
+
+# Index of this process, the version of every embedding and the (count, sum
+# of versions) of the table it was synced at, and when that was last
+# checked (monotonic).
+_index: VectorIndex | None = None
+_index_versions: dict[int, int] = {}
+_index_fingerprint: tuple[int, Decimal | None] | None = None
+_index_checked_at = 0.0
+
+
+def article_text(article: models.Article, body: str | None = None) -> str:
+    """Text of an article that is embedded (title + hubs, then the body start)."""
+    text = f"{article.title} {' '.join([h.name for h in article.hubs])}"
+    if body:
+        text = f"{text} {body[:EMBED_BODY_CHARS]}"
+    return text
+
+
+async def embed_missing_articles(
+    session: AsyncSession,
+    batch_size: int = EMBEDDING_BATCH_SIZE,
+    article_ids: list[int] | None = None,
+) -> int:
+    """
+    Embed articles that have no embedding for the configured model.
+
+    Articles embedded with another model are re-embedded, so changing
+    EMBEDDING_MODEL re-embeds the whole corpus. With EMBED_BODY the scraped
+    body text (if any) is embedded too. `article_ids` limits the pass to
+    the given articles. Returns number of embedded articles.
+    """
+
+    body = models.ArticleBody.body if EMBED_BODY else null()
+    stmt = (
+        select(models.Article, body)
+        .outerjoin(models.ArticleEmbedding)
+        .where(or_(
+            models.ArticleEmbedding.article_id.is_(None),
+            models.ArticleEmbedding.model != EMBEDDING_MODEL,
+        ))
+        .options(
+            selectinload(models.Article.articles_hubs)
+            .selectinload(models.ArticleHub.hub)
+            .noload(models.Hub.articles_hubs)
+        )
+        .order_by(models.Article.id)
+        .limit(batch_size)
+    )
+    if EMBED_BODY:
+        stmt = stmt.outerjoin(models.ArticleBody)
+    if article_ids is not None:
+        stmt = stmt.where(models.Article.id.in_(article_ids))
+
+    embedded = 0
+    while True:
+        batch = (await session.execute(stmt)).all()
+        if not batch:
+            return embedded
+
+        articles = [article for article, _ in batch]
+        vectors = await encode_batcher.encode([article_text(a, b) for a, b in batch])
+        rows = [
+            {"article_id": a.id, "model": EMBEDDING_MODEL, "embedding": vector.tobytes()}
+            for a, vector in zip(articles, vectors)
+        ]
+        upsert = insert(models.ArticleEmbedding).values(rows)
+        await session.execute(upsert.on_conflict_do_update(
+            index_elements=[models.ArticleEmbedding.article_id],
+            set_={
+                "model": upsert.excluded.model,
+                "embedding": upsert.excluded.embedding,
+                "version": models.EMBEDDING_VERSION_SEQ.next_value(),
+            },
+        ))
+        # Stored neighbours of re-embedded articles are outdated.
+        await session.execute(
+            delete(models.ArticleNeighbour)
+            .where(models.ArticleNeighbour.article_id.in_([a.id for a in articles]))
+        )
+        await session.commit()
+        embedded += len(rows)
+        if _index is not None:
+            _index.add([a.id for a in articles], vectors)
+
+
+async def load_embeddings(
+    session: AsyncSession, article_ids: list[int] | None = None
+) -> tuple[list[int], np.ndarray]:
+    """Load stored embeddings of the configured model as (ids, matrix)."""
+
+    stmt = (
+        select(models.ArticleEmbedding.article_id, models.ArticleEmbedding.embedding)
+        .where(models.ArticleEmbedding.model == EMBEDDING_MODEL)
+        .order_by(models.ArticleEmbedding.article_id)
+    )
+    if article_ids is not None:
+        stmt = stmt.where(models.ArticleEmbedding.article_id.in_(article_ids))
+    rows = (await session.execute(stmt)).all()
+    if not rows:
+        return [], np.empty((0, 0), dtype=np.float32)
+
+    article_ids = [article_id for article_id, _ in rows]
+    matrix = np.frombuffer(b"".join(vector for _, vector in rows), dtype=np.float32)
+    return article_ids, matrix.reshape(len(rows), -1)
+
+
+async def get_index(
+    session: AsyncSession, max_age: float = EMBEDDING_INDEX_MAX_AGE
+) -> VectorIndex:
+    """
+    Return the vector index of stored embeddings, synced with the database.
+
+    The index lives in the process and is updated incrementally: embeddings
+    computed here are added right away. Changes made by other processes are
+    looked for at most every `max_age` seconds. Every (re-)embedding draws
+    a new version from a sequence, so any committed change alters the row
+    count or the sum of versions; then embeddings whose version differs
+    from the indexed one are reloaded and deleted ones dropped. Versions
+    are compared per row, not against a watermark, because transactions
+    commit in a different order than they draw versions.
+    """
+    global _index, _index_versions, _index_fingerprint, _index_checked_at
+
+    now = time.monotonic()
+    if _index is not None and now - _index_checked_at < max_age:
+        return _index
+
+    fingerprint = tuple((await session.execute(
+        select(func.count(), func.sum(models.ArticleEmbedding.version))
+        .where(models.ArticleEmbedding.model == EMBEDDING_MODEL)
+    )).one())
+    if _index is not None and fingerprint == _index_fingerprint:
+        _index_checked_at = now
+        return _index
+
+    # Read before the vectors: a vector newer than its version is only
+    # reloaded once more, an older one would be kept.
+    result = await session.execute(
+        select(models.ArticleEmbedding.article_id, models.ArticleEmbedding.version)
+        .where(models.ArticleEmbedding.model == EMBEDDING_MODEL)
+    )
+    versions = dict(result.all())
+
+    if _index is None:
+        article_ids, matrix = await load_embeddings(session)
+        if not article_ids:
+            raise LookupError("No embeddings stored")
+        index = create_index(matrix.shape[1])
+        index.add(article_ids, matrix)
+        _index = index
+    else:
+        _index.remove(list(_index.ids() - versions.keys()))
+        changed = [
+            article_id for article_id, version in versions.items()
+            if _index_versions.get(article_id) != version
+        ]
+        if changed:
+            _index.add(*await load_embeddings(session, changed))
+
+    _index_versions = versions
+    _index_fingerprint = fingerprint
+    _index_checked_at = now
+    return _index
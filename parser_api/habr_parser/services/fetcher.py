@@ -0,0 +1,170 @@
+"""This module contains async HTTP fetcher for Habr pages."""
+
+import asyncio
+from dataclasses import asdict
+from dataclasses import dataclass
+from datetime import datetime
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+from habr_parser.config import FETCH_BACKOFF
+from habr_parser.config import FETCH_CONCURRENCY
+from habr_parser.config import FETCH_RETRIES
+from habr_parser.config import FETCH_RETRY_AFTER_MAX
+from habr_parser.config import FETCH_TIMEOUT
+from habr_parser.services.page_cache import PageCache
+from habr_parser.services.rate_limiter import SystemClock
+from habr_parser.services.rate_limiter import TokenBucket
+from habr_parser.services.rate_limiter import system_clock
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
+}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+@dataclass
+class FetchMetrics:
+    """Request counters and seconds spent throttled (waiting) vs fetching."""
+    requests: int = 0
+    retries: int = 0
+    throttled: float = 0.0
+    fetching: float = 0.0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+fetch_metrics = FetchMetrics()
+
+
+def retry_after(response: httpx.Response, limit: float = FETCH_RETRY_AFTER_MAX) -> float | None:
+    """Seconds to wait as asked by a `Retry-After` header (delay or HTTP date)."""
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        seconds = (when - datetime.now(timezone.utc)).total_seconds()
+    return min(max(seconds, 0.0), limit)
+
+
+class PageFetcher:
+    """
+    Fetches pages over a shared connection pool.
+
+    At most `concurrency` requests are in flight at once and, with a
+    `rate_limiter`, every request (retries included) takes a token first.
+    Transport errors, timeouts and retryable statuses are retried with
+    exponential backoff; a `Retry-After` answer makes the fetcher wait at
+    least as long and pauses the rate limiter for everyone sharing it.
+    Time is measured and slept with `clock`, so a fake one makes all of
+    this deterministic.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = FETCH_CONCURRENCY,
+        timeout: float = FETCH_TIMEOUT,
+        retries: int = FETCH_RETRIES,
+        backoff: float = FETCH_BACKOFF,
+        rate_limiter: TokenBucket | None = None,
+        metrics: FetchMetrics = fetch_metrics,
+        clock: SystemClock | None = None,
+    ):
+        self.retries = retries
+        self.backoff = backoff
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics
+        if clock is None:
+            clock = rate_limiter.clock if rate_limiter is not None else system_clock
+        self.clock = clock
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._client = httpx.AsyncClient(
+            headers=HEADERS,
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=concurrency,
+                max_keepalive_connections=concurrency,
+            ),
+        )
+
+    async def __aenter__(self) -> "PageFetcher":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the underlying connection pool."""
+        await self._client.aclose()
+
+    async def get(self, url: str, headers: dict[str, str] | None = None) -> httpx.Response:
+        """GET a URL, retrying transient failures. 304 counts as success."""
+        for attempt in range(self.retries + 1):
+            delay = self.backoff * 2 ** attempt
+            try:
+                async with self._semaphore:
+                    if self.rate_limiter is not None:
+                        self.metrics.throttled += await self.rate_limiter.acquire()
+                    started = self.clock.monotonic()
+                    try:
+                        response = await self._client.get(url, headers=headers)
+                    finally:
+                        self.metrics.requests += 1
+                        self.metrics.fetching += self.clock.monotonic() - started
+                if response.status_code != httpx.codes.NOT_MODIFIED:
+                    response.raise_for_status()
+                return response
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                    raise
+                wait = retry_after(e.response)
+                if wait is not None:
+                    delay = max(delay, wait)
+                    if self.rate_limiter is not None:
+                        self.rate_limiter.pause(wait)
+            except httpx.TransportError:
+                if attempt == self.retries:
+                    raise
+            self.metrics.retries += 1
+            self.metrics.throttled += delay
+            await self.clock.sleep(delay)
+
+    async def fetch(self, url: str) -> str:
+        """Fetches HTML page by URL, retrying transient failures."""
+        return (await self.get(url)).text
+
+    async def fetch_cached(self, url: str, cache: PageCache) -> tuple[str, bool]:
+        """
+        Fetches a page with a conditional GET against the page cache.
+
+        Returns the page body and whether it changed since the last fetch:
+        a 304 answer or a body with the same hash counts as unchanged.
+        """
+        response = await self.get(url, headers=cache.conditional_headers(url))
+        if response.status_code == httpx.codes.NOT_MODIFIED:
+            return cache.not_modified(url), False
+        changed = cache.store(
+            url,
+            response.text,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        return response.text, changed
+
+    async def fetch_many(self, urls: list[str]) -> list[str | BaseException]:
+        """Fetches all URLs concurrently, keeping failures in place of pages."""
+        return await asyncio.gather(
+            *(self.fetch(url) for url in urls), return_exceptions=True
+        )
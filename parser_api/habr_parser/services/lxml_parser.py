@@ -0,0 +1,115 @@
+"""
+This module contains fast lxml parsers for Habr pages.
+
+`parse_articles` extracts the same raw fields from listing pages as
+`scraper.parse_articles` using precompiled lxml XPath expressions instead of
+the BeautifulSoup object model. `parse_article_detail` extracts what listing
+cards do not have from an article page.
+"""
+
+import re
+
+from lxml import etree
+from lxml import html
+
+
+def _has_class(name: str) -> str:
+    """XPath predicate equivalent to the CSS `.name` class selector."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+_ARTICLES = etree.XPath(f"//article[{_has_class('tm-articles-list__item')}]")
+_TITLE = etree.XPath("(.//a[@data-article-link='true'])[1]")
+_VOTES = etree.XPath(f"(.//*[{_has_class('tm-votes-meter__value')}])[1]")
+_AUTHOR = etree.XPath(f"(.//*[{_has_class('tm-user-info__username')}])[1]")
+_TIME = etree.XPath("(.//time)[1]")
+_VIEWS = etree.XPath(f"(.//*[{_has_class('tm-icon-counter__value')}])[1]")
+_COMMENTS = etree.XPath(
+    f"(.//*[{_has_class('tm-article-comments-counter-link__value')}])[1]"
+)
+_HUBS = etree.XPath(f".//*[{_has_class('tm-publication-hub__link')}]//span")
+_TEXT = etree.XPath(".//text()")
+
+_BODY = etree.XPath(
+    f"(//*[@id='post-content-body'] | //*[{_has_class('article-formatted-body')}])[1]"
+)
+_TAGS = etree.XPath(
+    f"//*[{_has_class('tm-article-presenter__meta-list')}]"
+    f"//a[{_has_class('tm-tags-list__link')}]"
+)
+_READING_TIME = etree.XPath(f"(//*[{_has_class('tm-article-reading-time__label')}])[1]")
+_SCRIPTS = etree.XPath(".//script | .//style")
+_BLOCKS = etree.XPath(
+    ".//p | .//li | .//br | .//pre | .//blockquote | .//div"
+    " | .//h1 | .//h2 | .//h3 | .//h4 | .//h5 | .//h6"
+)
+_MINUTES = re.compile(r"\d+")
+_SPACES = re.compile(r"\s+")
+
+
+def _first(expr: etree.XPath, node):
+    found = expr(node)
+    return found[0] if found else None
+
+
+def _text(node) -> str:
+    """Same as BeautifulSoup's `get_text(strip=True)`."""
+    return "".join(s.strip() for s in _TEXT(node))
+
+
+def parse_articles(page_content: str) -> list[dict]:
+    """Parses raw article data from HTML (without cleaning)."""
+    if not page_content.strip():
+        return []
+    root = html.document_fromstring(page_content)
+
+    results = []
+    for art in _ARTICLES(root):
+        title_tag = _first(_TITLE, art)
+        votes_tag = _first(_VOTES, art)
+        author_tag = _first(_AUTHOR, art)
+        time_tag = _first(_TIME, art)
+        views_tag = _first(_VIEWS, art)
+        comments_tag = _first(_COMMENTS, art)
+        hubs = [_text(hub) for hub in _HUBS(art)]
+
+        results.append({
+            "title": _text(title_tag) if title_tag is not None else "",
+            "url": "https://habr.com" + str(title_tag.get("href")) if title_tag is not None else "",
+            "votes": int(_text(votes_tag).replace("+", "")) if votes_tag is not None else 0,
+            "author": _text(author_tag) if author_tag is not None else None,
+            "published": time_tag.get("datetime") if time_tag is not None else None,
+            "views": int(views_tag.get("title")) if views_tag is not None and views_tag.get("title") else 0,
+            "comments": int(_text(comments_tag)) if comments_tag is not None else 0,
+            "hubs": [hub for hub in hubs if hub != "*"],
+        })
+    return results
+
+
+def _plain_text(node) -> str:
+    """Text of a node with runs of whitespace collapsed."""
+    return _SPACES.sub(" ", node.text_content()).strip()
+
+
+def parse_article_detail(page_content: str) -> dict:
+    """Parses body text, tags and reading time (minutes) of an article page."""
+    if not page_content.strip():
+        return {"body": "", "tags": [], "reading_time": None}
+    root = html.document_fromstring(page_content)
+
+    body_tag = _first(_BODY, root)
+    if body_tag is not None:
+        for script in _SCRIPTS(body_tag):
+            script.drop_tree()
+        # Blocks glue together in text_content(), keep them apart.
+        for block in _BLOCKS(body_tag):
+            block.tail = " " + (block.tail or "")
+    reading_time_tag = _first(_READING_TIME, root)
+    minutes = _MINUTES.search(_plain_text(reading_time_tag)) if reading_time_tag is not None else None
+    tags = [_plain_text(tag) for tag in _TAGS(root)]
+
+    return {
+        "body": _plain_text(body_tag) if body_tag is not None else "",
+        "tags": list(dict.fromkeys(tag for tag in tags if tag)),
+        "reading_time": int(minutes.group()) if minutes else None,
+    }
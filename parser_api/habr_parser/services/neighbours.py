@@ -0,0 +1,247 @@
+"""
+This module precomputes similar articles into the article_neighbours table,
+so a recommendation is a single indexed lookup.
+
+The similarity work runs in a worker thread, in chunks sized to stay within
+NEIGHBOURS_MEMORY_BYTES, so a refresh in the API process does not block its
+event loop. Progress is stored in the neighbours_refresh table, where every
+worker can read it.
+"""
+
+import asyncio
+import logging
+from dataclasses import asdict
+from dataclasses import dataclass
+from datetime import datetime
+from datetime import timezone
+
+import numpy as np
+from sqlalchemy import delete
+from sqlalchemy import func
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from habr_parser.config import EMBEDDING_MODEL
+from habr_parser.config import NEIGHBOURS_CHUNK_SIZE
+from habr_parser.config import NEIGHBOURS_MEMORY_BYTES
+from habr_parser.config import NEIGHBOURS_TOP_N
+from habr_parser.db import models
+from habr_parser.db.crud import BULK_CHUNK_SIZE
+from habr_parser.db.crud import select_article_rows
+from habr_parser.db.database import get_session_context
+from habr_parser.services import embeddings
+from habr_parser.services.processor_recomended import ArticleRecommender
+from habr_parser.services.vector_index import VectorIndex
+
+logger = logging.getLogger(__name__)
+
+
+# Key of the single neighbours_refresh row.
+PROGRESS_ID = 1
+
+
+@dataclass
+class NeighboursProgress:
+    """Progress of the last neighbour refresh, whichever worker ran it."""
+    state: str = "idle"
+    total: int = 0
+    processed: int = 0
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    error: str | None = None
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+async def _save_progress(progress: NeighboursProgress) -> None:
+    """Store the progress in a transaction of its own."""
+    async with get_session_context() as session:
+        values = progress.as_dict()
+        stmt = insert(models.NeighboursRefresh).values(id=PROGRESS_ID, **values)
+        await session.execute(stmt.on_conflict_do_update(
+            index_elements=[models.NeighboursRefresh.id], set_=values
+        ))
+        await session.commit()
+
+
+async def read_progress(session: AsyncSession) -> NeighboursProgress:
+    """Progress of the last neighbour refresh."""
+    row = await session.get(models.NeighboursRefresh, PROGRESS_ID)
+    if row is None:
+        return NeighboursProgress()
+    return NeighboursProgress(
+        state=row.state,
+        total=row.total,
+        processed=row.processed,
+        started_at=row.started_at,
+        finished_at=row.finished_at,
+        error=row.error,
+    )
+
+
+async def _stale_article_ids(session: AsyncSession, top_n: int) -> list[int]:
+    """Embedded articles with fewer stored neighbours than they should have."""
+    neighbours = (
+        select(
+            models.ArticleNeighbour.article_id,
+            func.count().label("stored"),
+        )
+        .group_by(models.ArticleNeighbour.article_id)
+        .subquery()
+    )
+    stmt = (
+        select(models.ArticleEmbedding.article_id)
+        .outerjoin(neighbours, neighbours.c.article_id == models.ArticleEmbedding.article_id)
+        .where(models.ArticleEmbedding.model == EMBEDDING_MODEL)
+        .where(func.coalesce(neighbours.c.stored, 0) < top_n)
+        .order_by(models.ArticleEmbedding.article_id)
+    )
+    return list((await session.execute(stmt)).scalars())
+
+
+async def _weakest_scores(session: AsyncSession, article_ids: list[int]) -> dict[int, float]:
+    """Score of the least similar stored neighbour of every given article."""
+    result = await session.execute(
+        select(models.ArticleNeighbour.article_id, func.min(models.ArticleNeighbour.score))
+        .where(models.ArticleNeighbour.article_id.in_(article_ids))
+        .group_by(models.ArticleNeighbour.article_id)
+    )
+    return dict(result.all())
+
+
+def _chunks(items: list, size: int):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _rows_within(memory_budget: int, columns: int, dim: int, limit: int) -> int:
+    """
+    Rows of a chunk whose float32 scores against `columns` vectors, plus the
+    vectors themselves, fit in `memory_budget` bytes.
+    """
+    return max(1, min(limit, memory_budget // (4 * (columns + 2 * dim))))
+
+
+def _best_scores(
+    index: VectorIndex, article_ids: list[int], others: list[int], column_size: int
+) -> np.ndarray:
+    """Highest similarity of every article to any of `others`."""
+    vectors = index.get(article_ids)
+    best = np.full(len(article_ids), -np.inf, dtype=np.float32)
+    for columns in _chunks(others, column_size):
+        np.maximum(best, (vectors @ index.get(columns).T).max(axis=1), out=best)
+    return best
+
+
+async def refresh_neighbours(
+    session: AsyncSession,
+    top_n: int = NEIGHBOURS_TOP_N,
+    chunk_size: int = NEIGHBOURS_CHUNK_SIZE,
+    memory_budget: int = NEIGHBOURS_MEMORY_BYTES,
+) -> int:
+    """
+    Recompute stored neighbours of new, changed and affected articles.
+
+    New and re-embedded articles have no (or too few) stored neighbours.
+    Articles already stored are affected when one of those becomes more
+    similar to them than their weakest stored neighbour. Both passes walk
+    the corpus at most `chunk_size` articles at a time, fewer when the
+    similarity matrices of a chunk would exceed `memory_budget` bytes, and
+    each chunk of results is committed on its own. Returns the number of
+    refreshed articles.
+    """
+
+    progress = NeighboursProgress(state="running", started_at=datetime.now(timezone.utc))
+    await _save_progress(progress)
+    try:
+        try:
+            index = await embeddings.get_index(session, max_age=0)
+        except LookupError:
+            progress.state = "done"
+            return 0
+
+        # Fewer neighbours than top_n is all a small corpus can have.
+        top_n = min(top_n, len(index) - 1)
+        changed = await _stale_article_ids(session, top_n)
+        changed = [i for i in changed if i in index]
+
+        affected: list[int] = []
+        if changed:
+            changed_set = set(changed)
+            others = sorted(index.ids() - changed_set)
+            column_size = min(len(changed), chunk_size)
+            rows = _rows_within(memory_budget, column_size, index.dim, chunk_size)
+            for chunk in _chunks(others, rows):
+                best = await asyncio.to_thread(
+                    _best_scores, index, chunk, changed, column_size
+                )
+                weakest = await _weakest_scores(session, chunk)
+                affected.extend(
+                    article_id
+                    for article_id, score in zip(chunk, best)
+                    if score > weakest.get(article_id, -np.inf)
+                )
+
+        to_refresh = changed + affected
+        progress.total = len(to_refresh)
+        await _save_progress(progress)
+        logger.info(
+            "Refreshing neighbours of %d articles (%d new or changed, %d affected)",
+            len(to_refresh), len(changed), len(affected),
+        )
+
+        recommender = ArticleRecommender(index)
+        # An exact search scores every query against the whole index.
+        rows = _rows_within(memory_budget, len(index), index.dim, chunk_size)
+        for chunk in _chunks(to_refresh, rows):
+            recommendations = await asyncio.to_thread(
+                recommender.recommend_batch, chunk, top_n
+            )
+            links = [
+                {
+                    "article_id": article_id,
+                    "rank": rank,
+                    "neighbour_id": neighbour_id,
+                    "score": score,
+                }
+                for article_id, pairs in recommendations.items()
+                for rank, (neighbour_id, score) in enumerate(pairs)
+            ]
+            await session.execute(
+                delete(models.ArticleNeighbour)
+                .where(models.ArticleNeighbour.article_id.in_(chunk))
+            )
+            for links_chunk in _chunks(links, BULK_CHUNK_SIZE):
+                await session.execute(insert(models.ArticleNeighbour).values(links_chunk))
+            await session.commit()
+
+            progress.processed += len(chunk)
+            await _save_progress(progress)
+            logger.info("Neighbours refreshed: %d/%d", progress.processed, progress.total)
+
+        progress.state = "done"
+        return len(to_refresh)
+    except Exception as e:
+        progress.state = "failed"
+        progress.error = str(e)
+        raise
+    finally:
+        progress.finished_at = datetime.now(timezone.utc)
+        await _save_progress(progress)
+
+
+async def read_neighbours(
+    session: AsyncSession, article_id: int, top_n: int
+) -> list[Row]:
+    """Read rows of stored neighbours of an article, most similar first."""
+    stmt = (
+        select_article_rows()
+        .join(models.ArticleNeighbour, models.ArticleNeighbour.neighbour_id == models.Article.id)
+        .where(models.ArticleNeighbour.article_id == article_id)
+        .order_by(models.ArticleNeighbour.rank)
+        .limit(top_n)
+    )
+    return list((await session.execute(stmt)).all())
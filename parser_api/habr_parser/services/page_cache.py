@@ -0,0 +1,148 @@
+"""
+This module keeps an on-disk cache of fetched pages for conditional requests.
+
+Bodies are stored content-addressed under `objects/<sha256>`; `index.json`
+maps every URL to its ETag, Last-Modified, body hash and last access time.
+The cache is bounded by the total size of stored bodies, least recently
+used URLs are evicted first.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import asdict
+from dataclasses import dataclass
+from pathlib import Path
+
+from habr_parser.config import PAGE_CACHE_DIR
+from habr_parser.config import PAGE_CACHE_MAX_BYTES
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    """Validators and body hash of the last fetch of a URL."""
+    hash: str
+    size: int
+    accessed: float
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+class PageCache:
+    """Content-addressed page cache with LRU eviction and hit/miss counters."""
+
+    def __init__(self, directory: str | Path = PAGE_CACHE_DIR, max_bytes: int = PAGE_CACHE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: dict[str, CacheEntry] = {}
+        index_path = self.directory / "index.json"
+        if index_path.exists():
+            raw = json.loads(index_path.read_text(encoding="utf-8"))
+            self._entries = {url: CacheEntry(**entry) for url, entry in raw.items()}
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "urls": len(self._entries),
+            "bytes": self._stored_bytes(),
+        }
+
+    def conditional_headers(self, url: str) -> dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for revalidating a URL."""
+        entry = self._entries.get(url)
+        headers = {}
+        if entry is not None and self._object_path(entry.hash).exists():
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def not_modified(self, url: str) -> str:
+        """Record a 304 answer and return the cached body."""
+        entry = self._entries[url]
+        entry.accessed = time.time()
+        self.hits += 1
+        self._save_index()
+        return self._object_path(entry.hash).read_text(encoding="utf-8")
+
+    def store(self, url: str, body: str, etag: str | None, last_modified: str | None) -> bool:
+        """Record a full response. Returns False if the body did not change."""
+        data = body.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        previous = self._entries.get(url)
+        changed = previous is None or previous.hash != digest
+        if changed:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        path = self._object_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+
+        self._entries[url] = CacheEntry(
+            hash=digest, size=len(data), accessed=time.time(),
+            etag=etag, last_modified=last_modified,
+        )
+        if previous is not None and changed:
+            self._drop_object_if_unused(previous.hash)
+        self._evict()
+        self._save_index()
+        return changed
+
+    def invalidate(self, urls: list[str]) -> None:
+        """Forget URLs, so their next fetch is treated as changed."""
+        for url in urls:
+            entry = self._entries.pop(url, None)
+            if entry is not None:
+                self._drop_object_if_unused(entry.hash)
+        self._save_index()
+
+    def _object_path(self, digest: str) -> Path:
+        return self.directory / "objects" / digest[:2] / digest
+
+    def _stored_bytes(self) -> int:
+        return sum({e.hash: e.size for e in self._entries.values()}.values())
+
+    def _drop_object_if_unused(self, digest: str) -> None:
+        if all(e.hash != digest for e in self._entries.values()):
+            self._object_path(digest).unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        by_age = sorted(self._entries.items(), key=lambda item: item[1].accessed)
+        while by_age and self._stored_bytes() > self.max_bytes:
+            url, entry = by_age.pop(0)
+            del self._entries[url]
+            self._drop_object_if_unused(entry.hash)
+            logger.info("Evicted %s from page cache", url)
+
+    def _save_index(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.directory / "index.json.tmp"
+        tmp.write_text(
+            json.dumps({url: asdict(e) for url, e in self._entries.items()}),
+            encoding="utf-8",
+        )
+        os.replace(tmp, self.directory / "index.json")
+
+
+_page_cache: PageCache | None = None
+
+
+def get_page_cache() -> PageCache:
+    """Return the shared page cache, loading its index on first use."""
+    global _page_cache
+    if _page_cache is None:
+        _page_cache = PageCache()
+    return _page_cache
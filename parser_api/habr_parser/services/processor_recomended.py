@@ -4,66 +4,102 @@ Module for generating article embeddings and finding similar ones
 (content-based recommendations).
 """
 
-from typing import List, Tuple
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+import threading
+from typing import TYPE_CHECKING, Dict, List, Tuple
 import numpy as np
 
-# Load a pre-trained model for text embeddings
-# (all-MiniLM-L6-v2 is lightweight and fast, good for prototyping)
-model = SentenceTransformer("all-MiniLM-L6-v2")
+from habr_parser.config import EMBEDDING_MODEL
+from habr_parser.services.vector_index import VectorIndex
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+_model: "SentenceTransformer | None" = None
+_model_lock = threading.Lock()
+
+
+def get_model() -> "SentenceTransformer":
+    """
+    Return the text embedding model, loading it on first use.
+
+    Importing sentence_transformers pulls in torch, so it is deferred until
+    something actually needs to encode text.
+    """
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                from sentence_transformers import SentenceTransformer
+
+                # Load a pre-trained model for text embeddings
+                # (all-MiniLM-L6-v2 is lightweight and fast, good for prototyping)
+                _model = SentenceTransformer(EMBEDDING_MODEL)
+    return _model
+
+
+def encode_texts(texts: List[str]) -> np.ndarray:
+    """
+    Convert a list of article texts into embeddings.
+
+    Args:
+        texts (List[str]): list of article texts
+
+    Returns:
+        np.ndarray: float32 matrix of embeddings,
+                    shape (n_texts, embedding_dim)
+    """
+    return get_model().encode(texts, convert_to_numpy=True).astype(np.float32, copy=False)
 
 
 class ArticleRecommender:
     """
-    Class for building vector representations of articles
-    and finding similar articles using embeddings.
+    Class for finding similar articles in a vector index
+    of precomputed embeddings.
     """
 
-    def __init__(self, articles: List[str]):
+    def __init__(self, index: VectorIndex):
         """
-        Initialize the recommender with a list of articles.
+        Initialize the recommender with an index of article embeddings.
 
         Args:
-            articles (List[str]): list of article texts
-                                 (can be title + hubs + content)
+            index (VectorIndex): index of article embeddings keyed by article id
         """
-        self.articles = articles
-        # Precompute embeddings for all articles once during initialization
-        self.embeddings = self._encode_articles(articles)
+        self.index = index
 
-    def _encode_articles(self, articles: List[str]) -> np.ndarray:
+    def recommend(self, article_id: int, top_n: int = 5) -> List[Tuple[int, float]]:
         """
-        Convert a list of articles into embeddings.
+        Recommend similar articles for a given article.
 
         Args:
-            articles (List[str]): list of article texts
+            article_id (int): id of the article
+            top_n (int): number of recommendations to return
 
         Returns:
-            np.ndarray: matrix of embeddings,
-                        shape (n_articles, embedding_dim)
+            List[Tuple[int, float]]: list of (article id, similarity score)
         """
-        return model.encode(articles, convert_to_numpy=True)
+        return self.recommend_batch([article_id], top_n=top_n)[article_id]
 
-    def recommend(self, article_idx: int, top_n: int = 5) -> List[Tuple[str, float]]:
+    def recommend_batch(
+        self, article_ids: List[int], top_n: int = 5
+    ) -> Dict[int, List[Tuple[int, float]]]:
         """
-        Recommend similar articles for a given article index.
+        Recommend similar articles for many articles with a single search.
 
         Args:
-            article_idx (int): index of the article in the list
-            top_n (int): number of recommendations to return
+            article_ids (List[int]): ids of the articles
+            top_n (int): number of recommendations per article
 
         Returns:
-            List[Tuple[str, float]]: list of (article text, similarity score)
+            Dict[int, List[Tuple[int, float]]]: article id ->
+                list of (article id, similarity score)
         """
-        # Compute cosine similarity between the target article
-        # and all other articles in the corpus
-        similarities = cosine_similarity(
-            [self.embeddings[article_idx]], self.embeddings
-        )[0]
-
-        # Get indices of the most similar articles (excluding itself)
-        similar_indices = np.argsort(similarities)[::-1][1 : top_n + 1]
+        # Ask for one extra neighbour: the article itself is the closest one
+        ids, scores = self.index.search(self.index.get(article_ids), top_n + 1)
 
-        # Return articles and their similarity scores
-        return [(self.articles[i], float(similarities[i])) for i in similar_indices]
+        return {
+            article_id: [
+                (int(i), float(score))
+                for i, score in zip(row_ids, row_scores) if i != article_id
+            ][:top_n]
+            for article_id, row_ids, row_scores in zip(article_ids, ids, scores)
+        }
@@ -0,0 +1,83 @@
+"""This module contains an async token-bucket rate limiter."""
+
+import asyncio
+import time
+
+from habr_parser.config import FETCH_BURST
+from habr_parser.config import FETCH_RATE
+
+
+class SystemClock:
+    """Monotonic time and sleeping of the running event loop."""
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    async def sleep(self, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+
+
+system_clock = SystemClock()
+
+TOKEN_EPSILON = 1e-9
+
+
+class TokenBucket:
+    """
+    Allows `rate` acquisitions per second on average and bursts of `burst`.
+
+    The bucket starts full. Waiters are served one at a time in arrival order.
+    `pause` holds off everyone, e.g. while the host asks us to back off.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, clock: SystemClock = system_clock):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.clock = clock
+        self._tokens = float(self.burst)
+        self._updated = clock.monotonic()
+        self._paused_until = self._updated
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def pause(self, seconds: float) -> None:
+        """Hold off all acquisitions for `seconds`, then start with an empty bucket."""
+        now = self.clock.monotonic()
+        if now + seconds <= self._paused_until:
+            return
+        self._refill(max(now, self._updated))
+        self._tokens = 0.0
+        self._paused_until = self._updated = now + seconds
+
+    async def acquire(self) -> float:
+        """Wait until a token is available and take it. Returns seconds waited."""
+        async with self._lock:
+            started = self.clock.monotonic()
+            while True:
+                now = self.clock.monotonic()
+                if now < self._paused_until:
+                    await self.clock.sleep(self._paused_until - now)
+                    continue
+                self._refill(now)
+                # Rounding can leave a hair less than the token just waited for.
+                if self._tokens >= 1 - TOKEN_EPSILON:
+                    break
+                await self.clock.sleep((1 - self._tokens) / self.rate)
+            self._tokens -= 1
+            return self.clock.monotonic() - started
+
+
+_rate_limiter: TokenBucket | None = None
+
+
+def get_rate_limiter() -> TokenBucket:
+    """Limiter shared by all requests to Habr from this process."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = TokenBucket(FETCH_RATE, FETCH_BURST)
+    return _rate_limiter
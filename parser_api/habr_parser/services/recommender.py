@@ -1,37 +1,73 @@
 """This module recomend articlles for user."""
 
 from typing import Sequence
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from fastapi import HTTPException
 
 from habr_parser.db import models
+from habr_parser.db.crud import select_article_rows
+from habr_parser.services import embeddings
+from habr_parser.services import neighbours
 from habr_parser.services.processor_recomended import ArticleRecommender
+from habr_parser.services.vector_index import VectorIndex
+
+
+async def _get_index_with(session: AsyncSession, article_ids: list[int]) -> VectorIndex:
+    """Return the vector index, embedding any of the given articles it lacks."""
+    try:
+        index = await embeddings.get_index(session)
+    except LookupError:
+        index = None
+    missing = [i for i in article_ids if index is None or i not in index]
+    if missing:
+        # Added through the API since the last scrape cycle. Only these are
+        # embedded here, the rest of the corpus is left to the scrape cycle.
+        await embeddings.embed_missing_articles(session, article_ids=missing)
+        # The rest may have been embedded by another process since the last sync.
+        index = await embeddings.get_index(session, max_age=0)
+    return index
 
 
 async def recommend_articles(
     session: AsyncSession, article_id: int, top_n: int = 5
-) -> Sequence[models.Article]:
-    """Recommend similar articles based on embeddings of the given article."""
+) -> Sequence[Row]:
+    """Recommend rows of similar articles, from precomputed neighbours when available."""
+
+    stored = await neighbours.read_neighbours(session, article_id, top_n)
+    if stored:
+        return stored
 
-    stmt = select(models.Article)
-    result = await session.execute(stmt)
-    articles = result.scalars().all()
+    # Not refreshed since it was added, search the embeddings directly.
+    recommendations = await recommend_articles_batch(session, [article_id], top_n)
+    return recommendations[article_id]
 
-    if not articles:
-        raise HTTPException(status_code=404, detail="No articles in database")
 
-    article_map = {a.id: idx for idx, a in enumerate(articles)}
-    if article_id not in article_map:
-        raise HTTPException(status_code=404, detail="Article not found")
-    target_idx = article_map[article_id]
+async def recommend_articles_batch(
+    session: AsyncSession, article_ids: list[int], top_n: int = 5
+) -> dict[int, list[Row]]:
+    """Recommend rows of similar articles for every given article in one search."""
 
-    texts = [f"{a.title} {' '.join([h.name for h in a.hubs])}" for a in articles]
+    article_ids = list(dict.fromkeys(article_ids))
+    result = await session.execute(
+        select(models.Article.id).where(models.Article.id.in_(article_ids))
+    )
+    missing = set(article_ids) - set(result.scalars())
+    if missing:
+        raise HTTPException(
+            status_code=404, detail=f"Articles not found: {sorted(missing)}"
+        )
 
-    recommender = ArticleRecommender(texts)
-    recommendations = recommender.recommend(target_idx, top_n=top_n)
+    recommender = ArticleRecommender(await _get_index_with(session, article_ids))
+    recommendations = recommender.recommend_batch(article_ids, top_n=top_n)
 
-    recommended_indices = [
-        texts.index(text) for text, _ in recommendations if text in texts
-    ]
-    return [articles[i] for i in recommended_indices]
+    recommended_ids = {i for pairs in recommendations.values() for i, _ in pairs}
+    result = await session.execute(
+        select_article_rows().where(models.Article.id.in_(recommended_ids))
+    )
+    articles = {row.id: row for row in result.all()}
+    return {
+        article_id: [articles[i] for i, _ in pairs if i in articles]
+        for article_id, pairs in recommendations.items()
+    }
@@ -0,0 +1,207 @@
+"""
+This module caches rendered API responses.
+
+Entries are stored per data generation: every change of the articles
+bumps the generation, which drops all entries at once. Backends:
+
+- memory: a bounded LRU in every process. Invalidations are broadcast
+  to the other processes with Postgres NOTIFY, and each API worker drops
+  its entries when it hears one (see `invalidation_listener`);
+- redis: shared by all workers and replicas, entries expire after
+  RESPONSE_CACHE_TTL and memory is bounded by the Redis eviction policy.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import asdict
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+from sqlalchemy import func
+from sqlalchemy import select
+
+from habr_parser.config import REDIS_URL
+from habr_parser.config import RESPONSE_CACHE
+from habr_parser.config import RESPONSE_CACHE_MAX_BYTES
+from habr_parser.config import RESPONSE_CACHE_TTL
+from habr_parser.db.database import engine
+
+logger = logging.getLogger(__name__)
+
+# Postgres channel the memory caches of all processes are invalidated on.
+INVALIDATION_CHANNEL = "habr_parser_response_cache"
+
+
+def strong_etag(body: bytes) -> str:
+    """Strong ETag of a response body."""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+@dataclass
+class CachedResponse:
+    """A rendered response: body, its ETag and the headers worth replaying."""
+    body: bytes
+    etag: str
+    media_type: str
+    headers: dict[str, str]
+
+    def size(self) -> int:
+        return len(self.body) + sum(len(k) + len(v) for k, v in self.headers.items())
+
+
+class MemoryResponseCache:
+    """LRU of responses in this process, bounded by total body size."""
+
+    def __init__(self, max_bytes: int = RESPONSE_CACHE_MAX_BYTES, ttl: float = RESPONSE_CACHE_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._generation = 0
+        self._entries: OrderedDict[str, tuple[float, CachedResponse]] = OrderedDict()
+        self._bytes = 0
+
+    async def generation(self) -> int:
+        return self._generation
+
+    async def get(self, key: str, generation: int) -> CachedResponse | None:
+        if generation != self._generation or key not in self._entries:
+            return None
+        expires, response = self._entries[key]
+        if expires < time.monotonic():
+            self._pop(key)
+            return None
+        self._entries.move_to_end(key)
+        return response
+
+    async def set(self, key: str, generation: int, response: CachedResponse) -> None:
+        # A response rendered before an invalidation must not outlive it.
+        if generation != self._generation or response.size() > self.max_bytes // 4:
+            return
+        self._pop(key)
+        self._entries[key] = (time.monotonic() + self.ttl, response)
+        self._bytes += response.size()
+        while self._bytes > self.max_bytes:
+            self._pop(next(iter(self._entries)))
+
+    async def invalidate(self) -> None:
+        self.clear()
+
+    def clear(self) -> None:
+        """Drop all entries; responses rendered before are not stored either."""
+        self._generation += 1
+        self._entries.clear()
+        self._bytes = 0
+
+    def _pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1].size()
+
+
+class RedisResponseCache:
+    """Responses in Redis, keyed by a generation counter shared by all processes."""
+
+    GENERATION_KEY = "habr_parser:response_cache:generation"
+
+    def __init__(self, url: str = REDIS_URL, ttl: int = RESPONSE_CACHE_TTL):
+        import redis.asyncio as redis
+
+        self.ttl = ttl
+        self._redis = redis.from_url(url)
+
+    def _key(self, key: str, generation: int) -> str:
+        return f"habr_parser:response_cache:{generation}:{key}"
+
+    async def generation(self) -> int:
+        return int(await self._redis.get(self.GENERATION_KEY) or 0)
+
+    async def get(self, key: str, generation: int) -> CachedResponse | None:
+        raw = await self._redis.get(self._key(key, generation))
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        data["body"] = base64.b64decode(data["body"])
+        return CachedResponse(**data)
+
+    async def set(self, key: str, generation: int, response: CachedResponse) -> None:
+        data = asdict(response)
+        # The cache holds bodies as opaque bytes; nothing guarantees they are
+        # UTF-8, so they go to JSON as base64 rather than decoded text.
+        data["body"] = base64.b64encode(response.body).decode("ascii")
+        await self._redis.set(self._key(key, generation), json.dumps(data), ex=self.ttl)
+
+    async def invalidate(self) -> None:
+        # Entries of older generations are never read again and expire on their own.
+        await self._redis.incr(self.GENERATION_KEY)
+
+
+RESPONSE_CACHE_BACKENDS = {
+    "memory": MemoryResponseCache,
+    "redis": RedisResponseCache,
+}
+
+_response_cache: MemoryResponseCache | RedisResponseCache | None = None
+
+
+def get_response_cache() -> MemoryResponseCache | RedisResponseCache | None:
+    """Response cache of this process, None if RESPONSE_CACHE is off."""
+    global _response_cache
+    if _response_cache is None and RESPONSE_CACHE != "off":
+        try:
+            backend = RESPONSE_CACHE_BACKENDS[RESPONSE_CACHE]
+        except KeyError:
+            raise ValueError(
+                f"Unknown response cache {RESPONSE_CACHE!r}, "
+                f"expected one of {sorted(RESPONSE_CACHE_BACKENDS)} or off"
+            ) from None
+        _response_cache = backend()
+    return _response_cache
+
+
+async def _notify_invalidation() -> None:
+    async with engine.connect() as conn:
+        await conn.execute(select(func.pg_notify(INVALIDATION_CHANNEL, "")))
+        await conn.commit()
+
+
+async def invalidate_responses() -> None:
+    """Drop all cached responses, in every process, after the articles changed."""
+    cache = get_response_cache()
+    if cache is None:
+        return
+    try:
+        await cache.invalidate()
+        if isinstance(cache, MemoryResponseCache):
+            await _notify_invalidation()
+    except Exception as e:
+        logger.warning("Response cache invalidation failed: %s", e)
+
+
+@asynccontextmanager
+async def invalidation_listener() -> AsyncIterator[None]:
+    """
+    Clear the memory cache of this process on invalidations of other processes.
+
+    Holds a database connection listening on INVALIDATION_CHANNEL while
+    entered. If it is lost, entries still expire after RESPONSE_CACHE_TTL.
+    """
+    if not isinstance(get_response_cache(), MemoryResponseCache):
+        yield
+        return
+
+    def on_invalidation(connection, pid, channel, payload) -> None:
+        cache = get_response_cache()
+        if isinstance(cache, MemoryResponseCache):
+            cache.clear()
+
+    async with engine.connect() as conn:
+        listener = (await conn.get_raw_connection()).driver_connection
+        await listener.add_listener(INVALIDATION_CHANNEL, on_invalidation)
+        try:
+            yield
+        finally:
+            await listener.remove_listener(INVALIDATION_CHANNEL, on_invalidation)
@@ -0,0 +1,177 @@
+"""
+This module runs scrape jobs on a schedule.
+
+Each job scrapes one listing (the whole feed, a hub, ...) with its own
+interval and page depth. The last run of every job is stored in the
+scrape_jobs table, so a restart does not rerun jobs that ran recently, and
+a Postgres advisory lock makes sure a job runs in one process at a time
+across workers and replicas.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+from sqlalchemy import func
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from habr_parser.config import BASE_URL
+from habr_parser.config import INTERVAL
+from habr_parser.config import NUM_PAGE
+from habr_parser.config import SCHEDULER_JITTER
+from habr_parser.config import SCHEDULER_POLL
+from habr_parser.config import SCRAPE_JOBS
+from habr_parser.config import SCRAPE_MODE
+from habr_parser.db import models
+from habr_parser.db.database import engine
+from habr_parser.db.database import get_session_context
+from habr_parser.services.scraper import get_daily_articles
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ScrapeJob:
+    """A listing to scrape every `interval` seconds, `pages` pages deep."""
+    name: str
+    url: str
+    interval: float = INTERVAL
+    pages: int = NUM_PAGE
+    mode: str = SCRAPE_MODE
+
+    @property
+    def lock_key(self) -> int:
+        """Key of the advisory lock held while the job runs."""
+        return zlib.crc32(f"habr_parser.scrape_job:{self.name}".encode())
+
+
+def load_jobs(raw: str | None = SCRAPE_JOBS) -> list[ScrapeJob]:
+    """
+    Parse jobs from SCRAPE_JOBS, a JSON list of objects with ScrapeJob fields.
+
+    Without it there is a single "default" job over BASE_URL.
+    """
+    if not raw:
+        return [ScrapeJob(name="default", url=BASE_URL)]
+
+    jobs = [ScrapeJob(**job) for job in json.loads(raw)]
+    names = [job.name for job in jobs]
+    if len(set(names)) != len(names):
+        raise ValueError("Scrape job names must be unique")
+    return jobs
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class Scheduler:
+    """
+    Runs due jobs one after another and sleeps until the next one is due.
+
+    A job is due when it never ran or its stored next_run_at has passed.
+    The next run is `interval` after the end of the last one, stretched by
+    up to `jitter` of the interval so replicas and jobs drift apart. Failed
+    runs are retried on the same schedule. The database is polled at least
+    every `poll` seconds to notice runs made by other processes.
+    """
+
+    def __init__(
+        self,
+        jobs: list[ScrapeJob],
+        jitter: float = SCHEDULER_JITTER,
+        poll: float = SCHEDULER_POLL,
+    ):
+        self.jobs = jobs
+        self.jitter = jitter
+        self.poll = poll
+
+    def next_run(self, job: ScrapeJob, finished_at: datetime) -> datetime:
+        """When a job that finished at `finished_at` is due again."""
+        interval = job.interval * (1 + random.uniform(0, self.jitter))
+        return finished_at + timedelta(seconds=interval)
+
+    async def _next_runs(self, session: AsyncSession) -> dict[str, datetime | None]:
+        result = await session.execute(
+            select(models.ScrapeJobState.name, models.ScrapeJobState.next_run_at)
+            .where(models.ScrapeJobState.name.in_([job.name for job in self.jobs]))
+        )
+        return dict(result.all())
+
+    async def run_job(self, job: ScrapeJob) -> bool:
+        """
+        Run a job unless another process runs it or already ran it.
+
+        Returns whether the job ran here.
+        """
+        async with engine.connect() as lock_conn:
+            locked = await lock_conn.scalar(select(func.pg_try_advisory_lock(job.lock_key)))
+            # Session-level lock: it outlives the transaction, which must not stay open.
+            await lock_conn.commit()
+            if not locked:
+                return False
+            try:
+                async with get_session_context() as session:
+                    state = await session.get(models.ScrapeJobState, job.name)
+                    if state is None:
+                        state = models.ScrapeJobState(name=job.name)
+                        session.add(state)
+                    elif state.next_run_at is not None and state.next_run_at > _now():
+                        return False
+                    state.last_started_at = _now()
+                    await session.commit()
+
+                    logger.info("Running scrape job %s", job.name)
+                    state.last_status, state.last_error = "ok", None
+                    try:
+                        await get_daily_articles(job.url, job.pages, job.mode)
+                    except Exception as e:
+                        logger.exception("Scrape job %s failed", job.name)
+                        state.last_status, state.last_error = "error", str(e)
+                    state.last_finished_at = _now()
+                    state.next_run_at = self.next_run(job, state.last_finished_at)
+                    await session.commit()
+                    logger.info("Scrape job %s is due again at %s", job.name, state.next_run_at)
+                    return True
+            finally:
+                await lock_conn.scalar(select(func.pg_advisory_unlock(job.lock_key)))
+                await lock_conn.commit()
+
+    async def tick(self) -> float:
+        """Run the jobs that are due. Returns seconds until the next check."""
+        async with get_session_context() as session:
+            next_runs = await self._next_runs(session)
+        # Due jobs that another process is running; they are rechecked on poll.
+        busy = set()
+        for job in self.jobs:
+            next_run = next_runs.get(job.name)
+            if next_run is None or next_run <= _now():
+                if not await self.run_job(job):
+                    busy.add(job.name)
+
+        async with get_session_context() as session:
+            next_runs = await self._next_runs(session)
+        now = _now()
+        waits = [
+            (next_runs[job.name] - now).total_seconds()
+            for job in self.jobs
+            if job.name not in busy and next_runs.get(job.name) is not None
+        ]
+        return max(0.0, min([self.poll, *waits]))
+
+    async def run_forever(self) -> None:
+        """Run jobs on schedule until cancelled."""
+        while True:
+            try:
+                wait = await self.tick()
+            except Exception:
+                logger.exception("Scheduler error")
+                wait = self.poll
+            await asyncio.sleep(wait)
@@ -1,23 +1,50 @@
 """This module contains functions for scraping and processing articles from Habr."""
 
 
-import json
-import requests
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator
+from typing import Callable
+
 from bs4 import BeautifulSoup
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from habr_parser.config import DETAIL_BATCH_SIZE
+from habr_parser.config import DETAIL_CONCURRENCY
+from habr_parser.config import DETAIL_SCRAPE
+from habr_parser.config import PARSE_WORKERS
+from habr_parser.config import PARSER_BACKEND
+from habr_parser.config import SCRAPE_MODE
 from habr_parser.db.database import get_session_context
+from habr_parser.services import embeddings
+from habr_parser.services import neighbours
 from habr_parser.services import processor
+from habr_parser.services import lxml_parser
+from habr_parser.services.archive import ArchiveWriter
+from habr_parser.services.fetcher import PageFetcher
+from habr_parser.services.fetcher import fetch_metrics
+from habr_parser.services.page_cache import get_page_cache
+from habr_parser.services.rate_limiter import get_rate_limiter
+from habr_parser.services.response_cache import invalidate_responses
 from habr_parser.db import crud
 
+_parse_pool: ProcessPoolExecutor | None = None
+
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    """Return the shared worker pool for HTML parsing, creating it on first use."""
+    global _parse_pool
+    if _parse_pool is None:
+        _parse_pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+    return _parse_pool
+
 
-def fetch_habr_page(url: str) -> str:
-    """Fetches HTML page from Habr by URL."""
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
-    }
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()
-    return response.text
+def shutdown_parse_pool() -> None:
+    """Stop parsing workers (called on application shutdown)."""
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown(cancel_futures=True)
+        _parse_pool = None
 
 
 def parse_articles(page_content: str) -> list[dict]:
@@ -51,23 +78,197 @@ def parse_articles(page_content: str) -> list[dict]:
     return results
 
 
-async def get_daily_articles(url:str, pages: int = 5) -> list[dict]:
+PARSERS: dict[str, Callable[[str], list[dict]]] = {
+    "bs4": parse_articles,
+    "lxml": lxml_parser.parse_articles,
+}
+
+
+def get_parser(backend: str = PARSER_BACKEND) -> Callable[[str], list[dict]]:
+    """Return the listing page parser for the given backend name."""
+    try:
+        return PARSERS[backend]
+    except KeyError:
+        raise ValueError(
+            f"Unknown parser backend {backend!r}, expected one of {sorted(PARSERS)}"
+        ) from None
+
+
+async def fetch_and_parse(fetcher: PageFetcher, page_url: str) -> list[dict] | None:
+    """
+    Fetches a listing page and parses it in the worker process pool.
+
+    Returns None if the page did not change since the last fetch and an
+    empty list if it could not be fetched or parsed.
+    """
+    cache = get_page_cache()
+    try:
+        page_content, changed = await fetcher.fetch_cached(page_url, cache)
+        if not changed:
+            return None
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_parse_pool(), get_parser(), page_content)
+    except Exception as e:
+        print(f"⚠️ Error while scraping {page_url}: {e}")
+        cache.invalidate([page_url])
+        return []
+
+
+async def iter_parsed_pages(
+    url: str, pages: int, first_page: int = 1
+) -> AsyncIterator[list[dict]]:
+    """
+    Fetches listing pages concurrently and yields raw articles of each page
+    as soon as it is parsed.
+
+    Parsing runs in the worker process pool, so parsing of one page overlaps
+    fetching of the others. Pages are yielded in completion order. Pages
+    that did not change since the last fetch are neither parsed nor yielded.
+    """
+    async with PageFetcher(rate_limiter=get_rate_limiter()) as fetcher:
+        tasks = [
+            asyncio.create_task(fetch_and_parse(fetcher, f"{url}{i}/"))
+            for i in range(first_page, first_page + pages)
+        ]
+        try:
+            for next_page in asyncio.as_completed(tasks):
+                raw_articles = await next_page
+                if raw_articles is not None:
+                    yield raw_articles
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+async def iter_new_pages(
+    url: str, max_pages: int, known_urls: set[str]
+) -> AsyncIterator[list[dict]]:
+    """
+    Walks listing pages newest first and yields raw articles of each page
+    until a page brings no article that is not already known.
+
+    An unchanged page (see the page cache) brings nothing new either.
+    `known_urls` is extended with the urls of every yielded page.
+    """
+    async with PageFetcher(rate_limiter=get_rate_limiter()) as fetcher:
+        for i in range(1, max_pages + 1):
+            raw_articles = await fetch_and_parse(fetcher, f"{url}{i}/")
+            if not raw_articles:
+                return
+            # Cards that are never stored (no url, author, ...) are never known.
+            urls = {
+                a["url"] for a in raw_articles
+                if all(a.get(field) for field in crud.ARTICLE_REQUIRED_FIELDS)
+            }
+            if urls <= known_urls:
+                return
+            known_urls.update(urls)
+            yield raw_articles
+
+
+async def iter_scraped_pages(
+    url: str, pages: int, mode: str = SCRAPE_MODE, first_page: int = 1
+) -> AsyncIterator[list[dict]]:
+    """
+    Yields raw articles page by page for the given scrape mode.
+
+    - full (default): all `pages` pages concurrently, which also refreshes the
+      counters and is_top of the known articles on them;
+    - incremental: newest pages first, stop at the first page with nothing new
+      (at most `pages` pages); known articles are not refreshed;
+    - backfill: `pages` pages from `first_page` on, concurrently and without
+      stopping at known articles, to fill in deep history.
+    """
+    if mode == "incremental":
+        async with get_session_context() as session:
+            known_urls = await crud.read_article_urls(session)
+        pages_iter = iter_new_pages(url, pages, known_urls)
+    elif mode == "full":
+        pages_iter = iter_parsed_pages(url, pages)
+    elif mode == "backfill":
+        pages_iter = iter_parsed_pages(url, pages, first_page)
+    else:
+        raise ValueError(
+            f"Unknown scrape mode {mode!r}, expected incremental, full or backfill"
+        )
+
+    async for raw_articles in pages_iter:
+        yield raw_articles
+
+
+async def fetch_article_details(articles: list[tuple[int, str]]) -> list[dict]:
+    """
+    Fetches and parses pages of (id, url) articles.
+
+    Pages are fetched at most DETAIL_CONCURRENCY at once, within the rate
+    limit shared with listing pages, so walking many articles stays polite
+    to the host. Articles whose page could not be fetched are left out.
+    """
+    loop = asyncio.get_running_loop()
+    pool = get_parse_pool()
+
+    async with PageFetcher(
+        concurrency=DETAIL_CONCURRENCY, rate_limiter=get_rate_limiter()
+    ) as fetcher:
+        async def fetch_details(article_id: int, article_url: str) -> dict | None:
+            try:
+                page_content = await fetcher.fetch(article_url)
+                details = await loop.run_in_executor(
+                    pool, lxml_parser.parse_article_detail, page_content
+                )
+            except Exception as e:
+                print(f"⚠️ Error while scraping {article_url}: {e}")
+                return None
+            return {"article_id": article_id, **details}
+
+        results = await asyncio.gather(
+            *(fetch_details(article_id, article_url) for article_id, article_url in articles)
+        )
+    return [details for details in results if details is not None]
+
+
+async def scrape_missing_details(session: AsyncSession, limit: int = DETAIL_BATCH_SIZE) -> int:
+    """Scrapes and saves details of up to `limit` newest articles that lack them."""
+    articles = await crud.read_articles_without_details(session, limit)
+    if not articles:
+        return 0
+    details = await fetch_article_details(articles)
+    return await crud.save_article_details(session, details)
+
+
+async def get_daily_articles(
+    url:str, pages: int = 5, mode: str = SCRAPE_MODE, first_page: int = 1
+) -> list[dict]:
     """Fetches, parses, processes, and saves daily articles from multiple Habrs pages."""
 
     all_articles = []
 
-    for i in range(1, pages + 1):
-        page_url = f"{url}{i}/"
-        page_content = fetch_habr_page(page_url)
-        print("Fetching articles from Habr...")
-        raw_articles = parse_articles(page_content)
-        processed_articles = processor.process_articles(raw_articles)
-        all_articles.extend(processed_articles)
-
-    with open("data/articles.json", "a", encoding="utf-8") as f:
-        json.dump(all_articles, f, ensure_ascii=False, indent=2, default=str)
+    print(f"Fetching articles from Habr ({mode})...")
+    with ArchiveWriter() as archive:
+        async for raw_articles in iter_scraped_pages(url, pages, mode, first_page):
+            processed_articles = processor.process_articles(raw_articles)
+            archive.write(processed_articles)
+            all_articles.extend(processed_articles)
+    print(f"Page cache: {get_page_cache().stats()}")
 
     async with get_session_context() as session:
-        await crud.save_articles_to_db(session, all_articles)
+        try:
+            counts = await crud.save_articles_to_db(session, all_articles)
+        except Exception:
+            # Forget the fetched pages, so the next cycle parses and saves them again.
+            get_page_cache().invalidate(
+                [f"{url}{i}/" for i in range(first_page, first_page + pages)]
+            )
+            raise
+        if counts["inserted"] or counts["updated"]:
+            await invalidate_responses()
+        if DETAIL_SCRAPE:
+            scraped = await scrape_missing_details(session)
+            print(f"Scraped details of {scraped} articles.")
+        print(f"Fetching: {fetch_metrics.as_dict()}")
+        embedded = await embeddings.embed_missing_articles(session)
+        print(f"Embedded {embedded} articles.")
+        refreshed = await neighbours.refresh_neighbours(session)
+        print(f"Refreshed neighbours of {refreshed} articles.")
 
     return all_articles
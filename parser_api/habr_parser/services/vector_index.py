@@ -0,0 +1,224 @@
+"""
+This module contains vector index backends for similarity search
+over article embeddings.
+
+Scores are cosine similarities. `exact` is a brute-force search over the
+whole matrix; `hnsw` is an approximate HNSW graph. It needs `hnswlib`,
+which is not a hard requirement since it only ships as a source package
+(`pip install -r requirements-hnsw.txt`, with a C++ compiler).
+"""
+
+from abc import ABC
+from abc import abstractmethod
+
+import numpy as np
+
+from habr_parser.config import HNSW_EF_CONSTRUCTION
+from habr_parser.config import HNSW_EF_SEARCH
+from habr_parser.config import HNSW_M
+from habr_parser.config import VECTOR_INDEX
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length so a dot product is a cosine similarity."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class VectorIndex(ABC):
+    """Interface of an id-keyed vector index."""
+
+    # Dimension of the indexed vectors.
+    dim: int
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of indexed vectors."""
+
+    @abstractmethod
+    def __contains__(self, article_id: int) -> bool:
+        """Whether a vector is stored under the id."""
+
+    @abstractmethod
+    def ids(self) -> set[int]:
+        """Ids of all indexed vectors."""
+
+    @abstractmethod
+    def add(self, ids: list[int], vectors: np.ndarray) -> None:
+        """Insert vectors, replacing the ones already stored under the same ids."""
+
+    @abstractmethod
+    def remove(self, ids: list[int]) -> None:
+        """Remove vectors by id, unknown ids are ignored."""
+
+    @abstractmethod
+    def get(self, ids: list[int]) -> np.ndarray:
+        """Return the stored (normalized) vectors of the given ids."""
+
+    @abstractmethod
+    def search(self, queries: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Find the k most similar vectors for every query row.
+
+        Returns (ids, scores) arrays of shape (n_queries, min(k, len(self))),
+        most similar first.
+        """
+
+
+class BruteForceIndex(VectorIndex):
+    """Exact search: one matrix product against every stored vector."""
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self._ids = np.empty(0, dtype=np.int64)
+        self._matrix = np.empty((0, dim), dtype=np.float32)
+        self._rows: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, article_id: int) -> bool:
+        return article_id in self._rows
+
+    def ids(self) -> set[int]:
+        return set(self._rows)
+
+    def add(self, ids: list[int], vectors: np.ndarray) -> None:
+        vectors = normalize(vectors)
+        new_ids, new_rows = [], []
+        for article_id, vector in zip(ids, vectors):
+            row = self._rows.get(article_id)
+            if row is None:
+                new_ids.append(article_id)
+                new_rows.append(vector)
+            else:
+                self._matrix[row] = vector
+        if new_ids:
+            self._ids = np.concatenate([self._ids, np.asarray(new_ids, dtype=np.int64)])
+            self._matrix = np.vstack([self._matrix, np.asarray(new_rows)])
+            self._reindex()
+
+    def remove(self, ids: list[int]) -> None:
+        keep = ~np.isin(self._ids, np.asarray(list(ids), dtype=np.int64))
+        if not keep.all():
+            self._ids = self._ids[keep]
+            self._matrix = self._matrix[keep]
+            self._reindex()
+
+    def get(self, ids: list[int]) -> np.ndarray:
+        return self._matrix[[self._rows[article_id] for article_id in ids]]
+
+    def search(self, queries: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        k = min(k, len(self))
+        if k == 0:
+            return np.empty((len(queries), 0), dtype=np.int64), np.empty((len(queries), 0))
+        scores = normalize(queries) @ self._matrix.T
+        # Select the k best in O(N) per query, then sort only those.
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        return self._ids[top], np.take_along_axis(top_scores, order, axis=1)
+
+    def _reindex(self) -> None:
+        self._rows = {int(article_id): row for row, article_id in enumerate(self._ids)}
+
+
+class HNSWIndex(VectorIndex):
+    """
+    Approximate search over an HNSW graph (hnswlib).
+
+    `m` and `ef_construction` trade build time and memory for graph quality,
+    `ef_search` trades query latency for recall. Deleted vectors are only
+    marked as deleted and their slots are reused by later inserts.
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        m: int = HNSW_M,
+        ef_construction: int = HNSW_EF_CONSTRUCTION,
+        ef_search: int = HNSW_EF_SEARCH,
+        initial_capacity: int = 1024,
+    ):
+        try:
+            import hnswlib
+        except ImportError as e:
+            raise RuntimeError(
+                "VECTOR_INDEX=hnsw requires the 'hnswlib' package "
+                "(pip install -r requirements-hnsw.txt)"
+            ) from e
+
+        self.dim = dim
+        self.ef_search = ef_search
+        self._index = hnswlib.Index(space="cosine", dim=dim)
+        self._index.init_index(
+            max_elements=initial_capacity,
+            M=m,
+            ef_construction=ef_construction,
+            allow_replace_deleted=True,
+        )
+        self._live: set[int] = set()
+        self._deleted: set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def __contains__(self, article_id: int) -> bool:
+        return article_id in self._live
+
+    def ids(self) -> set[int]:
+        return set(self._live)
+
+    def add(self, ids: list[int], vectors: np.ndarray) -> None:
+        ids = list(ids)
+        if not ids:
+            return
+        revived = [article_id for article_id in ids if article_id in self._deleted]
+        for article_id in revived:
+            self._index.unmark_deleted(article_id)
+        self._deleted.difference_update(revived)
+
+        needed = self._index.get_current_count() + len(ids)
+        if needed > self._index.get_max_elements():
+            self._index.resize_index(max(needed, 2 * self._index.get_max_elements()))
+
+        self._index.add_items(normalize(vectors), ids)
+        self._live.update(ids)
+
+    def remove(self, ids: list[int]) -> None:
+        for article_id in ids:
+            if article_id in self._live:
+                self._index.mark_deleted(article_id)
+                self._live.discard(article_id)
+                self._deleted.add(article_id)
+
+    def get(self, ids: list[int]) -> np.ndarray:
+        return np.asarray(self._index.get_items(list(ids)), dtype=np.float32)
+
+    def search(self, queries: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        k = min(k, len(self))
+        if k == 0:
+            return np.empty((len(queries), 0), dtype=np.int64), np.empty((len(queries), 0))
+        self._index.set_ef(max(self.ef_search, k))
+        labels, distances = self._index.knn_query(normalize(queries), k=k)
+        return labels.astype(np.int64), 1.0 - distances
+
+
+INDEX_BACKENDS = {
+    "exact": BruteForceIndex,
+    "hnsw": HNSWIndex,
+}
+
+
+def create_index(dim: int, backend: str = VECTOR_INDEX) -> VectorIndex:
+    """Create an empty index of the given backend."""
+    try:
+        index_cls = INDEX_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(
+            f"Unknown vector index {backend!r}, expected one of {sorted(INDEX_BACKENDS)}"
+        ) from None
+    return index_cls(dim)
@@ -0,0 +1,27 @@
+"""Deterministic clock for timing tests."""
+
+import asyncio
+
+from habr_parser.services.rate_limiter import SystemClock
+
+
+class FakeClock(SystemClock):
+    """
+    Clock that only moves when slept on.
+
+    Sleeping advances the time at once and yields to the event loop, so
+    code timed by it runs deterministically and without real waiting.
+    Every sleep is recorded in `sleeps`.
+    """
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+        self.sleeps: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += max(0.0, seconds)
+        await asyncio.sleep(0)
@@ -0,0 +1,116 @@
+"""
+Shared fixtures of the test suite.
+
+Tests marked `postgres` run against the database at TEST_DATABASE_URL and
+are skipped without it. That database is migrated to head once and
+truncated before every test, so it must be a throwaway one.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import AsyncIterator
+
+import httpx
+import pytest
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+# Settings are read when habr_parser is imported, so they are set first.
+if TEST_DATABASE_URL:
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://test@localhost/test")
+os.environ.setdefault("NUM_PAGE", "1")
+
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+
+from habr_parser.db import database  # noqa: E402
+from habr_parser.db.hub_cache import hub_cache  # noqa: E402
+from habr_parser.db.models import Base  # noqa: E402
+from habr_parser.services import embeddings  # noqa: E402
+from habr_parser.services import page_cache  # noqa: E402
+from habr_parser.services import response_cache  # noqa: E402
+from habr_parser.services import scraper  # noqa: E402
+from habr_parser.services.rate_limiter import TokenBucket  # noqa: E402
+from tests.seed import FakeEncoder  # noqa: E402
+
+ALEMBIC_DIR = Path(__file__).resolve().parent.parent / "alembic"
+
+
+def pytest_collection_modifyitems(config, items) -> None:
+    if TEST_DATABASE_URL:
+        return
+    skip = pytest.mark.skip(reason="TEST_DATABASE_URL is not set")
+    for item in items:
+        if "postgres" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+def alembic_config():
+    """Alembic configuration of the test database."""
+    from alembic.config import Config
+
+    config = Config()
+    config.set_main_option("script_location", str(ALEMBIC_DIR))
+    return config
+
+
+@pytest.fixture(scope="session")
+def migrated_database(alembic_config) -> None:
+    """Migrate the test database to head, as a deployment would."""
+    from alembic import command
+
+    command.upgrade(alembic_config, "head")
+
+
+@pytest.fixture
+async def session(migrated_database, monkeypatch) -> AsyncIterator[AsyncSession]:
+    """Session on the emptied test database."""
+    # The vector index of this process would outlive the truncated rows.
+    monkeypatch.setattr(embeddings, "_index", None)
+    monkeypatch.setattr(embeddings, "_index_versions", {})
+    monkeypatch.setattr(embeddings, "_index_fingerprint", None)
+    tables = ", ".join(table.name for table in Base.metadata.sorted_tables)
+    async with database.get_session_context() as session:
+        await session.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+        await session.commit()
+        hub_cache._ids.clear()
+        yield session
+    # Pooled connections belong to the event loop of this test.
+    await database.engine.dispose()
+
+
+@pytest.fixture
+def encoder(monkeypatch) -> FakeEncoder:
+    """Embed with fake vectors instead of loading the model."""
+    fake = FakeEncoder()
+    monkeypatch.setattr(embeddings, "encode_batcher", fake)
+    return fake
+
+
+@pytest.fixture
+def scrape_env(monkeypatch, tmp_path):
+    """Scraper with its own page cache, an unthrottled limiter and an in-process parse pool."""
+    monkeypatch.setattr(page_cache, "_page_cache", page_cache.PageCache(tmp_path))
+    monkeypatch.setattr(scraper, "get_rate_limiter", lambda: TokenBucket(1000, 100))
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        monkeypatch.setattr(scraper, "get_parse_pool", lambda: pool)
+        yield
+
+
+@pytest.fixture
+async def client(session, monkeypatch) -> AsyncIterator[httpx.AsyncClient]:
+    """API client on the emptied test database, with an empty response cache."""
+    from habr_parser.main import app
+
+    monkeypatch.setattr(response_cache, "_response_cache", response_cache.MemoryResponseCache())
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
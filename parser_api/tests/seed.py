@@ -0,0 +1,46 @@
+"""Test data for the database tests."""
+
+import hashlib
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+import numpy as np
+
+DIM = 8
+
+
+def article_data(i: int, **fields) -> dict:
+    """A scraped article as the processing stage returns it."""
+    data = {
+        "title": f"Article {i}",
+        "url": f"https://habr.com/ru/articles/{i}/",
+        "votes": i,
+        "author": f"author{i % 3}",
+        "published": datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(hours=i),
+        "views": 10 * i,
+        "comments": i % 5,
+        "hubs": ["Python", "Go"] if i % 2 else ["Rust"],
+        "is_top": i % 4 == 0,
+    }
+    data.update(fields)
+    return data
+
+
+def fake_vectors(texts: list[str]) -> np.ndarray:
+    """Deterministic stand-in for the embedding model."""
+    return np.stack([
+        np.frombuffer(hashlib.sha256(text.encode()).digest()[:DIM], dtype=np.uint8)
+        for text in texts
+    ]).astype(np.float32)
+
+
+class FakeEncoder:
+    """Replaces `embeddings.encode_batcher`, remembering what it encoded."""
+
+    def __init__(self):
+        self.texts: list[str] = []
+
+    async def encode(self, texts: list[str]) -> np.ndarray:
+        self.texts.extend(texts)
+        return fake_vectors(texts)
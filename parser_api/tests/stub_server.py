@@ -0,0 +1,109 @@
+"""Local HTTP server that stands in for Habr in the tests."""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def fixture_page(name: str) -> str:
+    """Canned page stored under tests/fixtures."""
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+class StubHabr:
+    """
+    Serves canned pages on a free local port from a background thread.
+
+    `pages` maps a path to the body served with 200, paths without a page
+    get 404. `script` maps a path to (status, headers) answers that are
+    served, in order, before its page: that is how failures and retries are
+    staged. Pages with an entry in `etags` are served with that ETag, and a
+    request whose `If-None-Match` matches it gets an empty 304, recorded in
+    `not_modified`. Every request is recorded in `hits`, and
+    `max_in_flight` is the largest number of requests handled at the same
+    time (each of them takes `delay` seconds).
+    """
+
+    def __init__(self, pages: dict[str, str] | None = None, delay: float = 0.0):
+        self.pages = dict(pages or {})
+        self.script: dict[str, list[tuple[int, dict[str, str]]]] = {}
+        self.etags: dict[str, str] = {}
+        self.not_modified: list[str] = []
+        self.delay = delay
+        self.hits: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def fail(self, path: str, status: int, times: int = 1, headers: dict[str, str] | None = None) -> None:
+        """Answer the next `times` requests of `path` with `status`."""
+        self.script.setdefault(path, []).extend([(status, headers or {})] * times)
+
+    def __enter__(self) -> "StubHabr":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _answer(self, path: str, if_none_match: str | None = None) -> tuple[int, dict[str, str], bytes]:
+        with self._lock:
+            self.hits.append(path)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            scripted = self.script.get(path)
+            answer = scripted.pop(0) if scripted else None
+        try:
+            if self.delay:
+                time.sleep(self.delay)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        if answer is not None:
+            status, headers = answer
+            return status, headers, b""
+        if path not in self.pages:
+            return 404, {}, b""
+        etag = self.etags.get(path)
+        if etag is not None and if_none_match == etag:
+            with self._lock:
+                self.not_modified.append(path)
+            return 304, {"ETag": etag}, b""
+        headers = {"Content-Type": "text/html; charset=utf-8"}
+        if etag is not None:
+            headers["ETag"] = etag
+        return 200, headers, self.pages[path].encode()
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                status, headers, body = stub._answer(
+                    self.path, self.headers.get("If-None-Match")
+                )
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        return Handler
@@ -0,0 +1,284 @@
+"""Tests of the article endpoints."""
+
+import json
+from datetime import datetime
+from datetime import timezone
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+
+from habr_parser.api.routes import integrity_error
+
+from habr_parser.db import crud
+from habr_parser.db import database
+from habr_parser.services import embeddings
+from habr_parser.services import neighbours
+from tests.seed import article_data
+
+pytestmark = [pytest.mark.anyio, pytest.mark.postgres]
+
+NEW_ARTICLE = {
+    "title": "New article",
+    "url": "https://habr.com/ru/articles/1/",
+    "author": "alice",
+    "published": "2025-01-01T00:00:00Z",
+    "hubs": ["Python"],
+}
+
+
+async def test_writes_invalidate_cached_responses(client):
+    assert (await client.get("/articles/")).json() == []
+
+    created = (await client.post("/articles/", json=NEW_ARTICLE)).json()
+    assert [a["id"] for a in (await client.get("/articles/")).json()] == [created["id"]]
+    assert (await client.get(f"/articles/{created['id']}")).json()["title"] == "New article"
+
+    await client.put(f"/articles/{created['id']}", json={**NEW_ARTICLE, "title": "Renamed"})
+    assert (await client.get(f"/articles/{created['id']}")).json()["title"] == "Renamed"
+
+    await client.delete(f"/articles/{created['id']}")
+    assert (await client.get("/articles/")).json() == []
+    assert (await client.get(f"/articles/{created['id']}")).status_code == 404
+
+
+
+async def test_search_follows_renamed_articles(client):
+    created = (await client.post("/articles/", json=NEW_ARTICLE)).json()
+    await client.put(f"/articles/{created['id']}", json={**NEW_ARTICLE, "title": "Вектор поиска"})
+
+    found = (await client.get("/articles/search", params={"q": "вектора"})).json()
+
+    assert [a["id"] for a in found] == [created["id"]]
+    assert (await client.get("/articles/search", params={"q": "new"})).json() == []
+
+
+async def test_duplicate_url_is_a_conflict(client):
+    first = (await client.post("/articles/", json=NEW_ARTICLE)).json()
+    other = {**NEW_ARTICLE, "url": "https://habr.com/ru/articles/2/"}
+    second = (await client.post("/articles/", json=other)).json()
+
+    created = await client.post("/articles/", json=NEW_ARTICLE)
+    updated = await client.put(f"/articles/{second['id']}", json=NEW_ARTICLE)
+
+    assert created.status_code == updated.status_code == 409
+    assert created.json()["detail"] == "Article with this url already exists"
+    assert (await client.get(f"/articles/{first['id']}")).status_code == 200
+
+
+@pytest.mark.parametrize("change", [
+    {"published": None},
+    {"author": None},
+    {"author": ""},
+    {"votes": -1},
+    {"views": -1},
+    {"comments": -1},
+    {"url": "not a url"},
+])
+async def test_invalid_article_is_rejected(client, change):
+    payload = {key: value for key, value in {**NEW_ARTICLE, **change}.items() if value is not None}
+
+    response = await client.post("/articles/", json=payload)
+
+    assert response.status_code == 422
+    assert (await client.get("/articles/")).json() == []
+
+
+async def test_other_constraint_violations_are_not_conflicts(session):
+    data = {
+        "title": "t", "url": "https://habr.com/ru/articles/1/", "author": "a",
+        "published": datetime(2025, 1, 1, tzinfo=timezone.utc), "votes": -1, "is_top": False,
+    }
+    with pytest.raises(IntegrityError) as error:
+        await crud.save_article(session, data)
+
+    http_error = integrity_error(error.value)
+    assert http_error.status_code == 422
+    assert "votes_non_negative" in http_error.detail
+
+
+@pytest.fixture
+def statements():
+    """SQL statements the engine runs during a test."""
+    executed: list[str] = []
+
+    def count(conn, cursor, statement, *args):
+        executed.append(statement)
+
+    event.listen(database.engine.sync_engine, "before_cursor_execute", count)
+    yield executed
+    event.remove(database.engine.sync_engine, "before_cursor_execute", count)
+
+
+@pytest.fixture
+async def articles(session, encoder):
+    """Articles with embeddings and stored neighbours."""
+    await crud.bulk_save_articles(session, [article_data(i) for i in range(1, 11)])
+    await embeddings.embed_missing_articles(session)
+    await neighbours.refresh_neighbours(session, top_n=3)
+
+
+@pytest.mark.parametrize("path", [
+    "/articles/",
+    "/articles/?stream=true",
+    "/articles/top",
+    "/articles/tag/Python",
+    "/articles/views/50",
+    "/articles/search?q=Article",
+    "/articles/query?hub=Python&min_votes=3&sort=views",
+    "/articles/3",
+    "/articles/recommendation/3",
+])
+async def test_read_endpoints_run_one_statement(client, articles, statements, path):
+    response = await client.get(path)
+
+    assert response.status_code == 200
+    assert response.content not in (b"", b"[]")
+    assert len(statements) == 1, statements
+
+
+def query_hubs(i: int) -> list[str]:
+    if i % 2:
+        return ["Python", "Go"]
+    return ["Rust", "Python"] if i % 3 == 0 else ["Rust"]
+
+
+QUERY_ARTICLES = [article_data(i, hubs=query_hubs(i)) for i in range(1, 31)]
+
+
+@pytest.fixture
+async def query_articles(session):
+    """Articles for the combined filter, some sharing sort values."""
+    await crud.bulk_save_articles(session, QUERY_ARTICLES)
+
+
+def expected_urls(predicate) -> set[str]:
+    return {data["url"] for data in QUERY_ARTICLES if predicate(data)}
+
+
+@pytest.mark.parametrize("params, predicate", [
+    ({}, lambda a: True),
+    ({"hub": "Rust"}, lambda a: "Rust" in a["hubs"]),
+    ({"hub": ["Rust", "Python"]}, lambda a: {"Rust", "Python"} <= set(a["hubs"])),
+    ({"any_hub": ["Go", "Rust"]}, lambda a: bool({"Go", "Rust"} & set(a["hubs"]))),
+    ({"hub": "Python", "any_hub": ["Go"]}, lambda a: "Go" in a["hubs"]),
+    ({"author": "author1"}, lambda a: a["author"] == "author1"),
+    ({"is_top": "true"}, lambda a: a["is_top"]),
+    ({"is_top": "false", "hub": "Rust"}, lambda a: not a["is_top"] and "Rust" in a["hubs"]),
+    ({"min_views": 100, "max_views": 200}, lambda a: 100 <= a["views"] <= 200),
+    ({"min_votes": 25}, lambda a: a["votes"] >= 25),
+    ({"max_comments": 1, "author": "author0"}, lambda a: a["comments"] <= 1 and a["author"] == "author0"),
+    (
+        {"published_from": "2025-01-01T05:00:00Z", "published_to": "2025-01-01T10:00:00Z"},
+        lambda a: 5 <= a["votes"] <= 10,
+    ),
+    ({"min_votes": 20, "max_votes": 10}, lambda a: False),
+])
+async def test_query_filters_are_combined(client, query_articles, params, predicate):
+    response = await client.get("/articles/query", params={**params, "limit": 100})
+
+    assert response.status_code == 200
+    assert {a["url"] for a in response.json()} == expected_urls(predicate)
+    assert "X-Next-Cursor" not in response.headers
+
+
+@pytest.mark.parametrize("sort", ["published", "votes", "views", "comments"])
+async def test_query_is_sorted_descending(client, query_articles, sort):
+    found = (await client.get("/articles/query", params={"sort": sort, "limit": 100})).json()
+
+    keys = [(a[sort], a["id"]) for a in found]
+    assert keys == sorted(keys, reverse=True)
+
+
+async def follow_pages(client, path: str, params: dict) -> list[list[dict]]:
+    """Follow X-Next-Cursor through every page of a listing."""
+    pages = []
+    cursor = None
+    while True:
+        response = await client.get(
+            path, params={**params, **({"cursor": cursor} if cursor else {})}
+        )
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("sort", ["published", "votes", "comments"])
+@pytest.mark.parametrize("filters", [{}, {"hub": "Python", "max_votes": 25}])
+async def test_query_pages_cover_all_results_once(client, query_articles, sort, filters):
+    everything = (await client.get(
+        "/articles/query", params={**filters, "sort": sort, "limit": 100}
+    )).json()
+
+    pages = await follow_pages(client, "/articles/query", {**filters, "sort": sort, "limit": 4})
+
+    # Comments repeat every five articles, so pages also split ties by id.
+    assert [a["id"] for page in pages for a in page] == [a["id"] for a in everything]
+    assert all(len(page) == 4 for page in pages[:-1])
+    assert len(pages) == len(everything) // 4 + 1
+
+
+async def test_query_pages_follow_new_articles_without_repeats(client, query_articles):
+    first = await client.get("/articles/query", params={"limit": 5})
+    # An article newer than the cursor must not shift later pages.
+    await client.post("/articles/", json={**NEW_ARTICLE, "url": "https://habr.com/ru/articles/99/",
+                                          "published": "2026-01-01T00:00:00Z"})
+
+    rest = await follow_pages(client, "/articles/query", {"limit": 5, "cursor": first.headers["X-Next-Cursor"]})
+
+    urls = [a["url"] for a in first.json()] + [a["url"] for page in rest for a in page]
+    assert sorted(urls) == sorted(data["url"] for data in QUERY_ARTICLES)
+
+
+async def test_query_rejects_foreign_cursors(client, query_articles):
+    cursor = (await client.get("/articles/query", params={"limit": 5})).headers["X-Next-Cursor"]
+
+    other_sort = await client.get("/articles/query", params={"sort": "votes", "cursor": cursor})
+    broken = await client.get("/articles/query", params={"cursor": "not-a-cursor"})
+
+    assert other_sort.status_code == broken.status_code == 400
+    assert other_sort.json()["detail"] == "Invalid cursor"
+
+
+@pytest.mark.parametrize("params", [{"sort": "title"}, {"limit": 0}, {"min_views": -1}])
+async def test_query_rejects_invalid_parameters(client, params):
+    assert (await client.get("/articles/query", params=params)).status_code == 422
+
+
+async def test_article_pages_cover_all_articles_once(client, session):
+    # Articles published at the same time are split by id between pages.
+    same_time = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    await crud.bulk_save_articles(session, [
+        article_data(i, published=same_time) if i % 3 == 0 else article_data(i)
+        for i in range(1, 24)
+    ])
+
+    pages = await follow_pages(client, "/articles/", {"limit": 5})
+
+    found = [a for page in pages for a in page]
+    keys = [(a["published"], a["id"]) for a in found]
+    assert [len(page) for page in pages] == [5, 5, 5, 5, 3]
+    assert keys == sorted(keys, reverse=True)
+    assert len(set(keys)) == 23
+
+
+async def test_articles_are_streamed_as_ndjson(client, session):
+    await crud.bulk_save_articles(session, [article_data(i) for i in range(1, 8)])
+
+    response = await client.get("/articles/", params={"stream": "true"})
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(a["url"] for a in lines) == sorted(article_data(i)["url"] for i in range(1, 8))
+    by_url = {a["url"]: a for a in lines}
+    assert sorted(h["name"] for h in by_url[article_data(1)["url"]]["hubs"]) == ["Go", "Python"]
+
+
+# Not base64, a one-element list, and an object instead of a list.
+@pytest.mark.parametrize("cursor", ["not-a-cursor!", "WzFd", "eyJhIjoxfQ"])
+async def test_article_pages_reject_broken_cursors(client, cursor):
+    response = await client.get("/articles/", params={"cursor": cursor})
+
+    assert response.status_code == 400
@@ -0,0 +1,107 @@
+"""Tests of the rotating article archive."""
+
+import gzip
+import secrets
+from datetime import date
+from datetime import datetime
+from datetime import timezone
+
+import pytest
+
+from habr_parser.services import archive
+from habr_parser.services.archive import ArchiveWriter
+from habr_parser.services.archive import archive_files
+from habr_parser.services.archive import iter_archive
+
+
+def records(n: int, start: int = 0) -> list[dict]:
+    # Random titles keep the files from compressing to almost nothing.
+    return [{"url": f"https://habr.com/ru/articles/{i}/", "title": secrets.token_hex(32)}
+            for i in range(start, start + n)]
+
+
+@pytest.fixture(params=sorted(archive.EXTENSIONS))
+def compression(request) -> str:
+    if request.param == "zstd":
+        pytest.importorskip("zstandard")
+    return request.param
+
+
+def test_records_are_read_back_in_order(tmp_path, compression):
+    written = records(10)
+    published = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    with ArchiveWriter(tmp_path, compression=compression) as writer:
+        writer.write(written[:5])
+        writer.write([{**record, "published": published} for record in written[5:]])
+
+    read = list(iter_archive(archive_files(tmp_path)))
+    assert [r["url"] for r in read] == [r["url"] for r in written]
+    assert read[-1]["published"] == published.isoformat()
+    assert len(archive_files(tmp_path)) == 1
+
+
+def test_files_rotate_at_the_size_limit(tmp_path, compression):
+    written = records(3000)
+
+    with ArchiveWriter(tmp_path, compression=compression, max_bytes=16 * 1024) as writer:
+        writer.write(written)
+
+    files = archive_files(tmp_path)
+    assert len(files) > 1
+    assert [p.name.rsplit("-", 1)[1][:4] for p in files] == [
+        f"{seq:04d}" for seq in range(1, len(files) + 1)
+    ]
+    assert [r["url"] for r in iter_archive(files)] == [r["url"] for r in written]
+
+
+def test_files_rotate_every_day(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "_today", lambda: date(2025, 1, 1))
+    with ArchiveWriter(tmp_path) as writer:
+        writer.write(records(2))
+        monkeypatch.setattr(archive, "_today", lambda: date(2025, 1, 2))
+        writer.write(records(2, start=2))
+
+    assert [p.name for p in archive_files(tmp_path)] == [
+        "articles-2025-01-01-0001.ndjson.gz",
+        "articles-2025-01-02-0001.ndjson.gz",
+    ]
+
+
+def test_restarted_writer_continues_the_sequence(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "_today", lambda: date(2025, 1, 1))
+    for start in (0, 2):
+        with ArchiveWriter(tmp_path) as writer:
+            writer.write(records(2, start=start))
+
+    files = archive_files(tmp_path)
+    assert [p.name for p in files] == [
+        "articles-2025-01-01-0001.ndjson.gz",
+        "articles-2025-01-01-0002.ndjson.gz",
+    ]
+    assert len(list(iter_archive(files))) == 4
+
+
+def test_truncated_file_is_read_up_to_its_last_complete_line(tmp_path):
+    written = records(200)
+    with ArchiveWriter(tmp_path) as writer:
+        writer.write(written)
+    path = archive_files(tmp_path)[0]
+    path.write_bytes(path.read_bytes()[:-200])
+
+    read = list(iter_archive([path]))
+
+    assert 0 < len(read) < len(written)
+    assert [r["url"] for r in read] == [r["url"] for r in written[:len(read)]]
+
+
+def test_unknown_compression_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        ArchiveWriter(tmp_path, compression="bz2")
+
+
+def test_gzip_files_are_plain_gzip(tmp_path):
+    with ArchiveWriter(tmp_path) as writer:
+        writer.write(records(1))
+
+    assert gzip.decompress(archive_files(tmp_path)[0].read_bytes()).count(b"\n") == 1
@@ -0,0 +1,27 @@
+"""Tests of the article write path."""
+
+import asyncio
+
+import pytest
+
+from habr_parser.db import crud
+from habr_parser.db import database
+from tests.seed import article_data
+
+pytestmark = [pytest.mark.anyio, pytest.mark.postgres]
+
+
+async def test_concurrent_batches_over_the_same_articles_do_not_deadlock(session):
+    articles = [article_data(i) for i in range(2000)]
+    await crud.bulk_save_articles(session, articles)
+
+    async def save(batch: list[dict]) -> dict[str, int]:
+        async with database.get_session_context() as writer:
+            return await crud.bulk_save_articles(writer, batch)
+
+    for round_ in range(1, 4):
+        changed = [{**article, "views": article["views"] + round_} for article in articles]
+        results = await asyncio.gather(save(changed), save(changed[::-1]))
+
+        # The second writer waits for the first and finds nothing left to change.
+        assert sorted(result["updated"] for result in results) == [0, 2000]
@@ -0,0 +1,64 @@
+"""Tests of article detail scraping."""
+
+import pytest
+from sqlalchemy import select
+
+from habr_parser.db import crud
+from habr_parser.db import models
+from habr_parser.services import scraper
+from habr_parser.services.lxml_parser import parse_article_detail
+from tests.seed import article_data
+from tests.stub_server import StubHabr
+from tests.stub_server import fixture_page
+
+pytestmark = pytest.mark.anyio
+
+ARTICLE = fixture_page("article/article1.html")
+BODY = (
+    "Зачем Парсинг страниц не должен блокировать event loop. "
+    "httpx asyncio await fetch(url) Готово. Спасибо!"
+)
+
+
+def test_detail_parser_reads_body_tags_and_reading_time():
+    assert parse_article_detail(ARTICLE) == {
+        "body": BODY,
+        "tags": ["python", "asyncio"],
+        "reading_time": 7,
+    }
+
+
+@pytest.mark.parametrize("content", ["", "<html><body><p>Not an article</p></body></html>"])
+def test_detail_parser_handles_pages_without_details(content):
+    assert parse_article_detail(content) == {"body": "", "tags": [], "reading_time": None}
+
+
+async def test_details_are_fetched_with_bounded_concurrency(scrape_env, monkeypatch):
+    monkeypatch.setattr(scraper, "DETAIL_CONCURRENCY", 2)
+    pages = {f"/articles/{i}/": ARTICLE for i in range(1, 6)}
+    with StubHabr(pages, delay=0.05) as stub:
+        articles = [(i, f"{stub.url}/articles/{i}/") for i in range(1, 7)]
+        details = await scraper.fetch_article_details(articles)
+
+    # Article 6 has no page and is left out.
+    assert [d["article_id"] for d in details] == [1, 2, 3, 4, 5]
+    assert details[0]["body"] == BODY
+    assert stub.max_in_flight == 2
+
+
+@pytest.mark.postgres
+async def test_missing_details_are_scraped_and_stored(session, scrape_env):
+    with StubHabr({"/articles/2/": ARTICLE, "/articles/1/": ARTICLE}) as stub:
+        await crud.bulk_save_articles(session, [
+            article_data(i, url=f"{stub.url}/articles/{i}/") for i in (1, 2)
+        ])
+        assert await scraper.scrape_missing_details(session) == 2
+        # Nothing is fetched again once every article has its details.
+        assert await scraper.scrape_missing_details(session) == 0
+        hits = list(stub.hits)
+
+    bodies = (await session.execute(
+        select(models.ArticleBody.body, models.ArticleBody.tags, models.ArticleBody.reading_time)
+    )).all()
+    assert sorted(hits) == ["/articles/1/", "/articles/2/"]
+    assert bodies == [(BODY, ["python", "asyncio"], 7)] * 2
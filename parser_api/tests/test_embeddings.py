@@ -0,0 +1,93 @@
+"""Tests of the in-process vector index kept in sync with stored embeddings."""
+
+import numpy as np
+import pytest
+from sqlalchemy import event
+from sqlalchemy import update
+
+from habr_parser.db import crud
+from habr_parser.db import database
+from habr_parser.db import models
+from habr_parser.services import embeddings
+from habr_parser.services.vector_index import normalize
+from tests.seed import DIM
+from tests.seed import article_data
+
+pytestmark = [pytest.mark.anyio, pytest.mark.postgres]
+
+
+async def store_embedding(
+    session, article_id: int, vector: np.ndarray, commit: bool = True
+) -> None:
+    """Re-embed an article the way another worker would."""
+    await session.execute(
+        update(models.ArticleEmbedding)
+        .where(models.ArticleEmbedding.article_id == article_id)
+        .values(
+            embedding=vector.tobytes(),
+            version=models.EMBEDDING_VERSION_SEQ.next_value(),
+        )
+    )
+    if commit:
+        await session.commit()
+
+
+async def test_index_picks_up_vectors_re_embedded_elsewhere(session, encoder):
+    await crud.bulk_save_articles(session, [article_data(i) for i in range(1, 5)])
+    await embeddings.embed_missing_articles(session)
+    index = await embeddings.get_index(session)
+
+    vector = np.arange(1, DIM + 1, dtype=np.float32)
+    await store_embedding(session, 2, vector)
+    # Same row count and ids, only the vector changed.
+    await embeddings.get_index(session, max_age=0)
+
+    np.testing.assert_allclose(index.get([2])[0], normalize(vector[None])[0], rtol=1e-6)
+
+
+async def test_index_picks_up_changes_committed_out_of_order(session, encoder):
+    await crud.bulk_save_articles(session, [article_data(i) for i in range(1, 5)])
+    await embeddings.embed_missing_articles(session)
+    await embeddings.get_index(session)
+
+    slow_vector = np.arange(1, DIM + 1, dtype=np.float32)
+    async with database.get_session_context() as slow:
+        # Draws its version before the other worker, but commits after the sync.
+        await store_embedding(slow, 3, slow_vector, commit=False)
+        await store_embedding(session, 2, np.ones(DIM, dtype=np.float32))
+        await embeddings.get_index(session, max_age=0)
+        await slow.commit()
+    index = await embeddings.get_index(session, max_age=0)
+
+    np.testing.assert_allclose(index.get([3])[0], normalize(slow_vector[None])[0], rtol=1e-6)
+
+
+async def test_index_drops_deleted_embeddings(session, encoder):
+    await crud.bulk_save_articles(session, [article_data(i) for i in range(1, 5)])
+    await embeddings.embed_missing_articles(session)
+    await embeddings.get_index(session)
+
+    await crud.delete_article(session, 3)
+    index = await embeddings.get_index(session, max_age=0)
+
+    assert index.ids() == {1, 2, 4}
+
+
+async def test_index_is_not_checked_again_within_max_age(session, encoder):
+    await crud.bulk_save_articles(session, [article_data(i) for i in range(1, 5)])
+    await embeddings.embed_missing_articles(session)
+    await embeddings.get_index(session)
+
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    sync_engine = session.bind.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", count)
+    try:
+        await embeddings.get_index(session, max_age=60)
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", count)
+
+    assert statements == []
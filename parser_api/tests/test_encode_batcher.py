@@ -0,0 +1,84 @@
+"""Tests of lazy model loading and the coalescing encode batcher."""
+
+import asyncio
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from habr_parser.services import processor_recomended
+from habr_parser.services.embeddings import EncodeBatcher
+from tests.seed import fake_vectors
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def model_calls(monkeypatch) -> list[list[str]]:
+    """Texts of every model call, which returns fake vectors."""
+    calls = []
+
+    def encode_texts(texts):
+        calls.append(texts)
+        return fake_vectors(texts)
+
+    monkeypatch.setattr(processor_recomended, "encode_texts", encode_texts)
+    return calls
+
+
+async def test_requests_of_one_tick_share_a_model_call(model_calls):
+    batcher = EncodeBatcher(tick=0.01)
+    requests = [["a", "b"], ["c"], ["d", "e", "f"]]
+
+    results = await asyncio.gather(*(batcher.encode(texts) for texts in requests))
+
+    assert model_calls == [["a", "b", "c", "d", "e", "f"]]
+    for texts, vectors in zip(requests, results):
+        assert (vectors == fake_vectors(texts)).all()
+
+
+async def test_later_requests_start_a_new_batch(model_calls):
+    batcher = EncodeBatcher(tick=0.01)
+
+    await batcher.encode(["a"])
+    await batcher.encode(["b"])
+
+    assert model_calls == [["a"], ["b"]]
+
+
+async def test_model_errors_reach_every_caller(monkeypatch):
+    def encode_texts(texts):
+        raise RuntimeError("out of memory")
+
+    monkeypatch.setattr(processor_recomended, "encode_texts", encode_texts)
+    batcher = EncodeBatcher(tick=0.01)
+
+    results = await asyncio.gather(
+        batcher.encode(["a"]), batcher.encode(["b"]), return_exceptions=True
+    )
+
+    assert [str(result) for result in results] == ["out of memory"] * 2
+
+
+async def test_cancelled_caller_does_not_break_the_batch(model_calls):
+    batcher = EncodeBatcher(tick=0.01)
+    cancelled = asyncio.create_task(batcher.encode(["a"]))
+    kept = asyncio.create_task(batcher.encode(["b"]))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+
+    assert (await kept == fake_vectors(["b"])).all()
+    assert model_calls == [["a", "b"]]
+
+
+def test_app_starts_without_loading_the_model():
+    code = (
+        "import sys, habr_parser.main; "
+        "assert 'sentence_transformers' not in sys.modules; "
+        "assert 'torch' not in sys.modules"
+    )
+    env = {**os.environ, "PYTHONPATH": str(Path(__file__).resolve().parent.parent)}
+
+    subprocess.run([sys.executable, "-c", code], env=env, check=True)
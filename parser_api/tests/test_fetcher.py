@@ -0,0 +1,244 @@
+"""Tests of the listing page fetcher against a stub Habr server."""
+
+import socket
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from email.utils import format_datetime
+
+import httpx
+import pytest
+
+from habr_parser.services import page_cache
+from habr_parser.services import scraper
+from habr_parser.services.fetcher import FetchMetrics
+from habr_parser.services.fetcher import PageFetcher
+from habr_parser.services.fetcher import retry_after
+from habr_parser.services.rate_limiter import TokenBucket
+from tests.clock import FakeClock
+from tests.stub_server import StubHabr
+from tests.stub_server import fixture_page
+
+pytestmark = pytest.mark.anyio
+
+PAGE = "<html><body>page</body></html>"
+
+
+def make_fetcher(**kwargs) -> PageFetcher:
+    kwargs.setdefault("backoff", 0)
+    kwargs.setdefault("metrics", FetchMetrics())
+    return PageFetcher(**kwargs)
+
+
+def closed_port_url() -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}/"
+
+
+async def test_fetch_returns_page():
+    with StubHabr({"/page1/": PAGE}) as stub:
+        async with make_fetcher() as fetcher:
+            assert await fetcher.fetch(f"{stub.url}/page1/") == PAGE
+    assert stub.hits == ["/page1/"]
+
+
+async def test_fetch_many_stays_within_concurrency_limit():
+    pages = {f"/page{i}/": f"page {i}" for i in range(8)}
+    with StubHabr(pages, delay=0.1) as stub:
+        async with make_fetcher(concurrency=3) as fetcher:
+            results = await fetcher.fetch_many([stub.url + path for path in pages])
+
+    assert results == list(pages.values())
+    assert stub.max_in_flight == 3
+
+
+@pytest.mark.parametrize("status", [429, 500, 502, 503, 504])
+async def test_retryable_status_is_retried(status):
+    metrics = FetchMetrics()
+    with StubHabr({"/page1/": PAGE}) as stub:
+        stub.fail("/page1/", status, times=2)
+        async with make_fetcher(retries=2, metrics=metrics) as fetcher:
+            assert await fetcher.fetch(f"{stub.url}/page1/") == PAGE
+
+    assert len(stub.hits) == 3
+    assert metrics.requests == 3
+    assert metrics.retries == 2
+
+
+async def test_retries_are_exhausted():
+    with StubHabr({"/page1/": PAGE}) as stub:
+        stub.fail("/page1/", 503, times=3)
+        async with make_fetcher(retries=2) as fetcher:
+            with pytest.raises(httpx.HTTPStatusError) as error:
+                await fetcher.fetch(f"{stub.url}/page1/")
+
+    assert error.value.response.status_code == 503
+    assert len(stub.hits) == 3
+
+
+async def test_client_error_is_not_retried():
+    with StubHabr() as stub:
+        async with make_fetcher(retries=3) as fetcher:
+            with pytest.raises(httpx.HTTPStatusError) as error:
+                await fetcher.fetch(f"{stub.url}/missing/")
+
+    assert error.value.response.status_code == 404
+    assert stub.hits == ["/missing/"]
+
+
+async def test_connection_error_is_retried_then_raised():
+    metrics = FetchMetrics()
+    async with make_fetcher(retries=2, metrics=metrics) as fetcher:
+        with pytest.raises(httpx.ConnectError):
+            await fetcher.fetch(closed_port_url())
+
+    assert metrics.requests == 3
+    assert metrics.retries == 2
+
+
+async def test_timeout_is_retried_then_raised():
+    with StubHabr({"/slow/": PAGE}, delay=0.5) as stub:
+        async with make_fetcher(timeout=0.1, retries=1) as fetcher:
+            with pytest.raises(httpx.TimeoutException):
+                await fetcher.fetch(f"{stub.url}/slow/")
+
+    assert stub.hits == ["/slow/", "/slow/"]
+
+
+def http_date(delta: timedelta) -> str:
+    return format_datetime(datetime.now(timezone.utc) + delta, usegmt=True)
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, None),
+    ("7", 7.0),
+    ("1.5", 1.5),
+    ("-3", 0.0),
+    ("soon", None),
+    ("100000", 300.0),
+])
+def test_retry_after_reads_delay_seconds(value, expected):
+    headers = {"Retry-After": value} if value is not None else {}
+    assert retry_after(httpx.Response(429, headers=headers), limit=300) == expected
+
+
+def test_retry_after_reads_http_dates():
+    def wait(delta: timedelta) -> float | None:
+        response = httpx.Response(503, headers={"Retry-After": http_date(delta)})
+        return retry_after(response, limit=300)
+
+    assert wait(timedelta(seconds=-30)) == 0.0
+    assert 55 <= wait(timedelta(seconds=60)) <= 60
+    assert wait(timedelta(days=1)) == 300.0
+
+
+async def test_retry_after_is_waited_and_pauses_the_limiter():
+    clock = FakeClock()
+    limiter = TokenBucket(rate=100, burst=10, clock=clock)
+    metrics = FetchMetrics()
+    with StubHabr({"/page1/": PAGE}) as stub:
+        stub.fail("/page1/", 429, headers={"Retry-After": "7"})
+        async with make_fetcher(backoff=0.5, rate_limiter=limiter, metrics=metrics) as fetcher:
+            assert await fetcher.fetch(f"{stub.url}/page1/") == PAGE
+
+    # Retry-After beats the 0.5s backoff, and the paused bucket restarts empty.
+    assert clock.sleeps == [7.0, pytest.approx(0.01)]
+    assert metrics.retries == 1
+    assert metrics.throttled == pytest.approx(7.01)
+    assert stub.hits == ["/page1/", "/page1/"]
+
+
+async def test_backoff_grows_exponentially_without_retry_after():
+    clock = FakeClock()
+    with StubHabr({"/page1/": PAGE}) as stub:
+        stub.fail("/page1/", 502, times=3)
+        async with make_fetcher(backoff=0.5, retries=3, clock=clock) as fetcher:
+            await fetcher.fetch(f"{stub.url}/page1/")
+
+    assert clock.sleeps == [0.5, 1.0, 2.0]
+
+
+async def test_fetch_many_keeps_failures_in_place():
+    with StubHabr({"/page1/": "one", "/page3/": "three"}) as stub:
+        async with make_fetcher(retries=0) as fetcher:
+            results = await fetcher.fetch_many(
+                [f"{stub.url}/page{i}/" for i in (1, 2, 3)]
+            )
+
+    assert results[0] == "one"
+    assert isinstance(results[1], httpx.HTTPStatusError)
+    assert results[2] == "three"
+
+
+async def test_iter_parsed_pages_yields_articles_of_every_page(scrape_env):
+    pages = {
+        "/articles/page1/": fixture_page("listing/page1.html"),
+        "/articles/page2/": fixture_page("listing/page2.html"),
+    }
+    with StubHabr(pages) as stub:
+        results = [
+            raw_articles
+            async for raw_articles in scraper.iter_parsed_pages(f"{stub.url}/articles/page", 2)
+        ]
+
+    titles = sorted(article["title"] for page in results for article in page)
+    assert len(results) == 2
+    assert "Zero-copy parsing with lxml" in titles
+    assert len(titles) == 9
+
+
+async def test_iter_parsed_pages_skips_failed_and_unchanged_pages(scrape_env):
+    pages = {
+        "/articles/page1/": fixture_page("listing/page1.html"),
+        "/articles/page3/": fixture_page("listing/page2.html"),
+    }
+    with StubHabr(pages) as stub:
+        url = f"{stub.url}/articles/page"
+        first = [page async for page in scraper.iter_parsed_pages(url, 3)]
+        again = [page async for page in scraper.iter_parsed_pages(url, 3)]
+
+    # The missing page 2 comes back as an empty page, not as an error.
+    assert sorted(len(page) for page in first) == [0, 3, 6]
+    # Pages with the same body as last time are not parsed again.
+    assert again == [[]]
+
+
+async def test_iter_parsed_pages_yields_pages_as_they_are_parsed(scrape_env, monkeypatch):
+    slow, fast = fixture_page("listing/page1.html"), fixture_page("listing/page2.html")
+    parse = scraper.get_parser()
+
+    def slow_parser(content: str) -> list[dict]:
+        if content == slow:
+            time.sleep(0.3)
+        return parse(content)
+
+    monkeypatch.setattr(scraper, "get_parser", lambda: slow_parser)
+    with StubHabr({"/articles/page1/": slow, "/articles/page2/": fast}) as stub:
+        results = [page async for page in scraper.iter_parsed_pages(f"{stub.url}/articles/page", 2)]
+
+    # Page 2 does not wait behind the slower parse of page 1.
+    assert results == [parse(fast), parse(slow)]
+
+
+async def test_pages_are_parsed_in_worker_processes(monkeypatch, tmp_path):
+    monkeypatch.setattr(page_cache, "_page_cache", page_cache.PageCache(tmp_path))
+    monkeypatch.setattr(scraper, "get_rate_limiter", lambda: TokenBucket(1000, 100))
+    monkeypatch.setattr(scraper, "PARSE_WORKERS", 2)
+    monkeypatch.setattr(scraper, "_parse_pool", None)
+    page = fixture_page("listing/page1.html")
+    try:
+        with StubHabr({"/articles/page1/": page}) as stub:
+            results = [
+                raw_articles
+                async for raw_articles in scraper.iter_parsed_pages(f"{stub.url}/articles/page", 1)
+            ]
+        assert isinstance(scraper.get_parse_pool(), ProcessPoolExecutor)
+    finally:
+        scraper.shutdown_parse_pool()
+
+    assert results == [scraper.get_parser()(page)]
+    assert scraper._parse_pool is None
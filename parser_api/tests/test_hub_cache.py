@@ -0,0 +1,87 @@
+"""Tests of the hub name -> id cache."""
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy import select
+
+from habr_parser.db import database
+from habr_parser.db import models
+from habr_parser.db.hub_cache import HubCache
+from habr_parser.db.hub_cache import hub_cache
+
+pytestmark = [pytest.mark.anyio, pytest.mark.postgres]
+
+
+@pytest.fixture
+def statements():
+    """SQL statements the engine runs during a test."""
+    executed: list[str] = []
+
+    def count(conn, cursor, statement, *args):
+        executed.append(statement)
+
+    event.listen(database.engine.sync_engine, "before_cursor_execute", count)
+    yield executed
+    event.remove(database.engine.sync_engine, "before_cursor_execute", count)
+
+
+async def stored_hubs(session) -> dict[str, int]:
+    return dict((await session.execute(select(models.Hub.name, models.Hub.id))).all())
+
+
+async def test_known_hubs_are_resolved_from_memory(session, statements):
+    created = await hub_cache.resolve(session, ["Python", "Go", "Python"])
+    await session.commit()
+    statements.clear()
+
+    assert await hub_cache.resolve(session, ["Go", "Python"]) == created
+    assert statements == []
+    assert created == await stored_hubs(session)
+
+
+async def test_missing_hubs_are_created_in_one_statement(session, statements):
+    await hub_cache.resolve(session, ["Python", "Go", "Rust"])
+
+    assert len(statements) == 1
+    assert sorted(await stored_hubs(session)) == ["Go", "Python", "Rust"]
+
+
+async def test_hubs_created_elsewhere_are_read_back(session):
+    async with database.get_session_context() as other:
+        theirs = await HubCache().resolve(other, ["Python"])
+        await other.commit()
+
+    ours = await hub_cache.resolve(session, ["Python", "Go"])
+
+    assert ours["Python"] == theirs["Python"]
+    assert sorted(ours) == ["Go", "Python"]
+    # Hubs another session created are known to exist and cached at once.
+    assert len(hub_cache) == 1
+
+
+async def test_hubs_are_cached_only_once_committed(session):
+    rolled_back = await hub_cache.resolve(session, ["Python"])
+    # Uncommitted ids are reused within their own transaction.
+    assert await hub_cache.resolve(session, ["Python"]) == rolled_back
+    assert len(hub_cache) == 0
+
+    await session.rollback()
+    created = await hub_cache.resolve(session, ["Python"])
+    await session.commit()
+
+    assert created != rolled_back
+    assert created == await stored_hubs(session)
+    assert len(hub_cache) == 1
+
+
+async def test_warm_loads_stored_hubs(session, statements):
+    created = await hub_cache.resolve(session, ["Python", "Go"])
+    await session.commit()
+
+    cache = HubCache()
+    await cache.warm(session)
+    statements.clear()
+
+    assert len(cache) == 2
+    assert await cache.resolve(session, ["Python", "Go"]) == created
+    assert statements == []
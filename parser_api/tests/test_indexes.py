@@ -0,0 +1,73 @@
+"""Query plan tests of the filter and pagination queries (indexes of 868c084bd78f)."""
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from habr_parser.db import crud
+from habr_parser.services import article
+
+pytestmark = [pytest.mark.anyio, pytest.mark.postgres]
+
+ARTICLES = 20000
+
+SEED_SQL = [
+    f"""
+    INSERT INTO articles (title, url, votes, author, published, views, comments, is_top)
+    SELECT 'Article ' || i, 'https://habr.com/ru/articles/' || i || '/', i % 50,
+           'author' || i % 100, timestamptz '2025-01-01' + i * interval '1 minute',
+           i, i % 20, i % 100 = 0
+    FROM generate_series(1, {ARTICLES}) AS i
+    """,
+    "INSERT INTO hubs (name) SELECT 'Hub ' || h FROM generate_series(1, 50) AS h",
+    "INSERT INTO hubs (name) VALUES ('Rare')",
+    f"""
+    INSERT INTO articles_hubs (article_id, hub_id)
+    SELECT i, 1 + i % 50 FROM generate_series(1, {ARTICLES}) AS i
+    UNION ALL
+    SELECT i, 1 + (i + 7) % 50 FROM generate_series(1, {ARTICLES}) AS i
+    UNION ALL
+    SELECT i, 51 FROM generate_series(1, {ARTICLES}, 1000) AS i
+    """,
+    "ANALYZE articles, hubs, articles_hubs",
+]
+
+
+@pytest.fixture
+async def seeded(session: AsyncSession) -> AsyncSession:
+    for statement in SEED_SQL:
+        await session.execute(text(statement))
+    await session.commit()
+    return session
+
+
+async def query_plan(session: AsyncSession, query) -> str:
+    """EXPLAIN output of the last statement `query(session)` runs."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    sync_engine = session.bind.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", capture)
+    try:
+        await query(session)
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", capture)
+
+    statement, parameters = statements[-1]
+    connection = await session.connection()
+    result = await connection.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+    return "\n".join(row[0] for row in result)
+
+
+@pytest.mark.parametrize("query, index", [
+    (lambda s: article.filter_articles_by_tops(s), "ix_articles_top_published"),
+    (lambda s: article.filter_articles_by_views(s, ARTICLES - 50), "ix_articles_views"),
+    (lambda s: article.filter_articles_by_tag(s, "Rare"), "ix_articles_hubs_hub_id"),
+    (lambda s: crud.read_articles_page(s, 100), "ix_articles_published_id"),
+], ids=["top", "views", "tag", "page"])
+async def test_query_uses_index(seeded, query, index):
+    plan = await query_plan(seeded, query)
+    assert index in plan, plan
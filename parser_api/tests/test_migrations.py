@@ -0,0 +1,55 @@
+"""Tests of migrations that rewrite existing data."""
+
+import asyncio
+
+import pytest
+from alembic import command
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from habr_parser.config import DATABASE_URL
+
+pytestmark = pytest.mark.postgres
+
+BEFORE_SEARCH_VECTOR = "16fd163be627"
+
+
+async def execute(*statements: str) -> list:
+    """Run statements in one transaction, return the rows of the last one."""
+    engine = create_async_engine(DATABASE_URL)
+    try:
+        async with engine.begin() as conn:
+            for statement in statements:
+                result = await conn.execute(text(statement))
+            return list(result.all()) if result.returns_rows else []
+    finally:
+        await engine.dispose()
+
+
+def test_search_vector_migration_backfills_existing_rows(migrated_database, alembic_config):
+    command.downgrade(alembic_config, BEFORE_SEARCH_VECTOR)
+    try:
+        asyncio.run(execute(
+            "TRUNCATE articles, hubs RESTART IDENTITY CASCADE",
+            "INSERT INTO hubs (name) VALUES ('Python'), ('Rust')",
+            """
+            INSERT INTO articles (title, url, votes, author, published, views, comments, is_top)
+            SELECT 'Article ' || i, 'https://habr.com/ru/articles/' || i || '/',
+                   0, 'alice', now(), 0, 0, false
+            FROM generate_series(1, 3) AS i
+            """,
+            "INSERT INTO articles_hubs (article_id, hub_id) VALUES (1, 2), (1, 1), (2, 2)",
+        ))
+        command.upgrade(alembic_config, "head")
+
+        rows = asyncio.run(execute("""
+            SELECT id, hub_names, search_vector @@ websearch_to_tsquery('english', 'rust')
+            FROM articles ORDER BY id
+        """))
+        assert rows == [(1, "Python Rust", True), (2, "Rust", True), (3, "", False)]
+        assert asyncio.run(execute(
+            "SELECT indisvalid FROM pg_index WHERE indexrelid = 'ix_articles_search_vector'::regclass"
+        )) == [(True,)]
+    finally:
+        command.upgrade(alembic_config, "head")
+        asyncio.run(execute("TRUNCATE articles, hubs RESTART IDENTITY CASCADE"))
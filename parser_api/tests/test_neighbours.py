@@ -0,0 +1,100 @@
+"""Tests of precomputed neighbours."""
+
+import threading
+
+import pytest
+from sqlalchemy import delete
+from sqlalchemy import select
+
+from habr_parser.db import crud
+from habr_parser.db import database
+from habr_parser.db import models
+from habr_parser.services import embeddings
+from habr_parser.services import neighbours
+from habr_parser.services import recommender
+from habr_parser.services.processor_recomended import ArticleRecommender
+from tests.seed import article_data
+
+pytestmark = [pytest.mark.anyio, pytest.mark.postgres]
+
+
+async def test_new_article_gets_stored_neighbours(session, encoder):
+    await crud.bulk_save_articles(session, [article_data(i) for i in range(1, 7)])
+    await embeddings.embed_missing_articles(session)
+    assert await neighbours.refresh_neighbours(session, top_n=3) == 6
+
+    await crud.bulk_save_articles(session, [article_data(7)])
+    await embeddings.embed_missing_articles(session)
+    refreshed = await neighbours.refresh_neighbours(session, top_n=3)
+
+    stored = await neighbours.read_neighbours(session, 7, top_n=3)
+    assert refreshed >= 1
+    assert len(stored) == 3
+    assert 7 not in [row.id for row in stored]
+    assert all(row.title.startswith("Article ") for row in stored)
+
+    encoder.texts.clear()
+    assert await recommender.recommend_articles(session, 7, top_n=3) == stored
+    # Served from the stored neighbours, nothing is embedded on the request path.
+    assert encoder.texts == []
+
+
+async def stored_neighbours(session) -> dict[int, list[int]]:
+    rows = await session.execute(
+        select(models.ArticleNeighbour.article_id, models.ArticleNeighbour.neighbour_id)
+        .order_by(models.ArticleNeighbour.article_id, models.ArticleNeighbour.rank)
+    )
+    stored: dict[int, list[int]] = {}
+    for article_id, neighbour_id in rows:
+        stored.setdefault(article_id, []).append(neighbour_id)
+    return stored
+
+
+async def test_memory_budget_only_changes_the_chunking(session, encoder):
+    await crud.bulk_save_articles(session, [article_data(i) for i in range(1, 13)])
+    await embeddings.embed_missing_articles(session, article_ids=list(range(1, 9)))
+    await neighbours.refresh_neighbours(session, top_n=3)
+    await embeddings.embed_missing_articles(session)
+    await neighbours.refresh_neighbours(session, top_n=3)
+    expected = await stored_neighbours(session)
+
+    await session.execute(delete(models.ArticleNeighbour))
+    await session.execute(delete(models.ArticleEmbedding).where(models.ArticleEmbedding.article_id > 8))
+    await session.commit()
+    await neighbours.refresh_neighbours(session, top_n=3, memory_budget=1)
+    await embeddings.embed_missing_articles(session)
+    # One article per chunk in both passes.
+    await neighbours.refresh_neighbours(session, top_n=3, memory_budget=1)
+
+    assert await stored_neighbours(session) == expected
+
+
+async def test_similarity_work_runs_off_the_event_loop(session, encoder, monkeypatch):
+    threads = []
+    recommend_batch = ArticleRecommender.recommend_batch
+
+    def record(self, *args, **kwargs):
+        threads.append(threading.current_thread())
+        return recommend_batch(self, *args, **kwargs)
+
+    monkeypatch.setattr(ArticleRecommender, "recommend_batch", record)
+    await crud.bulk_save_articles(session, [article_data(i) for i in range(1, 7)])
+    await embeddings.embed_missing_articles(session)
+
+    await neighbours.refresh_neighbours(session, top_n=3)
+
+    assert threads and threading.main_thread() not in threads
+
+
+async def test_progress_is_stored_for_every_worker(client, encoder):
+    assert (await client.get("/articles/neighbours/progress")).json()["state"] == "idle"
+    async with database.get_session_context() as session:
+        await crud.bulk_save_articles(session, [article_data(i) for i in range(1, 7)])
+        await embeddings.embed_missing_articles(session)
+        await neighbours.refresh_neighbours(session, top_n=3)
+
+    progress = (await client.get("/articles/neighbours/progress")).json()
+
+    assert progress["state"] == "done"
+    assert progress["processed"] == progress["total"] == 6
+    assert progress["finished_at"] is not None
@@ -0,0 +1,116 @@
+"""Tests of the page cache and conditional listing requests."""
+
+import pytest
+
+from habr_parser.services import page_cache
+from habr_parser.services import scraper
+from habr_parser.services.fetcher import FetchMetrics
+from habr_parser.services.fetcher import PageFetcher
+from habr_parser.services.page_cache import PageCache
+from tests.stub_server import StubHabr
+from tests.stub_server import fixture_page
+
+pytestmark = pytest.mark.anyio
+
+PAGE = "<html><body>page</body></html>"
+
+
+def make_fetcher() -> PageFetcher:
+    return PageFetcher(backoff=0, metrics=FetchMetrics())
+
+
+async def test_etag_is_revalidated_and_304_reuses_the_body(tmp_path):
+    cache = PageCache(tmp_path)
+    with StubHabr({"/page1/": PAGE}) as stub:
+        stub.etags["/page1/"] = '"v1"'
+        url = f"{stub.url}/page1/"
+        async with make_fetcher() as fetcher:
+            first = await fetcher.fetch_cached(url, cache)
+            assert cache.conditional_headers(url) == {"If-None-Match": '"v1"'}
+            again = await fetcher.fetch_cached(url, cache)
+
+    assert first == (PAGE, True)
+    assert again == (PAGE, False)
+    assert stub.not_modified == ["/page1/"]
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+async def test_changed_etag_downloads_and_stores_the_new_body(tmp_path):
+    cache = PageCache(tmp_path)
+    with StubHabr({"/page1/": PAGE}) as stub:
+        stub.etags["/page1/"] = '"v1"'
+        url = f"{stub.url}/page1/"
+        async with make_fetcher() as fetcher:
+            await fetcher.fetch_cached(url, cache)
+            stub.pages["/page1/"] = "<html><body>new</body></html>"
+            stub.etags["/page1/"] = '"v2"'
+            changed = await fetcher.fetch_cached(url, cache)
+
+    assert changed == ("<html><body>new</body></html>", True)
+    assert stub.not_modified == []
+    assert cache.conditional_headers(url) == {"If-None-Match": '"v2"'}
+
+
+async def test_validators_survive_a_restart(tmp_path):
+    with StubHabr({"/page1/": PAGE}) as stub:
+        stub.etags["/page1/"] = '"v1"'
+        url = f"{stub.url}/page1/"
+        async with make_fetcher() as fetcher:
+            await fetcher.fetch_cached(url, PageCache(tmp_path))
+            again = await fetcher.fetch_cached(url, PageCache(tmp_path))
+
+    assert again == (PAGE, False)
+    assert stub.not_modified == ["/page1/"]
+
+
+async def test_not_modified_pages_are_neither_downloaded_nor_parsed(scrape_env, monkeypatch):
+    parsed = []
+    parse = scraper.get_parser()
+
+    def counting_parser(html: str) -> list[dict]:
+        parsed.append(html)
+        return parse(html)
+
+    monkeypatch.setattr(scraper, "get_parser", lambda: counting_parser)
+    pages = {
+        "/articles/page1/": fixture_page("listing/page1.html"),
+        "/articles/page2/": fixture_page("listing/page2.html"),
+    }
+    with StubHabr(pages) as stub:
+        stub.etags.update({path: f'"{path}"' for path in pages})
+        url = f"{stub.url}/articles/page"
+        first = [page async for page in scraper.iter_parsed_pages(url, 2)]
+        again = [page async for page in scraper.iter_parsed_pages(url, 2)]
+
+    assert len(first) == 2
+    assert again == []
+    assert len(parsed) == 2
+    assert sorted(stub.not_modified) == sorted(pages)
+    assert page_cache.get_page_cache().stats()["hits"] == 2
+
+
+def test_least_recently_used_pages_are_evicted(tmp_path):
+    cache = PageCache(tmp_path, max_bytes=25)
+    for name in ("a", "b"):
+        cache.store(f"https://habr.com/{name}/", name * 10, etag=f'"{name}"', last_modified=None)
+    # Revalidating "a" makes "b" the least recently used page.
+    cache.not_modified("https://habr.com/a/")
+
+    cache.store("https://habr.com/c/", "c" * 10, etag='"c"', last_modified=None)
+
+    assert cache.stats()["urls"] == 2
+    assert cache.stats()["bytes"] == 20
+    assert cache.conditional_headers("https://habr.com/b/") == {}
+    assert cache.conditional_headers("https://habr.com/a/") == {"If-None-Match": '"a"'}
+    assert len([p for p in (tmp_path / "objects").rglob("*") if p.is_file()]) == 2
+
+
+def test_identical_bodies_share_one_object(tmp_path):
+    cache = PageCache(tmp_path)
+    assert cache.store("https://habr.com/a/", PAGE, etag=None, last_modified=None)
+    assert not cache.store("https://habr.com/a/", PAGE, etag=None, last_modified="Mon")
+    cache.store("https://habr.com/b/", PAGE, etag=None, last_modified=None)
+
+    assert cache.stats()["bytes"] == len(PAGE)
+    assert cache.conditional_headers("https://habr.com/a/") == {"If-Modified-Since": "Mon"}
@@ -0,0 +1,40 @@
+"""Parity tests of the listing page parser backends."""
+
+import pytest
+
+from habr_parser.services.scraper import PARSERS
+from habr_parser.services.scraper import parse_articles
+from tests.stub_server import FIXTURES
+
+LISTING_PAGES = sorted((FIXTURES / "listing").glob("*.html"))
+
+
+@pytest.mark.parametrize("backend", sorted(PARSERS))
+@pytest.mark.parametrize("page", LISTING_PAGES, ids=lambda path: path.name)
+def test_backend_matches_reference_parser(backend, page):
+    content = page.read_text(encoding="utf-8")
+    assert PARSERS[backend](content) == parse_articles(content)
+
+
+@pytest.mark.parametrize("backend", sorted(PARSERS))
+@pytest.mark.parametrize("content", ["", "<html><body></body></html>"])
+def test_backend_handles_pages_without_articles(backend, content):
+    assert PARSERS[backend](content) == []
+
+
+def test_reference_parser_reads_listing_fields():
+    articles = parse_articles((FIXTURES / "listing" / "page1.html").read_text(encoding="utf-8"))
+
+    assert len(articles) == 6
+    assert articles[1] == {
+        "title": "Go & Rust: сравнение\xa0производительности",
+        "url": "https://habr.com/ru/companies/acme/articles/880002/",
+        "votes": -3,
+        "author": "gopher",
+        "published": "2025-09-12T07:40:00.000Z",
+        "views": 812,
+        "comments": 0,
+        "hubs": ["Блог компании ACME", "Go", "Rust"],
+    }
+    # A card without an article link still yields a (blank) record.
+    assert articles[3]["url"] == ""
@@ -0,0 +1,94 @@
+"""Deterministic tests of the token-bucket rate limiter."""
+
+import asyncio
+
+import pytest
+
+from habr_parser.services.rate_limiter import TokenBucket
+from tests.clock import FakeClock
+
+pytestmark = pytest.mark.anyio
+
+
+def test_rate_must_be_positive():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+async def test_burst_is_served_at_once_then_rate_applies():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=3, clock=clock)
+
+    waits = [await bucket.acquire() for _ in range(5)]
+
+    assert waits == [0, 0, 0, 0.5, 0.5]
+    assert clock.now == 1.0
+
+
+async def test_sustained_rate_over_many_acquisitions():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=4, burst=1, clock=clock)
+
+    for _ in range(41):
+        await bucket.acquire()
+
+    assert clock.now == pytest.approx(10.0)
+
+
+async def test_idle_time_refills_up_to_burst():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1, burst=2, clock=clock)
+    await bucket.acquire()
+    await bucket.acquire()
+
+    clock.now += 60
+    waits = [await bucket.acquire() for _ in range(3)]
+
+    assert waits == [0, 0, 1.0]
+
+
+async def test_waiters_are_served_in_arrival_order():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1, burst=1, clock=clock)
+    served = []
+
+    async def worker(name: str) -> None:
+        await bucket.acquire()
+        served.append((name, clock.now))
+
+    await asyncio.gather(*(worker(name) for name in "abcd"))
+
+    assert served == [("a", 0), ("b", 1), ("c", 2), ("d", 3)]
+
+
+async def test_pause_holds_everyone_off_then_starts_empty():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=5, clock=clock)
+
+    bucket.pause(10)
+    first = await bucket.acquire()
+    second = await bucket.acquire()
+
+    assert first == 10.5
+    assert second == 0.5
+
+
+async def test_shorter_pause_does_not_cut_a_longer_one():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1, burst=1, clock=clock)
+
+    bucket.pause(30)
+    bucket.pause(5)
+
+    assert await bucket.acquire() == 31
+
+
+async def test_fractional_waits_do_not_stall():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=100, burst=1, clock=clock)
+
+    bucket.pause(7)
+    for _ in range(100):
+        await bucket.acquire()
+
+    assert clock.now == pytest.approx(8.0)
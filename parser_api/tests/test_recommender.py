@@ -0,0 +1,65 @@
+"""Tests of on-demand recommendations."""
+
+import pytest
+from sqlalchemy import func
+from sqlalchemy import select
+
+from habr_parser.db import crud
+from habr_parser.db import models
+from habr_parser.services import embeddings
+from habr_parser.services import recommender
+from tests.seed import article_data
+
+pytestmark = [pytest.mark.anyio, pytest.mark.postgres]
+
+
+async def test_recommendation_embeds_only_the_requested_article(session, encoder):
+    await crud.bulk_save_articles(session, [article_data(i) for i in range(1, 7)])
+    await embeddings.embed_missing_articles(session, article_ids=[1, 2, 3, 4])
+    encoder.texts.clear()
+
+    recommendations = await recommender.recommend_articles_batch(session, [5], top_n=3)
+
+    assert len(recommendations[5]) == 3
+    assert 5 not in [row.id for row in recommendations[5]]
+    assert [text.split()[:2] for text in encoder.texts] == [["Article", "5"]]
+    stored = await session.scalar(select(func.count()).select_from(models.ArticleEmbedding))
+    # Article 6 is left to the embedding pass of the scrape cycle.
+    assert stored == 5
+
+
+@pytest.fixture
+async def embedded(session, encoder):
+    """Embedded articles without precomputed neighbours."""
+    await crud.bulk_save_articles(session, [article_data(i) for i in range(1, 13)])
+    await embeddings.embed_missing_articles(session)
+
+
+async def test_batch_recommendations_match_single_ones(client, embedded):
+    response = await client.post(
+        "/articles/recommendation/batch", json={"article_ids": [3, 7, 3, 11], "top_n": 4}
+    )
+
+    batch = response.json()
+    assert sorted(batch) == ["11", "3", "7"]
+    for article_id, recommended in batch.items():
+        single = (await client.get(f"/articles/recommendation/{article_id}")).json()
+        assert [a["id"] for a in recommended] == [a["id"] for a in single][:4]
+        assert len(recommended) == 4
+        assert int(article_id) not in [a["id"] for a in recommended]
+
+
+async def test_batch_recommendations_of_unknown_articles_are_not_found(client, embedded):
+    response = await client.post(
+        "/articles/recommendation/batch", json={"article_ids": [3, 404, 405]}
+    )
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Articles not found: [404, 405]"
+
+
+@pytest.mark.parametrize("payload", [{"article_ids": []}, {"article_ids": [1], "top_n": 0}])
+async def test_invalid_batch_requests_are_rejected(client, payload):
+    response = await client.post("/articles/recommendation/batch", json=payload)
+
+    assert response.status_code == 422
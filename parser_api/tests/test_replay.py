@@ -0,0 +1,66 @@
+"""Tests of saving replayed batches."""
+
+import gzip
+import json
+from pathlib import Path
+
+import pytest
+from sqlalchemy import select
+
+from habr_parser import replay
+from habr_parser.db.models import Article
+from habr_parser.services import response_cache
+from tests.seed import article_data
+
+pytestmark = [pytest.mark.anyio, pytest.mark.postgres]
+
+
+@pytest.fixture
+def cache(monkeypatch) -> response_cache.MemoryResponseCache:
+    cache = response_cache.MemoryResponseCache()
+    monkeypatch.setattr(response_cache, "_response_cache", cache)
+    return cache
+
+
+async def test_replayed_changes_invalidate_cached_responses(session, cache):
+    await replay._save([article_data(1), article_data(2)])
+    assert await cache.generation() == 1
+
+    # Nothing changed, cached responses stay valid.
+    await replay._save([article_data(1)])
+    assert await cache.generation() == 1
+
+    await replay._save([article_data(1, views=999)])
+    assert await cache.generation() == 2
+
+
+def write_archive(path: Path, records: list[dict]) -> None:
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, default=str) + "\n")
+
+
+async def test_newer_archive_counters_win(session, tmp_path):
+    # The older file is long and the newer one short, so reading the newer
+    # one finishes first; it must still be saved last.
+    write_archive(
+        tmp_path / "articles-2025-01-01-0001.ndjson.gz",
+        [article_data(i, views=100) for i in range(1, 301)],
+    )
+    write_archive(
+        tmp_path / "articles-2025-01-02-0001.ndjson.gz",
+        [article_data(i, views=200, votes=50) for i in range(1, 11)],
+    )
+
+    replayed = await replay.replay([str(tmp_path)], workers=2, batch_size=20)
+
+    rows = dict(
+        (url, (views, votes))
+        for url, views, votes in await session.execute(
+            select(Article.url, Article.views, Article.votes)
+        )
+    )
+    assert replayed == 310
+    assert len(rows) == 300
+    assert {rows[article_data(i)["url"]] for i in range(1, 11)} == {(200, 50)}
+    assert {rows[article_data(i)["url"]][0] for i in range(11, 301)} == {100}
@@ -0,0 +1,85 @@
+"""Tests of the response cache backends."""
+
+import asyncio
+
+import fakeredis
+import pytest
+from sqlalchemy import text
+
+from habr_parser.services import response_cache
+from habr_parser.services.response_cache import CachedResponse
+from habr_parser.services.response_cache import MemoryResponseCache
+from habr_parser.services.response_cache import RedisResponseCache
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def redis_cache() -> RedisResponseCache:
+    cache = RedisResponseCache(url="redis://localhost")
+    cache._redis = fakeredis.FakeAsyncRedis()
+    return cache
+
+
+async def test_redis_cache_keeps_binary_bodies(redis_cache):
+    # Bodies are opaque bytes, not necessarily UTF-8.
+    response = CachedResponse(
+        body=b"\x28\xb5\x2f\xfd\x00\xff\x80",
+        etag='"abc"',
+        media_type="application/json",
+        headers={"content-encoding": "zstd"},
+    )
+
+    await redis_cache.set("key", 0, response)
+
+    assert await redis_cache.get("key", 0) == response
+
+
+async def test_redis_cache_invalidation_drops_entries(redis_cache):
+    response = CachedResponse(body=b"[]", etag='"e"', media_type="application/json", headers={})
+    await redis_cache.set("key", await redis_cache.generation(), response)
+
+    await redis_cache.invalidate()
+
+    assert await redis_cache.generation() == 1
+    assert await redis_cache.get("key", 1) is None
+
+
+@pytest.fixture
+def memory_cache(monkeypatch) -> MemoryResponseCache:
+    cache = MemoryResponseCache()
+    monkeypatch.setattr(response_cache, "_response_cache", cache)
+    return cache
+
+
+async def wait_for_generation(cache: MemoryResponseCache, generation: int) -> None:
+    for _ in range(100):
+        if await cache.generation() >= generation:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"generation {await cache.generation()} never reached {generation}")
+
+
+@pytest.mark.postgres
+async def test_memory_cache_hears_invalidations_of_other_processes(session, memory_cache):
+    response = CachedResponse(body=b"[]", etag='"e"', media_type="application/json", headers={})
+    await memory_cache.set("key", 0, response)
+
+    async with response_cache.invalidation_listener():
+        # What invalidate_responses of another worker or the replay CLI sends.
+        await session.execute(
+            text("SELECT pg_notify(:channel, '')"),
+            {"channel": response_cache.INVALIDATION_CHANNEL},
+        )
+        await session.commit()
+        await wait_for_generation(memory_cache, 1)
+
+    assert await memory_cache.get("key", 0) is None
+
+
+@pytest.mark.postgres
+async def test_invalidation_is_broadcast(session, memory_cache):
+    async with response_cache.invalidation_listener():
+        await response_cache.invalidate_responses()
+        # Cleared here at once, then again when its own broadcast comes back.
+        await wait_for_generation(memory_cache, 2)
@@ -0,0 +1,153 @@
+"""Tests of the scrape job scheduler."""
+
+import asyncio
+import json
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+import pytest
+from sqlalchemy import func
+from sqlalchemy import select
+
+from habr_parser.config import BASE_URL
+from habr_parser.db import database
+from habr_parser.db import models
+from habr_parser.services import scheduler
+from habr_parser.services.scheduler import Scheduler
+from habr_parser.services.scheduler import ScrapeJob
+from habr_parser.services.scheduler import load_jobs
+
+pytestmark = pytest.mark.anyio
+
+JOB = ScrapeJob(name="python", url="https://habr.com/ru/hubs/python/articles/", interval=600, pages=2)
+
+
+def test_default_job_scrapes_the_feed():
+    assert load_jobs(None) == [ScrapeJob(name="default", url=BASE_URL)]
+
+
+def test_jobs_are_read_from_json():
+    raw = json.dumps([
+        {"name": "python", "url": JOB.url, "interval": 600, "pages": 2},
+        {"name": "go", "url": "https://habr.com/ru/hubs/go/articles/", "mode": "incremental"},
+    ])
+
+    jobs = load_jobs(raw)
+
+    assert jobs[0] == JOB
+    assert (jobs[1].name, jobs[1].mode) == ("go", "incremental")
+
+
+def test_job_names_must_be_unique():
+    raw = json.dumps([{"name": "python", "url": JOB.url}, {"name": "python", "url": BASE_URL}])
+
+    with pytest.raises(ValueError):
+        load_jobs(raw)
+
+
+def test_lock_keys_are_stable_per_name():
+    assert JOB.lock_key == ScrapeJob(name="python", url=BASE_URL).lock_key
+    assert JOB.lock_key != ScrapeJob(name="go", url=JOB.url).lock_key
+
+
+def test_next_run_is_stretched_by_jitter():
+    finished = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    runs = [Scheduler([JOB], jitter=0.1).next_run(JOB, finished) for _ in range(100)]
+
+    assert all(timedelta(seconds=600) <= run - finished <= timedelta(seconds=660) for run in runs)
+    assert Scheduler([JOB], jitter=0).next_run(JOB, finished) - finished == timedelta(seconds=600)
+
+
+@pytest.fixture
+def scrapes(monkeypatch) -> list[tuple]:
+    """Arguments of the scrapes the scheduler starts, which do nothing."""
+    calls = []
+
+    async def get_daily_articles(url, pages, mode):
+        calls.append((url, pages, mode))
+        await asyncio.sleep(0.05)
+
+    monkeypatch.setattr(scheduler, "get_daily_articles", get_daily_articles)
+    return calls
+
+
+async def job_state(session, name: str = JOB.name) -> models.ScrapeJobState:
+    session.expire_all()
+    return await session.get(models.ScrapeJobState, name)
+
+
+@pytest.mark.postgres
+async def test_job_runs_once_per_interval(session, scrapes):
+    runner = Scheduler([JOB], jitter=0)
+
+    assert await runner.run_job(JOB)
+    assert not await runner.run_job(JOB)
+
+    state = await job_state(session)
+    assert scrapes == [(JOB.url, JOB.pages, JOB.mode)]
+    assert (state.last_status, state.last_error) == ("ok", None)
+    assert state.next_run_at - state.last_finished_at == timedelta(seconds=JOB.interval)
+
+
+@pytest.mark.postgres
+async def test_due_job_runs_again(session, scrapes):
+    runner = Scheduler([JOB], jitter=0)
+    await runner.run_job(JOB)
+    state = await job_state(session)
+    state.next_run_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    await session.commit()
+
+    assert await runner.run_job(JOB)
+    assert len(scrapes) == 2
+
+
+@pytest.mark.postgres
+async def test_job_locked_elsewhere_does_not_run(session, scrapes):
+    async with database.engine.connect() as other:
+        await other.scalar(select(func.pg_advisory_lock(JOB.lock_key)))
+        await other.commit()
+        try:
+            assert not await Scheduler([JOB]).run_job(JOB)
+        finally:
+            await other.scalar(select(func.pg_advisory_unlock(JOB.lock_key)))
+            await other.commit()
+
+    assert scrapes == []
+    assert await job_state(session) is None
+
+
+@pytest.mark.postgres
+async def test_concurrent_runs_of_a_job_are_exclusive(session, scrapes):
+    ran = await asyncio.gather(*(Scheduler([JOB]).run_job(JOB) for _ in range(3)))
+
+    assert sorted(ran) == [False, False, True]
+    assert len(scrapes) == 1
+
+
+@pytest.mark.postgres
+async def test_failed_job_is_recorded_and_rescheduled(session, monkeypatch):
+    async def get_daily_articles(url, pages, mode):
+        raise RuntimeError("habr is down")
+
+    monkeypatch.setattr(scheduler, "get_daily_articles", get_daily_articles)
+
+    assert await Scheduler([JOB], jitter=0).run_job(JOB)
+
+    state = await job_state(session)
+    assert (state.last_status, state.last_error) == ("error", "habr is down")
+    assert state.next_run_at - state.last_finished_at == timedelta(seconds=JOB.interval)
+
+
+@pytest.mark.postgres
+async def test_tick_runs_due_jobs_and_waits_for_the_next(session, scrapes):
+    soon = ScrapeJob(name="soon", url="https://habr.com/ru/hubs/go/articles/", interval=5)
+    runner = Scheduler([JOB, soon], jitter=0, poll=60)
+
+    wait = await runner.tick()
+
+    assert sorted(url for url, _, _ in scrapes) == sorted([JOB.url, soon.url])
+    assert 0 < wait <= 5
+    # Nothing is due yet, so the poll interval caps the wait.
+    assert await Scheduler([JOB], jitter=0, poll=60).tick() == 60
+    assert len(scrapes) == 2
@@ -0,0 +1,94 @@
+"""Tests of the scrape modes."""
+
+import pytest
+
+from habr_parser.db import crud
+from habr_parser.services import processor
+from habr_parser.services import scraper
+from tests.stub_server import StubHabr
+from tests.stub_server import fixture_page
+
+pytestmark = pytest.mark.anyio
+
+FEED = {
+    "/articles/page1/": fixture_page("listing/page1.html"),
+    "/articles/page2/": fixture_page("listing/page2.html"),
+    "/articles/page3/": fixture_page("listing/page1.html"),
+}
+
+
+def page_urls(path: str) -> set[str]:
+    """Urls of the cards of a page that get stored."""
+    return {
+        a["url"] for a in scraper.get_parser()(FEED[path])
+        if all(a.get(field) for field in crud.ARTICLE_REQUIRED_FIELDS)
+    }
+
+
+async def walk(url: str, pages: int, known_urls: set[str]) -> list[list[dict]]:
+    return [page async for page in scraper.iter_new_pages(url, pages, known_urls)]
+
+
+async def test_incremental_walk_stops_at_the_first_page_with_nothing_new(scrape_env):
+    known = page_urls("/articles/page2/")
+    with StubHabr(FEED) as stub:
+        walked = await walk(f"{stub.url}/articles/page", 3, set(known))
+
+    assert len(walked) == 1
+    assert stub.hits == ["/articles/page1/", "/articles/page2/"]
+
+
+async def test_incremental_walk_ignores_cards_that_are_never_stored(scrape_env):
+    # Page 1 has a placeholder card without a url next to known articles.
+    known = page_urls("/articles/page1/")
+    with StubHabr(FEED) as stub:
+        walked = await walk(f"{stub.url}/articles/page", 3, set(known))
+
+    assert walked == []
+    assert stub.hits == ["/articles/page1/"]
+
+
+async def test_incremental_walk_remembers_yielded_urls_and_respects_max_pages(scrape_env):
+    known: set[str] = set()
+    with StubHabr(FEED) as stub:
+        walked = await walk(f"{stub.url}/articles/page", 2, known)
+
+    assert len(walked) == 2
+    assert known == page_urls("/articles/page1/") | page_urls("/articles/page2/")
+    assert "/articles/page3/" not in stub.hits
+
+
+async def test_incremental_walk_stops_at_a_missing_page(scrape_env):
+    with StubHabr({"/articles/page1/": FEED["/articles/page1/"]}) as stub:
+        walked = await walk(f"{stub.url}/articles/page", 3, set())
+
+    assert len(walked) == 1
+    assert stub.hits == ["/articles/page1/", "/articles/page2/"]
+
+
+async def test_default_mode_walks_every_page(scrape_env):
+    with StubHabr(FEED) as stub:
+        walked = [page async for page in scraper.iter_scraped_pages(f"{stub.url}/articles/page", 3)]
+
+    assert len(walked) == 3
+
+
+@pytest.mark.postgres
+async def test_incremental_mode_stops_at_stored_articles(session, scrape_env):
+    stored = processor.process_articles(scraper.get_parser()(FEED["/articles/page2/"]))
+    # The anonymous card of page 2 is skipped when saving, and must not count as new.
+    await crud.bulk_save_articles(session, stored)
+
+    with StubHabr(FEED) as stub:
+        walked = [
+            page async for page in
+            scraper.iter_scraped_pages(f"{stub.url}/articles/page", 3, mode="incremental")
+        ]
+
+    assert len(walked) == 1
+    assert stub.hits == ["/articles/page1/", "/articles/page2/"]
+
+
+async def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        [page async for page in scraper.iter_scraped_pages("http://localhost/", 1, mode="daily")]
@@ -0,0 +1,61 @@
+"""Tests of the vector index backends."""
+
+import numpy as np
+import pytest
+
+from habr_parser.services.vector_index import INDEX_BACKENDS
+from habr_parser.services.vector_index import VectorIndex
+from habr_parser.services.vector_index import create_index
+from habr_parser.services.vector_index import normalize
+
+
+@pytest.fixture(params=sorted(INDEX_BACKENDS))
+def index(request) -> VectorIndex:
+    if request.param == "hnsw":
+        pytest.importorskip("hnswlib")
+    return create_index(4, backend=request.param)
+
+
+def test_interface_cannot_be_instantiated():
+    with pytest.raises(TypeError):
+        VectorIndex()
+
+
+def test_search_finds_nearest_first(index):
+    index.add([10, 20, 30], np.array([[1, 0, 0, 0], [0, 1, 0, 0], [1, 1, 0, 0]]))
+
+    ids, scores = index.search(np.array([[1, 0.1, 0, 0]]), k=2)
+
+    assert ids.tolist() == [[10, 30]]
+    assert scores[0, 0] > scores[0, 1]
+
+
+def test_add_replaces_and_remove_drops(index):
+    index.add([1, 2], np.array([[1, 0, 0, 0], [0, 1, 0, 0]]))
+    index.add([1], np.array([[0, 0, 1, 0]]))
+    index.remove([2, 99])
+
+    assert len(index) == 1
+    assert 2 not in index
+    np.testing.assert_allclose(index.get([1]), [[0, 0, 1, 0]], atol=1e-6)
+    assert index.search(np.array([[0, 0, 1, 0]]), k=5)[0].tolist() == [[1]]
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_index(4, backend="faiss")
+
+
+@pytest.mark.parametrize("k", [1, 7, 50, 200])
+def test_exact_top_k_matches_a_full_sort(k):
+    rng = np.random.default_rng(0)
+    index = create_index(16, backend="exact")
+    index.add(list(range(100, 200)), rng.normal(size=(100, 16)))
+    queries = rng.normal(size=(5, 16))
+
+    ids, scores = index.search(queries, k)
+
+    all_scores = normalize(queries) @ index.get(list(range(100, 200))).T
+    expected = np.argsort(-all_scores, axis=1)[:, :k] + 100
+    assert ids.tolist() == expected.tolist()
+    np.testing.assert_allclose(scores, -np.sort(-all_scores, axis=1)[:, :k], rtol=1e-6)